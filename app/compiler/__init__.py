@@ -1,12 +1,110 @@
+import copy
+import hashlib
+import importlib
+import os
 import re
 import sys
+from contextlib import contextmanager
+from threading import Lock
+from typing import Iterator
 import ply.lex as plylex
 import ply.yacc as plyyacc
+from app.compiler import lex as lex_module
 from app.compiler.lex import *
 from app.compiler.yacc import *
 
-lexer = plylex.lex(reflags=re.IGNORECASE)
-parser = plyyacc.yacc()
+# the lexer and parser tables are generated into this package the first time,
+# and regenerated only when the rules in lex.py or the grammar in yacc.py change
+tables_directory = os.path.dirname(os.path.abspath(__file__))
+lextab_module = "app.compiler.lextab"
+parsetab_module = "app.compiler.parsetab"
+
+
+def lexer_signature() -> str:
+    # PLY checks the grammar signature of the parser tables by itself, but an
+    # optimized lexer trusts its table blindly, so it is versioned here
+    with open(lex_module.__file__, "rb") as lex_source:
+        source = lex_source.read()
+    return hashlib.sha256(source + plylex.__version__.encode()).hexdigest()
+
+
+def build_lexer() -> plylex.Lexer:
+    signature = lexer_signature()
+    try:
+        lextab = importlib.import_module(lextab_module)
+        is_up_to_date = getattr(lextab, "_signature", None) == signature
+    except ImportError:
+        is_up_to_date = False
+
+    if not is_up_to_date:
+        sys.modules.pop(lextab_module, None)
+        lextab_path = os.path.join(tables_directory, "lextab.py")
+        if os.path.exists(lextab_path):
+            os.remove(lextab_path)
+
+    new_lexer = plylex.lex(
+        module=lex_module,
+        reflags=re.IGNORECASE,
+        optimize=True,
+        lextab=lextab_module,
+        outputdir=tables_directory,
+    )
+
+    if not is_up_to_date:
+        try:
+            with open(os.path.join(tables_directory, "lextab.py"), "a") as lextab:
+                lextab.write(f"_signature = {signature!r}\n")
+        except OSError:
+            # read-only installation, the lexer is rebuilt on every start
+            pass
+    return new_lexer
+
+
+def build_parser() -> plyyacc.LRParser:
+    return plyyacc.yacc(
+        debug=False,
+        tabmodule=parsetab_module,
+        outputdir=tables_directory,
+    )
+
+
+class CompilerPool:
+    """
+    A pool of lexer and parser instances.
+
+    PLY lexers and parsers keep the state of the input they are working on in
+    the instance, so each compilation needs its own pair to run concurrently
+    with the others. New pairs are cheap copies sharing the generated tables.
+    """
+
+    def __init__(self, lexer: plylex.Lexer, parser: plyyacc.LRParser):
+        self.__lexer = lexer
+        self.__parser = parser
+        self.__idle: list[tuple[plylex.Lexer, plyyacc.LRParser]] = []
+        self.__lock = Lock()
+
+    def acquire(self) -> tuple[plylex.Lexer, plyyacc.LRParser]:
+        with self.__lock:
+            if self.__idle:
+                return self.__idle.pop()
+        return self.__lexer.clone(), copy.copy(self.__parser)
+
+    def release(self, instances: tuple[plylex.Lexer, plyyacc.LRParser]) -> None:
+        with self.__lock:
+            self.__idle.append(instances)
+
+    @contextmanager
+    def instances(self) -> Iterator[tuple[plylex.Lexer, plyyacc.LRParser]]:
+        pair = self.acquire()
+        try:
+            yield pair
+        finally:
+            self.release(pair)
+
+
+lexer = build_lexer()
+parser = build_parser()
+compiler_pool = CompilerPool(lexer, parser)
 
 if __name__ == "__main__":
     if len(sys.argv) == 0 or sys.argv[0] == "yacc":
@@ -48,7 +48,7 @@ class AliasNode:
 
 @dataclass
 class JoinNode:
-    left: str | tuple
+    left: "str | tuple | JoinNode"
     right: str | tuple
     join_type: str
     condition: dict
@@ -0,0 +1,71 @@
+"""
+Startup benchmark of the lexer and parser construction.
+
+Compares building the lexer and the LALR parser from the grammar rules, as it
+was done on every start, with loading them from the generated tables.
+Every measure runs in a fresh interpreter since the tables are modules and
+are cached after their first import.
+
+Usage:
+    python -m app.compiler.benchmark [runs]
+"""
+
+import statistics
+import subprocess
+import sys
+
+# both snippets import the package first so only the construction is measured
+from_rules_snippet = """
+import re, time
+import ply.lex as plylex
+import ply.yacc as plyyacc
+from app.compiler import *
+start_time = time.perf_counter()
+plylex.lex(reflags=re.IGNORECASE)
+plyyacc.yacc(debug=False, write_tables=False, tabmodule="app.compiler.no_tables",
+             errorlog=plyyacc.NullLogger())
+print(time.perf_counter() - start_time)
+"""
+
+from_tables_snippet = """
+import sys, time
+from app.compiler import *
+# forget the tables the package import loaded so they are read again
+sys.modules.pop(lextab_module)
+sys.modules.pop(parsetab_module)
+start_time = time.perf_counter()
+build_lexer()
+build_parser()
+print(time.perf_counter() - start_time)
+"""
+
+
+def measure(snippet: str, runs: int) -> list[float]:
+    timings = []
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, "-c", snippet],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+        timings.append(float(output.strip().splitlines()[-1]))
+    return timings
+
+
+def main(runs: int = 10) -> None:
+    # the first import generates the tables if they are missing or outdated
+    import app.compiler
+
+    from_rules = measure(from_rules_snippet, runs)
+    from_tables = measure(from_tables_snippet, runs)
+    from_rules_median = statistics.median(from_rules) * 1000
+    from_tables_median = statistics.median(from_tables) * 1000
+    print(f"runs: {runs}")
+    print(f"built from the grammar rules: {from_rules_median:.2f} ms (median)")
+    print(f"loaded from the tables:       {from_tables_median:.2f} ms (median)")
+    print(f"speedup: {from_rules_median / from_tables_median:.1f}x")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10)
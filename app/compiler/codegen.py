@@ -0,0 +1,131 @@
+from dataclasses import fields, is_dataclass
+from enum import Enum
+from typing import Any
+
+from app.compiler.optimizer import SelectParts
+from app.compiler.plan import Join, KeyLink, PlanNode, Scan, join_chain, join_scans
+
+
+def to_source(value: Any) -> str:
+    """
+    Renders a value of the plan (conditions, select columns, AST nodes...) as
+    the python expression that builds it in the generated code.
+    """
+    if value is None or isinstance(value, (bool, int, float)):
+        return repr(value)
+    if isinstance(value, str):
+        return repr(value)
+    if isinstance(value, Enum):
+        return f"{value.__class__.__name__}.{value.name}"
+    if is_dataclass(value):
+        arguments = ", ".join(
+            f"{field.name}={to_source(getattr(value, field.name))}"
+            for field in fields(value)
+        )
+        return f"{value.__class__.__name__}({arguments})"
+    if isinstance(value, dict):
+        items = ", ".join(
+            f"{to_source(key)}: {to_source(item)}" for key, item in value.items()
+        )
+        return f"{{{items}}}"
+    if isinstance(value, tuple):
+        items = ", ".join(to_source(item) for item in value)
+        return f"({items},)" if len(value) == 1 else f"({items})"
+    if isinstance(value, list):
+        return f"[{', '.join(to_source(item) for item in value)}]"
+    raise TypeError(f"can't generate the code of a {type(value).__name__} value")
+
+
+def extract_arguments(scan: Scan) -> str:
+    arguments = [to_source(scan.source_type), to_source(scan.path)]
+    if scan.columns:
+        arguments.append(f" columns={to_source(scan.columns)}")
+    if scan.filters:
+        arguments.append(f" filters={to_source(scan.filters)}")
+    if scan.limit is not None:
+        arguments.append(f" limit={to_source(scan.limit)}")
+    return ",".join(arguments)
+
+
+def extract_call(scan: Scan) -> str:
+    return f"etl.extract({extract_arguments(scan)})"
+
+
+def extract_many_call(
+    variables: list[str], scans: list[Scan], key_links: list[KeyLink]
+) -> str:
+    # independent scans are extracted concurrently
+    extractions = "".join(
+        f"    etl.Extraction({extract_arguments(scan)}),\n" for scan in scans
+    )
+    links = ""
+    if key_links:
+        links = "".join(f"    etl.{to_source(link)},\n" for link in key_links)
+        links = f", key_links=[\n{links}]"
+    return f"{', '.join(variables)} = etl.extract_many([\n{extractions}]{links})\n"
+
+
+# the sources a single source query can read in chunks (see `etl.extract_lazy`)
+streamable_source_types = ("csv", "json")
+
+
+def generate_source(source: Scan | Join) -> str:
+    """The code that extracts the data of the FROM part into `extracted_data`."""
+    if isinstance(source, Scan):
+        if source.source_type.lower() in streamable_source_types and not (
+            source.filters or source.limit is not None
+        ):
+            arguments = extract_arguments(source)
+            if source.alias:
+                arguments += f", alias={to_source(source.alias)}"
+            return f"extracted_data = etl.extract_lazy({arguments})\n"
+        code = f"extracted_data = {extract_call(source)}\n"
+        if source.alias:
+            code += f"extracted_data = etl.apply_alias(extracted_data, {to_source(source.alias)})\n"
+        return code
+    scans = join_scans(source)
+    if len(scans) == 2:
+        left, right = scans
+        return (
+            extract_many_call(["left_data", "right_data"], scans, source.key_links)
+            + f"extracted_data = etl.apply_join(left_data, right_data, {to_source(source.condition)}, "
+            f"{to_source(source.join_type)}, {to_source(left.alias)}, {to_source(right.alias)})\n"
+        )
+    # the order the joins of a chain are applied in is chosen when executing
+    code = extract_many_call(
+        [f"data_{index}" for index in range(len(scans))], scans, source.key_links
+    )
+    sources = ", ".join(
+        f"(data_{index}, {to_source(scan.alias)})" for index, scan in enumerate(scans)
+    )
+    joins = ", ".join(
+        f"({to_source(join.condition)}, {to_source(join.join_type)})"
+        for join in join_chain(source)
+    )
+    return code + f"extracted_data = etl.apply_joins([{sources}], [{joins}])\n"
+
+
+def generate_python(plan: PlanNode) -> str:
+    """Generates the python code that runs the given SELECT plan."""
+    parts = SelectParts(plan)
+    code = (
+        "from app import etl\n"
+        "from app.compiler.ast_nodes import *\n\n"
+        f"{generate_source(parts.source)}"
+        f"transformed_data = etl.transform_select(\n"
+        f"   extracted_data,\n"
+        f"   {{\n"
+        f"        'COLUMNS':  {to_source(parts.project.columns)},\n"
+        f"        'DISTINCT': {to_source(parts.project.distinct)},\n"
+        f"        'FILTER':   {to_source(parts.where)},\n"
+        f"        'GROUP':    {to_source(parts.group)},\n"
+        f"        'ORDER':    {to_source(parts.order)},\n"
+        f"        'LIMIT_OR_TAIL':    {to_source(parts.limit_or_tail)},\n"
+        f"    }}\n"
+        f")\n"
+    )
+    if parts.load:
+        destination_type = to_source(parts.load.destination_type)
+        destination_path = to_source(parts.load.destination_path)
+        code += f"etl.load(transformed_data,{destination_type},{destination_path})"
+    return code + "\n"
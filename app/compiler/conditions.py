@@ -0,0 +1,362 @@
+import operator as python_operators
+from typing import Any, Callable
+
+from app.compiler.pushdown import is_column_reference
+
+
+def const(value: bool) -> dict:
+    return {"type": "const", "value": value}
+
+
+def is_const(conditions: dict, value: bool | None = None) -> bool:
+    return conditions["type"] == "const" and (
+        value is None or conditions["value"] == value
+    )
+
+
+def is_number(operand: Any) -> bool:
+    return type(operand) in (int, float)
+
+
+def literal_value(operand: Any) -> Any:
+    # quoted strings are string literals, numbers are number literals
+    return operand[1:-1] if type(operand) == str else operand
+
+
+comparison_functions: dict[str, Callable[[Any, Any], bool]] = {
+    "==": python_operators.eq,
+    "!=": python_operators.ne,
+    "<>": python_operators.ne,
+    ">": python_operators.gt,
+    ">=": python_operators.ge,
+    "<": python_operators.lt,
+    "<=": python_operators.le,
+}
+
+# the comparison that keeps its meaning when its operands are swapped
+swapped_operators: dict[str, str] = {
+    "==": "==",
+    "!=": "!=",
+    "<>": "<>",
+    ">": "<",
+    ">=": "<=",
+    "<": ">",
+    "<=": ">=",
+}
+
+
+def condition_key(conditions: dict) -> tuple:
+    """A hashable form of a conditions tree, equal for identical trees."""
+    if conditions["type"] == "const":
+        return ("const", conditions["value"])
+    if conditions["type"] == "not":
+        return ("not", condition_key(conditions["operand"]))
+    if conditions["type"] in ("and", "or"):
+        return (
+            conditions["type"],
+            condition_key(conditions["left"]),
+            condition_key(conditions["right"]),
+        )
+    right = conditions["right"]
+    if conditions["type"] == "in":
+        right = tuple((type(value), value) for value in right)
+    else:
+        right = (type(right), right)
+    return (conditions["type"], (type(conditions["left"]), conditions["left"]), right)
+
+
+def condition_cost(conditions: dict) -> int:
+    """
+    A rough estimate of what evaluating a conditions tree on every row costs,
+    used to run the cheap conjuncts first: comparisons of numbers are the
+    cheapest, string comparisons and set membership tests come next, and the
+    regular expression matching of LIKE is the most expensive.
+    """
+    operator = conditions["type"]
+    if operator == "const":
+        return 0
+    if operator == "not":
+        return condition_cost(conditions["operand"])
+    if operator in ("and", "or"):
+        return condition_cost(conditions["left"]) + condition_cost(conditions["right"])
+    if operator == "like":
+        return 20
+    if operator == "in":
+        return 4
+    if is_number(conditions["left"]) or is_number(conditions["right"]):
+        return 1
+    return 2
+
+
+def chain(operator: str, conditions: dict) -> list[dict]:
+    """The operands of a nested chain of the given AND or OR operator."""
+    if conditions["type"] == operator:
+        return chain(operator, conditions["left"]) + chain(
+            operator, conditions["right"]
+        )
+    return [conditions]
+
+
+def build_chain(operator: str, conditions: list[dict]) -> dict:
+    result = conditions[0]
+    for condition in conditions[1:]:
+        result = {"type": operator, "left": result, "right": condition}
+    return result
+
+
+def deduplicated(conditions: list[dict]) -> list[dict]:
+    unique: dict[tuple, dict] = {}
+    for condition in conditions:
+        unique.setdefault(condition_key(condition), condition)
+    return list(unique.values())
+
+
+def normalized_comparison(conditions: dict) -> dict:
+    # a literal compared to a column is written with the column on the left
+    left, right = conditions["left"], conditions["right"]
+    if (
+        conditions["type"] in swapped_operators
+        and not is_column_reference(left)
+        and is_column_reference(right)
+    ):
+        return {
+            "type": swapped_operators[conditions["type"]],
+            "left": right,
+            "right": left,
+        }
+    return conditions
+
+
+def fold_comparison(conditions: dict) -> dict:
+    left, right = conditions["left"], conditions["right"]
+    if is_column_reference(left) or is_column_reference(right):
+        return normalized_comparison(conditions)
+    function = comparison_functions.get(conditions["type"])
+    if function is None:
+        return conditions
+    try:
+        return const(bool(function(literal_value(left), literal_value(right))))
+    except TypeError:
+        # e.g. a string compared to a number, it fails when executed as it is
+        return conditions
+
+
+class Bounds:
+    """The numeric range a column is restricted to by AND-ed comparisons."""
+
+    def __init__(self):
+        self.lower: tuple[float, bool] | None = None  # (value, is strict)
+        self.upper: tuple[float, bool] | None = None
+        self.equal: list[Any] = []
+
+    def add(self, operator: str, value: Any) -> None:
+        if operator == "==":
+            self.equal.append(value)
+        elif operator in (">", ">="):
+            bound = (value, operator == ">")
+            if (
+                self.lower is None
+                or bound[0] > self.lower[0]
+                or (bound[0] == self.lower[0] and bound[1])
+            ):
+                self.lower = bound
+        else:
+            bound = (value, operator == "<")
+            if (
+                self.upper is None
+                or bound[0] < self.upper[0]
+                or (bound[0] == self.upper[0] and bound[1])
+            ):
+                self.upper = bound
+
+    def satisfied_by(self, value: Any) -> bool:
+        if self.lower and (
+            value < self.lower[0] or (value == self.lower[0] and self.lower[1])
+        ):
+            return False
+        if self.upper and (
+            value > self.upper[0] or (value == self.upper[0] and self.upper[1])
+        ):
+            return False
+        return True
+
+    def conditions(self, column: str) -> list[dict] | None:
+        """The tightest conditions of the range, None when it is empty."""
+        values = {literal_value(value) for value in self.equal}
+        if len(values) > 1:
+            return None
+        if self.equal:
+            value = literal_value(self.equal[0])
+            if (self.lower or self.upper) and not is_number(value):
+                # a string can't be checked against numeric bounds here
+                return [self.leaf(column, "==", self.equal[0])] + self.bound_leaves(
+                    column
+                )
+            if not self.satisfied_by(value):
+                return None
+            return [self.leaf(column, "==", self.equal[0])]
+        if self.lower and self.upper:
+            if self.lower[0] > self.upper[0] or (
+                self.lower[0] == self.upper[0] and (self.lower[1] or self.upper[1])
+            ):
+                return None
+        return self.bound_leaves(column)
+
+    def bound_leaves(self, column: str) -> list[dict]:
+        leaves = []
+        if self.lower:
+            leaves.append(
+                self.leaf(column, ">" if self.lower[1] else ">=", self.lower[0])
+            )
+        if self.upper:
+            leaves.append(
+                self.leaf(column, "<" if self.upper[1] else "<=", self.upper[0])
+            )
+        return leaves
+
+    @staticmethod
+    def leaf(column: str, operator: str, value: Any) -> dict:
+        return {"type": operator, "left": column, "right": value}
+
+
+def is_range_comparison(conditions: dict) -> bool:
+    # `column op number`, or `column == literal`, once normalized
+    operator, right = conditions["type"], conditions.get("right")
+    if not is_column_reference(conditions.get("left")) or is_column_reference(right):
+        return False
+    if operator == "==":
+        return type(right) in (int, float, str)
+    return operator in (">", ">=", "<", "<=") and is_number(right)
+
+
+def tighten_ranges(conditions: list[dict]) -> list[dict] | None:
+    """
+    Merges the AND-ed comparisons of each column with literals into the
+    tightest equivalent ones (`x > 5 AND x > 3` is `x > 5`), returns None when
+    they contradict each other (`x > 5 AND x < 3`).
+    """
+    bounds: dict[str, Bounds] = {}
+    for condition in conditions:
+        if is_range_comparison(condition):
+            bounds.setdefault(condition["left"], Bounds()).add(
+                condition["type"], condition["right"]
+            )
+
+    result = []
+    for condition in conditions:
+        if not is_range_comparison(condition):
+            result.append(condition)
+            continue
+        column_bounds = bounds.pop(condition["left"], None)
+        if column_bounds is None:
+            # already replaced at the column's first comparison
+            continue
+        tightened = column_bounds.conditions(condition["left"])
+        if tightened is None:
+            return None
+        result.extend(tightened)
+    return result
+
+
+def membership_values(conditions: dict) -> list | None:
+    # the literals a column is tested against by an equality or a membership test
+    left, right = conditions.get("left"), conditions.get("right")
+    if not is_column_reference(left):
+        return None
+    if conditions["type"] == "in":
+        return right
+    if conditions["type"] == "==" and not is_column_reference(right):
+        return [right]
+    return None
+
+
+def equalities_to_membership(conditions: list[dict]) -> list[dict]:
+    """
+    Rewrites OR-ed equalities of the same column to literals into a single
+    membership test, `x == 1 OR x == 2 OR x == 3` is `{"type": "in",
+    "left": "x", "right": [1, 2, 3]}`.
+    """
+    values_by_column: dict[str, list] = {}
+    tests_by_column: dict[str, int] = {}
+    for condition in conditions:
+        values = membership_values(condition)
+        if values is not None:
+            column = condition["left"]
+            values_by_column.setdefault(column, []).extend(values)
+            tests_by_column[column] = tests_by_column.get(column, 0) + 1
+
+    result = []
+    for condition in conditions:
+        values = membership_values(condition)
+        if values is None or tests_by_column[condition["left"]] < 2:
+            result.append(condition)
+            continue
+        column_values = values_by_column.pop(condition["left"], None)
+        if column_values is None:
+            # already merged into the membership test of the column
+            continue
+        unique_values = {(type(value), value): value for value in column_values}
+        result.append(
+            {
+                "type": "in",
+                "left": condition["left"],
+                "right": list(unique_values.values()),
+            }
+        )
+    return result
+
+
+def optimize_conditions(conditions: dict | None) -> dict | None:
+    """
+    Rewrites a WHERE conditions tree into an equivalent one that is cheaper to
+    evaluate.
+
+    The rules keep the results pandas gives for missing values, where every
+    comparison with a missing value is False:
+        - comparisons of two literals are folded into `{"type": "const"}` nodes,
+          which are then propagated through NOT, AND and OR
+        - nested AND and OR chains are flattened, and duplicated operands removed
+        - AND-ed numeric comparisons of a column are merged into the tightest
+          range, a contradictory range folds the conjunction to False
+        - OR-ed equalities of a column are merged into one `in` membership test
+        - conjuncts are ordered from the cheapest to the most expensive, so the
+          expensive ones are only evaluated on the rows the others kept
+    """
+    if not conditions:
+        return conditions
+    operator = conditions["type"]
+    if operator == "const":
+        return conditions
+    if operator == "not":
+        operand = optimize_conditions(conditions["operand"])
+        if is_const(operand):
+            return const(not operand["value"])
+        if operand["type"] == "not":
+            # NOT of a mask is its complement, so a double NOT cancels out
+            return operand["operand"]
+        return {"type": "not", "operand": operand}
+    if operator not in ("and", "or"):
+        return fold_comparison(conditions)
+
+    absorbing = operator == "or"  # True absorbs an OR, False an AND
+    operands = []
+    for operand in chain(operator, conditions):
+        operand = optimize_conditions(operand)
+        if is_const(operand, absorbing):
+            return operand
+        if is_const(operand):
+            continue
+        operands.extend(chain(operator, operand))
+    operands = deduplicated(operands)
+
+    if operator == "and":
+        operands = tighten_ranges(operands)
+        if operands is None:
+            return const(False)
+        operands.sort(key=condition_cost)
+    else:
+        operands = equalities_to_membership(operands)
+
+    if not operands:
+        return const(not absorbing)
+    return build_chain(operator, operands)
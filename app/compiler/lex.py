@@ -28,6 +28,12 @@ reserved = [
     "DELETE",
     "AS",
     "INNER",
+    "LEFT",
+    "RIGHT",
+    "FULL",
+    "OUTER",
+    "SEMI",
+    "ANTI",
     "JOIN",
     "ON",
 ]
@@ -147,6 +153,43 @@ def t_INNER(t):
     return t
 
 
+# the join keywords are common prefixes of column names (e.g. leftover, fullname)
+@TOKEN(r"left\b")
+def t_LEFT(t):
+    t.value = t.value.lower()
+    return t
+
+
+@TOKEN(r"right\b")
+def t_RIGHT(t):
+    t.value = t.value.lower()
+    return t
+
+
+@TOKEN(r"full\b")
+def t_FULL(t):
+    t.value = t.value.lower()
+    return t
+
+
+@TOKEN(r"outer\b")
+def t_OUTER(t):
+    t.value = t.value.lower()
+    return t
+
+
+@TOKEN(r"semi\b")
+def t_SEMI(t):
+    t.value = t.value.lower()
+    return t
+
+
+@TOKEN(r"anti\b")
+def t_ANTI(t):
+    t.value = t.value.lower()
+    return t
+
+
 @TOKEN(r"join")
 def t_JOIN(t):
     return t
@@ -0,0 +1,11 @@
+# lextab.py. This file automatically created by PLY (version 3.11). Don't edit!
+_tabversion   = '3.10'
+_lextokens    = set(('AGGREGATION_FUNCTION', 'AND', 'ANTI', 'AS', 'ASC', 'BIGGER', 'BIGGER_EQUAL', 'BRACKETED_COLNAME', 'BY', 'COLNUMBER', 'COMMA', 'DATASOURCE', 'DELETE', 'DESC', 'DISTINCT', 'DIVIDE', 'EQUAL', 'FLOATNUMBER', 'FROM', 'FULL', 'GROUP', 'INNER', 'INSERT', 'INTO', 'JOIN', 'LEFT', 'LIKE', 'LIMIT', 'LPAREN', 'MINUS', 'NEGATIVE_INTNUMBER', 'NOT', 'NOTEQUAL', 'ON', 'OR', 'ORDER', 'OUTER', 'PATTERN', 'PERCENT', 'PLUS', 'POSITIVE_INTNUMBER', 'POWER', 'RIGHT', 'RPAREN', 'SELECT', 'SEMI', 'SET', 'SIMICOLON', 'SIMPLE_COLNAME', 'SMALLER', 'SMALLER_EQUAL', 'STRING', 'TAIL', 'TIMES', 'UPDATE', 'VALUES', 'WHERE'))
+_lexreflags   = 2
+_lexliterals  = ''
+_lexstateinfo = {'INITIAL': 'inclusive'}
+_lexstatere   = {'INITIAL': [('(?P<t_SELECT>select)|(?P<t_DISTINCT>distinct)|(?P<t_FROM>from)|(?P<t_INTO>into)|(?P<t_AS>as)|(?P<t_INNER>inner)|(?P<t_LEFT>left\\b)|(?P<t_RIGHT>right\\b)|(?P<t_FULL>full\\b)|(?P<t_OUTER>outer\\b)|(?P<t_SEMI>semi\\b)|(?P<t_ANTI>anti\\b)|(?P<t_JOIN>join)|(?P<t_ON>on)|(?P<t_GROUP>group)|(?P<t_AGGREGATION_FUNCTION>\\b(?:(?![\\{\\[])(?:sum|mean|median|min|max|count|nunique|std|var|first|last|prod|sem|size|quantile)\\b(?![\\}\\]])))|(?P<t_ORDER>order)|(?P<t_BY>by)|(?P<t_WHERE>where)|(?P<t_LIKE>like)|(?P<t_NOT>not)|(?P<t_AND>and)|(?P<t_OR>or)|(?P<t_INSERT>insert)|(?P<t_VALUES>values)|(?P<t_UPDATE>update)|(?P<t_SET>set)|(?P<t_DELETE>delete)|(?P<t_DESC>desc)|(?P<t_ASC>asc)|(?P<t_LIMIT>limit)|(?P<t_TAIL>tail)|(?P<t_SIMPLE_COLNAME>(([_A-Za-z])(([0-9])|([_A-Za-z])|\\.)*))|(?P<t_BRACKETED_COLNAME>\\[([_A-Za-z][ _A-Za-z0-9]*)\\])|(?P<t_COLNUMBER>\\[\\d+\\])|(?P<t_STRING>"([^"\\n])*")|(?P<t_FLOATNUMBER>[+-]?(?!0(\\.0+)?$)(\\d+\\.\\d*|\\.\\d+))|(?P<t_NEGATIVE_INTNUMBER>-[1-9]\\d*)|(?P<t_POSITIVE_INTNUMBER>\\+?\\d+)|(?P<t_DATASOURCE>\\{[^,{}\\[]+\\})|(?P<t_newline>\\n+)|(?P<t_ignore_COMMENT>/\\*([^*]|\\*(?!/))*\\*/)|(?P<t_NOTEQUAL><>|!=)|(?P<t_BIGGER_EQUAL>>=)|(?P<t_EQUAL>==)|(?P<t_LPAREN>\\()|(?P<t_PLUS>\\+)|(?P<t_POWER>\\^)|(?P<t_RPAREN>\\))|(?P<t_SMALLER_EQUAL><=)|(?P<t_TIMES>\\*)|(?P<t_BIGGER>>)|(?P<t_COMMA>,)|(?P<t_DIVIDE>/)|(?P<t_MINUS>-)|(?P<t_PERCENT>%)|(?P<t_SIMICOLON>;)|(?P<t_SMALLER><)', [None, ('t_SELECT', 'SELECT'), ('t_DISTINCT', 'DISTINCT'), ('t_FROM', 'FROM'), ('t_INTO', 'INTO'), ('t_AS', 'AS'), ('t_INNER', 'INNER'), ('t_LEFT', 'LEFT'), ('t_RIGHT', 'RIGHT'), ('t_FULL', 'FULL'), ('t_OUTER', 'OUTER'), ('t_SEMI', 'SEMI'), ('t_ANTI', 'ANTI'), ('t_JOIN', 'JOIN'), ('t_ON', 'ON'), ('t_GROUP', 'GROUP'), ('t_AGGREGATION_FUNCTION', 'AGGREGATION_FUNCTION'), ('t_ORDER', 'ORDER'), ('t_BY', 'BY'), ('t_WHERE', 'WHERE'), ('t_LIKE', 'LIKE'), ('t_NOT', 'NOT'), ('t_AND', 'AND'), ('t_OR', 'OR'), ('t_INSERT', 'INSERT'), ('t_VALUES', 'VALUES'), ('t_UPDATE', 'UPDATE'), ('t_SET', 'SET'), ('t_DELETE', 'DELETE'), ('t_DESC', 'DESC'), ('t_ASC', 'ASC'), ('t_LIMIT', 'LIMIT'), ('t_TAIL', 'TAIL'), ('t_SIMPLE_COLNAME', 'SIMPLE_COLNAME'), None, None, None, None, None, ('t_BRACKETED_COLNAME', 'BRACKETED_COLNAME'), None, ('t_COLNUMBER', 'COLNUMBER'), ('t_STRING', 'STRING'), None, ('t_FLOATNUMBER', 'FLOATNUMBER'), None, None, ('t_NEGATIVE_INTNUMBER', 'NEGATIVE_INTNUMBER'), ('t_POSITIVE_INTNUMBER', 'POSITIVE_INTNUMBER'), ('t_DATASOURCE', 'DATASOURCE'), ('t_newline', 'newline'), (None, None), None, (None, 'NOTEQUAL'), (None, 'BIGGER_EQUAL'), (None, 'EQUAL'), (None, 'LPAREN'), (None, 'PLUS'), (None, 'POWER'), (None, 'RPAREN'), (None, 'SMALLER_EQUAL'), (None, 'TIMES'), (None, 'BIGGER'), (None, 'COMMA'), (None, 'DIVIDE'), (None, 'MINUS'), (None, 'PERCENT'), (None, 'SIMICOLON'), (None, 'SMALLER')])]}
+_lexstateignore = {'INITIAL': ' \t'}
+_lexstateerrorf = {'INITIAL': 't_error'}
+_lexstateeoff = {}
+_signature = 'b77f2b84ee26d1a09147353e60f1c9784d1e50cd1ac657010a9a5a48258d0828'
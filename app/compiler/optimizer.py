@@ -0,0 +1,287 @@
+from app.compiler.conditions import is_const, optimize_conditions
+from app.compiler.plan import (
+    Aggregate,
+    Filter,
+    Join,
+    KeyLink,
+    Limit,
+    Load,
+    PlanNode,
+    Project,
+    Scan,
+    Sort,
+    join_chain,
+    join_scans,
+)
+from app.compiler.pushdown import (
+    UnknownColumns,
+    add_condition_columns,
+    conjunction,
+    conjuncts,
+    is_column_reference,
+    pushable_limit,
+    referenced_columns,
+    source_columns,
+    source_condition,
+    split_pushable_conditions,
+    sql_condition,
+    sql_sources_like_support,
+)
+
+
+class SelectParts:
+    """The nodes of a SELECT plan by their role, None for the missing ones."""
+
+    def __init__(self, plan: PlanNode):
+        self.load: Load | None = None
+        self.limit: Limit | None = None
+        self.project: Project | None = None
+        self.sort: Sort | None = None
+        self.aggregate: Aggregate | None = None
+        self.filter: Filter | None = None
+        node = plan
+        while not isinstance(node, (Scan, Join)):
+            if isinstance(node, Load):
+                self.load = node
+            elif isinstance(node, Limit):
+                self.limit = node
+            elif isinstance(node, Project):
+                self.project = node
+            elif isinstance(node, Sort):
+                self.sort = node
+            elif isinstance(node, Aggregate):
+                self.aggregate = node
+            elif isinstance(node, Filter):
+                self.filter = node
+            node = node.child
+        self.source: Scan | Join = node
+
+    @property
+    def where(self) -> dict | None:
+        return self.filter.condition if self.filter else None
+
+    @property
+    def group(self) -> list[str] | None:
+        return self.aggregate.group_by if self.aggregate else None
+
+    @property
+    def order(self):
+        return self.sort.order if self.sort else None
+
+    @property
+    def limit_or_tail(self) -> tuple[str, int] | None:
+        return (self.limit.operator, self.limit.number) if self.limit else None
+
+
+def remove_filter(plan: PlanNode, filter_node: Filter) -> PlanNode:
+    """Returns the plan without the given filter node, its child takes its place."""
+    if plan is filter_node:
+        return filter_node.child
+    node = plan
+    while node.child is not filter_node:
+        node = node.child
+    node.child = filter_node.child
+    return plan
+
+
+def push_into_scan(plan: PlanNode, parts: SelectParts) -> PlanNode:
+    scan: Scan = parts.source
+    # the conditions the database can evaluate are run inside it
+    pushed_filters, residual = split_pushable_conditions(
+        parts.where, scan.source_type, scan.alias
+    )
+    if pushed_filters:
+        scan.filters = pushed_filters
+        if residual:
+            parts.filter.condition = residual
+        else:
+            plan = remove_filter(plan, parts.filter)
+            parts.filter = None
+
+    columns = referenced_columns(
+        parts.project.columns, parts.where, parts.group, parts.order
+    )
+    scan.columns = source_columns(columns, scan.alias)
+    # stop reading the source as soon as the LIMIT is reached
+    scan.limit = pushable_limit(
+        parts.project.columns,
+        parts.project.distinct,
+        parts.where,
+        parts.group,
+        parts.order,
+        parts.limit_or_tail,
+    )
+    return plan
+
+
+def filterable_scans(join: Join) -> list[Scan]:
+    """
+    The scans of a join whose rows can be filtered before joining them. The
+    rows of the other scans may be null-extended by an outer join (or their
+    columns are not in the result of a semi or anti join), so filtering them
+    first would keep rows the WHERE removes.
+    """
+    scans, joins = join_scans(join), join_chain(join)
+    filterable = []
+    for index, scan in enumerate(scans):
+        # the i-th scan is the right side of the (i - 1)-th join (but the first
+        # scan) and in the left side of the joins from the i-th one on
+        if index and joins[index - 1].join_type in ("left", "outer", "semi", "anti"):
+            continue
+        if any(later.join_type in ("right", "outer") for later in joins[index:]):
+            continue
+        filterable.append(scan)
+    return filterable
+
+
+def owning_scan(columns: list[str], scans: list[Scan]) -> Scan | None:
+    """The only scan of a join that has all the given columns, if any."""
+    if not columns:
+        return None
+    owners = []
+    for scan in scans:
+        other_aliases = [other.alias for other in scans if other is not scan]
+        owned = source_columns(columns, scan.alias, other_aliases)
+        if owned is not None and len(owned) == len(columns):
+            owners.append(scan)
+    return owners[0] if len(owners) == 1 else None
+
+
+def condition_owning_scan(condition: dict, scans: list[Scan]) -> Scan | None:
+    columns: dict[str, None] = {}
+    try:
+        add_condition_columns(columns, condition)
+    except UnknownColumns:
+        return None
+    return owning_scan(list(columns), scans)
+
+
+def push_filters_below_join(plan: PlanNode, parts: SelectParts) -> PlanNode:
+    """
+    Moves the WHERE conjuncts that reference the columns of a single scan of a
+    join into the scan's filters, so the rows they remove are never joined:
+    a database runs them as SQL and the other sources are filtered right after
+    extraction (see `etl.extract`).
+    """
+    join: Join = parts.source
+    scans = join_scans(join)
+    filterable = filterable_scans(join)
+    residual = []
+    for condition in conjuncts(parts.where):
+        scan = condition_owning_scan(condition, scans)
+        if scan is None or scan not in filterable:
+            residual.append(condition)
+            continue
+        try:
+            if scan.source_type.lower() in sql_sources_like_support:
+                pushed = sql_condition(condition, scan.source_type, scan.alias)
+            else:
+                pushed = source_condition(condition, scan.alias)
+        except UnknownColumns:
+            residual.append(condition)
+            continue
+        scan.filters = conjunction([scan.filters, pushed] if scan.filters else [pushed])
+    if residual:
+        parts.filter.condition = conjunction(residual)
+    else:
+        plan = remove_filter(plan, parts.filter)
+        parts.filter = None
+    return plan
+
+
+def key_links(join: Join) -> list[KeyLink]:
+    """
+    The key equalities between two scans of a join, along which the rows of a
+    large scan can be reduced at execution to the keys of a small one.
+
+    The side of a join whose rows are kept without a match (the left side of
+    a LEFT or an anti join, both sides of a FULL join...) can't be reduced.
+    In a chain of joins the rows of a scan can be null-extended by any of the
+    later joins, so only the chains of inner joins are reduced.
+    """
+    scans, joins = join_scans(join), join_chain(join)
+    if len(joins) > 1 and any(node.join_type != "inner" for node in joins):
+        return []
+    links = []
+    for node in joins:
+        reduce_left = node.join_type in ("inner", "semi", "right")
+        reduce_right = node.join_type in ("inner", "semi", "anti", "left")
+        for condition in conjuncts(node.condition):
+            if condition["type"] != "==" or not (
+                is_column_reference(condition["left"])
+                and is_column_reference(condition["right"])
+            ):
+                continue
+            left = owning_scan([condition["left"]], scans)
+            right = owning_scan([condition["right"]], scans)
+            if left is None or right is None or left is right:
+                continue
+            if len(joins) == 1 and left is not scans[0]:
+                # written as `right.key == left.key`
+                left, right = right, left
+                condition = {"left": condition["right"], "right": condition["left"]}
+            keys = []
+            for scan, column in (
+                (left, condition["left"]),
+                (right, condition["right"]),
+            ):
+                other_aliases = [other.alias for other in scans if other is not scan]
+                keys.append(source_columns([column], scan.alias, other_aliases)[0])
+            links.append(
+                KeyLink(
+                    scans.index(left),
+                    keys[0],
+                    scans.index(right),
+                    keys[1],
+                    reduce_left,
+                    reduce_right,
+                )
+            )
+    return links
+
+
+def push_into_join(plan: PlanNode, parts: SelectParts) -> PlanNode:
+    join: Join = parts.source
+    if parts.filter:
+        plan = push_filters_below_join(plan, parts)
+    join.key_links = key_links(join)
+    # the columns of the pushed filters are read by the scans themselves
+    join_condition = conjunction([node.condition for node in join_chain(join)])
+    columns = referenced_columns(
+        parts.project.columns, parts.where, parts.group, parts.order, join_condition
+    )
+    scans = join_scans(join)
+    for scan in scans:
+        other_aliases = [other.alias for other in scans if other is not scan]
+        scan.columns = source_columns(columns, scan.alias, other_aliases)
+    return plan
+
+
+def simplify_filter(plan: PlanNode, parts: SelectParts) -> PlanNode:
+    if not parts.filter:
+        return plan
+    condition = optimize_conditions(parts.filter.condition)
+    if is_const(condition, True):
+        filter_node, parts.filter = parts.filter, None
+        return remove_filter(plan, filter_node)
+    parts.filter.condition = condition
+    return plan
+
+
+def optimize(plan: PlanNode) -> PlanNode:
+    """
+    Rewrites a SELECT plan into an equivalent one that reads and processes less
+    data: the WHERE conditions are simplified (see `optimize_conditions`), then
+    the work that can be done while extracting (the referenced columns, the
+    conditions a database can evaluate and the LIMIT) is pushed into the scans.
+    Below a join, the WHERE conditions on a single source filter that source
+    before the join, and the key equalities between the sources are recorded
+    so a large source can be reduced to the keys of a small one.
+
+    The given plan is modified in place and returned.
+    """
+    parts = SelectParts(plan)
+    plan = simplify_filter(plan, parts)
+    if isinstance(parts.source, Scan):
+        return push_into_scan(plan, parts)
+    return push_into_join(plan, parts)
@@ -0,0 +1,144 @@
+
+# parsetab.py
+# This file is automatically generated. Do not edit.
+# pylint: disable=W,C,R
+_tabversion = '3.10'
+
+_lr_method = 'LALR'
+
+_lr_signature = 'startAGGREGATION_FUNCTION AND ANTI AS ASC BIGGER BIGGER_EQUAL BRACKETED_COLNAME BY COLNUMBER COMMA DATASOURCE DELETE DESC DISTINCT DIVIDE EQUAL FLOATNUMBER FROM FULL GROUP INNER INSERT INTO JOIN LEFT LIKE LIMIT LPAREN MINUS NEGATIVE_INTNUMBER NOT NOTEQUAL ON OR ORDER OUTER PATTERN PERCENT PLUS POSITIVE_INTNUMBER POWER RIGHT RPAREN SELECT SEMI SET SIMICOLON SIMPLE_COLNAME SMALLER SMALLER_EQUAL STRING TAIL TIMES UPDATE VALUES WHEREstart : select\n    | insert\n    | update\n    | deleteempty :select : SELECT distinct select_columns into_statement from_statement where group order limit_or_tail SIMICOLONinsert : INSERT INTO DATASOURCE icolumn VALUES insert_values SIMICOLONupdate : UPDATE DATASOURCE SET assigns where SIMICOLONdelete : DELETE FROM DATASOURCE wherelogical :  EQUAL\n    | NOTEQUAL\n    | BIGGER_EQUAL\n    | BIGGER\n    | SMALLER_EQUAL\n    | SMALLERwhere : WHERE conditionswhere : emptyconditions : LPAREN conditions RPARENconditions : conditions AND conditions\n    | conditions OR conditions\n    | exp LIKE STRING\n    | exp logical expconditions : NOT conditionsexp : column\n    | STRING\n    | NUMBERNUMBER : NEGATIVE_INTNUMBER\n    | POSITIVE_INTNUMBER\n    | FLOATNUMBERdistinct : DISTINCTdistinct : emptycolumn : COLNUMBER\n    | BRACKETED_COLNAME\n    | SIMPLE_COLNAMEcolumns : columns COMMA columnscolumns : select_unitselect_unit : columnselect_unit : AGGREGATION_FUNCTION LPAREN column RPAREN\n    | AGGREGATION_FUNCTION LPAREN TIMES RPARENselect_unit : column AS SIMPLE_COLNAMEselect_unit : AGGREGATION_FUNCTION LPAREN column RPAREN AS SIMPLE_COLNAME\n    | AGGREGATION_FUNCTION LPAREN TIMES RPAREN AS SIMPLE_COLNAMEarith : LPAREN arith RPARENarith : column\n    | NUMBERarith : arith PLUS arith\n    | arith MINUS arith\n    | arith TIMES arith\n    | arith DIVIDE arith\n    | arith PERCENT arith\n    | arith POWER aritharith : SIMPLE_COLNAME LPAREN arith RPARENselect_unit : arithselect_unit : arith AS SIMPLE_COLNAMEaggregation_function : AGGREGATION_FUNCTION LPAREN column RPAREN\n    | AGGREGATION_FUNCTION LPAREN TIMES RPARENselect_columns : TIMESselect_columns : columnsinto_statement : INTO DATASOURCEinto_statement : emptygroup : GROUP BY icolumnsgroup : emptyfrom_statement : FROM datasource_aliasdatasource_alias : DATASOURCEdatasource_alias : DATASOURCE AS SIMPLE_COLNAMEdatasource_alias : DATASOURCE SIMPLE_COLNAMEfrom_statement : FROM datasource_alias join_clausesjoin_clauses : join_clauses join_clausejoin_clauses : join_clausejoin_clause : join_type JOIN datasource_alias ON conditionsjoin_type : INNER\n    | emptyjoin_type : LEFT\n    | LEFT OUTER\n    | RIGHT\n    | RIGHT OUTERjoin_type : FULL\n    | FULL OUTERjoin_type : LEFT SEMI\n    | LEFT ANTIsimple_column_name : SIMPLE_COLNAMEbracketed_column_name : BRACKETED_COLNAMEcolumn_index : COLNUMBERcustom_column : bracketed_column_name\n    | simple_column_name\n    | column_indexcustom_aggregation_column : AGGREGATION_FUNCTION LPAREN custom_column RPAREN\n    | AGGREGATION_FUNCTION LPAREN TIMES RPARENorder_by_param : custom_aggregation_column way\n    | custom_column wayorder_by_parameters : order_by_paramorder_by_parameters : order_by_parameters COMMA order_by_parametersorder : ORDER BY order_by_parametersorder : emptyway : ASC\n    | emptyway : DESClimit_or_tail : LIMIT POSITIVE_INTNUMBER\n    | TAIL POSITIVE_INTNUMBERlimit_or_tail : emptyvalue : STRING\n    | NUMBERvalues : values COMMA valuesvalues : valuesingle_values : LPAREN values RPARENinsert_values : insert_values COMMA insert_valuesinsert_values : single_valuesicolumn : LPAREN icolumns RPARENicolumn : emptyicolumns : icolumns COMMA icolumnsicolumns : columnassign : column EQUAL valueassigns : assign COMMA assignsassigns : assign'
+    
+_lr_action_items = {'SELECT':([0,],[6,]),'INSERT':([0,],[7,]),'UPDATE':([0,],[8,]),'DELETE':([0,],[9,]),'$end':([1,2,3,4,5,25,26,28,29,30,33,57,58,60,83,86,88,89,101,117,133,138,139,140,141,142,168,],[0,-1,-2,-3,-4,-32,-33,-27,-28,-29,-5,-34,-9,-17,-16,-25,-24,-26,-8,-23,-7,-19,-20,-18,-21,-22,-6,]),'DISTINCT':([6,],[11,]),'TIMES':([6,10,11,12,20,23,24,25,26,27,28,29,30,39,40,41,42,68,69,71,72,73,74,75,76,95,189,],[-5,17,-30,-31,-44,-34,47,-32,-33,-45,-27,-28,-29,67,47,-44,-34,-43,47,47,47,47,47,47,47,-52,193,]),'AGGREGATION_FUNCTION':([6,10,11,12,37,164,183,],[-5,21,-30,-31,21,175,175,]),'COLNUMBER':([6,10,11,12,22,32,37,39,43,45,46,47,48,49,50,52,59,81,84,87,100,106,107,110,111,112,113,114,115,116,146,164,182,183,189,],[-5,25,-30,-31,25,25,25,25,25,25,25,25,25,25,25,25,25,25,25,25,25,25,25,25,-10,-11,-12,-13,-14,-15,25,181,25,181,181,]),'BRACKETED_COLNAME':([6,10,11,12,22,32,37,39,43,45,46,47,48,49,50,52,59,81,84,87,100,106,107,110,111,112,113,114,115,116,146,164,182,183,189,],[-5,26,-30,-31,26,26,26,26,26,26,26,26,26,26,26,26,26,26,26,26,26,26,26,26,-10,-11,-12,-13,-14,-15,26,179,26,179,179,]),'SIMPLE_COLNAME':([6,10,11,12,22,32,37,38,39,43,44,45,46,47,48,49,50,52,59,81,84,87,92,100,106,107,110,111,112,113,114,115,116,129,131,132,146,164,182,183,189,],[-5,23,-30,-31,42,57,23,65,57,42,70,42,42,42,42,42,42,57,57,57,57,57,130,57,57,57,57,-10,-11,-12,-13,-14,-15,154,155,156,57,180,57,180,180,]),'LPAREN':([6,10,11,12,21,22,23,31,37,42,43,45,46,47,48,49,50,59,77,84,87,106,107,134,175,182,],[-5,22,-30,-31,39,22,43,52,22,43,22,22,22,22,22,22,22,84,98,84,84,84,84,98,189,84,]),'NEGATIVE_INTNUMBER':([6,10,11,12,22,37,43,45,46,47,48,49,50,59,82,84,87,98,106,107,110,111,112,113,114,115,116,159,182,],[-5,28,-30,-31,28,28,28,28,28,28,28,28,28,28,28,28,28,28,28,28,28,-10,-11,-12,-13,-14,-15,28,28,]),'POSITIVE_INTNUMBER':([6,10,11,12,22,37,43,45,46,47,48,49,50,59,82,84,87,98,106,107,110,111,112,113,114,115,116,159,161,162,182,],[-5,29,-30,-31,29,29,29,29,29,29,29,29,29,29,29,29,29,29,29,29,29,-10,-11,-12,-13,-14,-15,29,169,170,29,]),'FLOATNUMBER':([6,10,11,12,22,37,43,45,46,47,48,49,50,59,82,84,87,98,106,107,110,111,112,113,114,115,116,159,182,],[-5,30,-30,-31,30,30,30,30,30,30,30,30,30,30,30,30,30,30,30,30,30,-10,-11,-12,-13,-14,-15,30,30,]),'INTO':([7,16,17,18,19,20,23,24,25,26,27,28,29,30,41,42,64,65,68,70,71,72,73,74,75,76,93,94,95,155,156,],[13,35,-57,-58,-36,-37,-34,-53,-32,-33,-45,-27,-28,-29,-44,-34,-35,-40,-43,-54,-46,-47,-48,-49,-50,-51,-38,-39,-52,-41,-42,]),'DATASOURCE':([8,13,15,35,62,148,],[14,31,33,63,92,92,]),'FROM':([9,16,17,18,19,20,23,24,25,26,27,28,29,30,34,36,41,42,63,64,65,68,70,71,72,73,74,75,76,93,94,95,155,156,],[15,-5,-57,-58,-36,-37,-34,-53,-32,-33,-45,-27,-28,-29,62,-60,-44,-34,-59,-35,-40,-43,-54,-46,-47,-48,-49,-50,-51,-38,-39,-52,-41,-42,]),'SET':([14,],[32,]),'COMMA':([18,19,20,23,24,25,26,27,28,29,30,41,42,55,57,64,65,68,70,71,72,73,74,75,76,78,79,93,94,95,96,97,103,104,105,135,136,137,155,156,157,158,165,167,171,172,173,174,176,177,178,179,180,181,184,185,186,187,188,191,194,195,],[37,-36,-37,-34,-53,-32,-33,-45,-27,-28,-29,-44,-34,81,-34,37,-40,-43,-54,-46,-47,-48,-49,-50,-51,100,-111,-38,-39,-52,134,-107,-112,-101,-102,159,-104,100,-41,-42,134,-105,100,159,183,-91,-5,-5,-84,-85,-86,-82,-81,-83,-89,-95,-96,-97,-90,183,-87,-88,]),'AS':([20,23,24,25,26,27,28,29,30,41,42,68,71,72,73,74,75,76,92,93,94,95,],[38,-34,44,-32,-33,-45,-27,-28,-29,-44,-34,-43,-46,-47,-48,-49,-50,-51,129,131,132,-52,]),'PLUS':([20,23,24,25,26,27,28,29,30,40,41,42,68,69,71,72,73,74,75,76,95,],[-44,-34,45,-32,-33,-45,-27,-28,-29,45,-44,-34,-43,45,45,45,45,45,45,45,-52,]),'MINUS':([20,23,24,25,26,27,28,29,30,40,41,42,68,69,71,72,73,74,75,76,95,],[-44,-34,46,-32,-33,-45,-27,-28,-29,46,-44,-34,-43,46,46,46,46,46,46,46,-52,]),'DIVIDE':([20,23,24,25,26,27,28,29,30,40,41,42,68,69,71,72,73,74,75,76,95,],[-44,-34,48,-32,-33,-45,-27,-28,-29,48,-44,-34,-43,48,48,48,48,48,48,48,-52,]),'PERCENT':([20,23,24,25,26,27,28,29,30,40,41,42,68,69,71,72,73,74,75,76,95,],[-44,-34,49,-32,-33,-45,-27,-28,-29,49,-44,-34,-43,49,49,49,49,49,49,49,-52,]),'POWER':([20,23,24,25,26,27,28,29,30,40,41,42,68,69,71,72,73,74,75,76,95,],[-44,-34,50,-32,-33,-45,-27,-28,-29,50,-44,-34,-43,50,50,50,50,50,50,50,-52,]),'RPAREN':([25,26,27,28,29,30,40,41,42,57,66,67,68,69,71,72,73,74,75,76,78,79,86,88,89,95,104,105,108,117,135,136,137,138,139,140,141,142,167,176,177,178,179,180,181,192,193,],[-32,-33,-45,-27,-28,-29,68,-44,-34,-34,93,94,-43,95,-46,-47,-48,-49,-50,-51,99,-111,-25,-24,-26,-52,-101,-102,140,-23,158,-104,-110,-19,-20,-18,-21,-22,-103,-84,-85,-86,-82,-81,-83,194,195,]),'EQUAL':([25,26,28,29,30,56,57,85,86,88,89,],[-32,-33,-27,-28,-29,82,-34,111,-25,-24,-26,]),'LIKE':([25,26,28,29,30,57,85,86,88,89,],[-32,-33,-27,-28,-29,-34,109,-25,-24,-26,]),'NOTEQUAL':([25,26,28,29,30,57,85,86,88,89,],[-32,-33,-27,-28,-29,-34,112,-25,-24,-26,]),'BIGGER_EQUAL':([25,26,28,29,30,57,85,86,88,89,],[-32,-33,-27,-28,-29,-34,113,-25,-24,-26,]),'BIGGER':([25,26,28,29,30,57,85,86,88,89,],[-32,-33,-27,-28,-29,-34,114,-25,-24,-26,]),'SMALLER_EQUAL':([25,26,28,29,30,57,85,86,88,89,],[-32,-33,-27,-28,-29,-34,115,-25,-24,-26,]),'SMALLER':([25,26,28,29,30,57,85,86,88,89,],[-32,-33,-27,-28,-29,-34,116,-25,-24,-26,]),'ORDER':([25,26,28,29,30,57,60,61,79,83,86,88,89,90,91,92,117,118,120,121,122,130,137,138,139,140,141,142,147,154,165,190,],[-32,-33,-27,-28,-29,-34,-17,-5,-111,-16,-25,-24,-26,-5,-63,-64,-23,144,-62,-67,-69,-66,-110,-19,-20,-18,-21,-22,-68,-65,-61,-70,]),'LIMIT':([25,26,28,29,30,57,60,61,79,83,86,88,89,90,91,92,117,118,120,121,122,130,137,138,139,140,141,142,143,145,147,154,165,171,172,173,174,176,177,178,179,180,181,184,185,186,187,188,190,191,194,195,],[-32,-33,-27,-28,-29,-34,-17,-5,-111,-16,-25,-24,-26,-5,-63,-64,-23,-5,-62,-67,-69,-66,-110,-19,-20,-18,-21,-22,161,-94,-68,-65,-61,-93,-91,-5,-5,-84,-85,-86,-82,-81,-83,-89,-95,-96,-97,-90,-70,-92,-87,-88,]),'TAIL':([25,26,28,29,30,57,60,61,79,83,86,88,89,90,91,92,117,118,120,121,122,130,137,138,139,140,141,142,143,145,147,154,165,171,172,173,174,176,177,178,179,180,181,184,185,186,187,188,190,191,194,195,],[-32,-33,-27,-28,-29,-34,-17,-5,-111,-16,-25,-24,-26,-5,-63,-64,-23,-5,-62,-67,-69,-66,-110,-19,-20,-18,-21,-22,162,-94,-68,-65,-61,-93,-91,-5,-5,-84,-85,-86,-82,-81,-83,-89,-95,-96,-97,-90,-70,-92,-87,-88,]),'SIMICOLON':([25,26,28,29,30,54,55,57,60,61,79,80,83,86,88,89,90,91,92,96,97,102,103,104,105,117,118,120,121,122,130,137,138,139,140,141,142,143,145,147,154,157,158,160,163,165,169,170,171,172,173,174,176,177,178,179,180,181,184,185,186,187,188,190,191,194,195,],[-32,-33,-27,-28,-29,-5,-114,-34,-17,-5,-111,101,-16,-25,-24,-26,-5,-63,-64,133,-107,-113,-112,-101,-102,-23,-5,-62,-67,-69,-66,-110,-19,-20,-18,-21,-22,-5,-94,-68,-65,-106,-105,168,-100,-61,-98,-99,-93,-91,-5,-5,-84,-85,-86,-82,-81,-83,-89,-95,-96,-97,-90,-70,-92,-87,-88,]),'AND':([25,26,28,29,30,57,83,86,88,89,108,117,138,139,140,141,142,190,],[-32,-33,-27,-28,-29,-34,106,-25,-24,-26,106,106,106,106,-18,-21,-22,106,]),'OR':([25,26,28,29,30,57,83,86,88,89,108,117,138,139,140,141,142,190,],[-32,-33,-27,-28,-29,-34,107,-25,-24,-26,107,107,107,107,-18,-21,-22,107,]),'GROUP':([25,26,28,29,30,57,60,61,83,86,88,89,90,91,92,117,121,122,130,138,139,140,141,142,147,154,190,],[-32,-33,-27,-28,-29,-34,-17,-5,-16,-25,-24,-26,119,-63,-64,-23,-67,-69,-66,-19,-20,-18,-21,-22,-68,-65,-70,]),'INNER':([25,26,28,29,30,57,86,88,89,91,92,117,121,122,130,138,139,140,141,142,147,154,190,],[-32,-33,-27,-28,-29,-34,-25,-24,-26,124,-64,-23,124,-69,-66,-19,-20,-18,-21,-22,-68,-65,-70,]),'LEFT':([25,26,28,29,30,57,86,88,89,91,92,117,121,122,130,138,139,140,141,142,147,154,190,],[-32,-33,-27,-28,-29,-34,-25,-24,-26,126,-64,-23,126,-69,-66,-19,-20,-18,-21,-22,-68,-65,-70,]),'RIGHT':([25,26,28,29,30,57,86,88,89,91,92,117,121,122,130,138,139,140,141,142,147,154,190,],[-32,-33,-27,-28,-29,-34,-25,-24,-26,127,-64,-23,127,-69,-66,-19,-20,-18,-21,-22,-68,-65,-70,]),'FULL':([25,26,28,29,30,57,86,88,89,91,92,117,121,122,130,138,139,140,141,142,147,154,190,],[-32,-33,-27,-28,-29,-34,-25,-24,-26,128,-64,-23,128,-69,-66,-19,-20,-18,-21,-22,-68,-65,-70,]),'JOIN':([25,26,28,29,30,57,86,88,89,91,92,117,121,122,123,124,125,126,127,128,130,138,139,140,141,142,147,149,150,151,152,153,154,190,],[-32,-33,-27,-28,-29,-34,-25,-24,-26,-5,-64,-23,-5,-69,148,-71,-72,-73,-75,-77,-66,-19,-20,-18,-21,-22,-68,-74,-79,-80,-76,-78,-65,-70,]),'WHERE':([25,26,28,29,30,33,54,55,57,61,86,88,89,91,92,102,103,104,105,117,121,122,130,138,139,140,141,142,147,154,190,],[-32,-33,-27,-28,-29,59,59,-114,-34,59,-25,-24,-26,-63,-64,-113,-112,-101,-102,-23,-67,-69,-66,-19,-20,-18,-21,-22,-68,-65,-70,]),'VALUES':([31,51,53,99,],[-5,77,-109,-108,]),'NOT':([59,84,87,106,107,182,],[87,87,87,87,87,87,]),'STRING':([59,82,84,87,98,106,107,109,110,111,112,113,114,115,116,159,182,],[86,104,86,86,104,86,86,141,86,-10,-11,-12,-13,-14,-15,104,86,]),'ON':([92,130,154,166,],[-64,-66,-65,182,]),'BY':([119,144,],[146,164,]),'OUTER':([126,127,128,],[149,152,153,]),'SEMI':([126,],[150,]),'ANTI':([126,],[151,]),'ASC':([173,174,176,177,178,179,180,181,194,195,],[185,185,-84,-85,-86,-82,-81,-83,-87,-88,]),'DESC':([173,174,176,177,178,179,180,181,194,195,],[187,187,-84,-85,-86,-82,-81,-83,-87,-88,]),}
+
+_lr_action = {}
+for _k, _v in _lr_action_items.items():
+   for _x,_y in zip(_v[0],_v[1]):
+      if not _x in _lr_action:  _lr_action[_x] = {}
+      _lr_action[_x][_k] = _y
+del _lr_action_items
+
+_lr_goto_items = {'start':([0,],[1,]),'select':([0,],[2,]),'insert':([0,],[3,]),'update':([0,],[4,]),'delete':([0,],[5,]),'distinct':([6,],[10,]),'empty':([6,16,31,33,54,61,90,91,118,121,143,173,174,],[12,36,53,60,60,60,120,125,145,125,163,186,186,]),'select_columns':([10,],[16,]),'columns':([10,37,],[18,64,]),'select_unit':([10,37,],[19,19,]),'column':([10,22,32,37,39,43,45,46,47,48,49,50,52,59,81,84,87,100,106,107,110,146,182,],[20,41,56,20,66,41,41,41,41,41,41,41,79,88,56,88,88,79,88,88,88,79,88,]),'arith':([10,22,37,43,45,46,47,48,49,50,],[24,40,24,69,71,72,73,74,75,76,]),'NUMBER':([10,22,37,43,45,46,47,48,49,50,59,82,84,87,98,106,107,110,159,182,],[27,27,27,27,27,27,27,27,27,27,89,105,89,89,105,89,89,89,105,89,]),'into_statement':([16,],[34,]),'icolumn':([31,],[51,]),'assigns':([32,81,],[54,102,]),'assign':([32,81,],[55,55,]),'where':([33,54,61,],[58,80,90,]),'from_statement':([34,],[61,]),'icolumns':([52,100,146,],[78,137,165,]),'conditions':([59,84,87,106,107,182,],[83,108,117,138,139,190,]),'exp':([59,84,87,106,107,110,182,],[85,85,85,85,85,142,85,]),'datasource_alias':([62,148,],[91,166,]),'insert_values':([77,134,],[96,157,]),'single_values':([77,134,],[97,97,]),'value':([82,98,159,],[103,136,136,]),'logical':([85,],[110,]),'group':([90,],[118,]),'join_clauses':([91,],[121,]),'join_clause':([91,121,],[122,147,]),'join_type':([91,121,],[123,123,]),'values':([98,159,],[135,167,]),'order':([118,],[143,]),'limit_or_tail':([143,],[160,]),'order_by_parameters':([164,183,],[171,191,]),'order_by_param':([164,183,],[172,172,]),'custom_aggregation_column':([164,183,],[173,173,]),'custom_column':([164,183,189,],[174,174,192,]),'bracketed_column_name':([164,183,189,],[176,176,176,]),'simple_column_name':([164,183,189,],[177,177,177,]),'column_index':([164,183,189,],[178,178,178,]),'way':([173,174,],[184,188,]),}
+
+_lr_goto = {}
+for _k, _v in _lr_goto_items.items():
+   for _x, _y in zip(_v[0], _v[1]):
+       if not _x in _lr_goto: _lr_goto[_x] = {}
+       _lr_goto[_x][_k] = _y
+del _lr_goto_items
+_lr_productions = [
+  ("S' -> start","S'",1,None,None,None),
+  ('start -> select','start',1,'p_start','yacc.py',19),
+  ('start -> insert','start',1,'p_start','yacc.py',20),
+  ('start -> update','start',1,'p_start','yacc.py',21),
+  ('start -> delete','start',1,'p_start','yacc.py',22),
+  ('empty -> <empty>','empty',0,'p_empty','yacc.py',27),
+  ('select -> SELECT distinct select_columns into_statement from_statement where group order limit_or_tail SIMICOLON','select',10,'p_select','yacc.py',51),
+  ('insert -> INSERT INTO DATASOURCE icolumn VALUES insert_values SIMICOLON','insert',7,'p_insert','yacc.py',70),
+  ('update -> UPDATE DATASOURCE SET assigns where SIMICOLON','update',6,'p_update','yacc.py',88),
+  ('delete -> DELETE FROM DATASOURCE where','delete',4,'p_delete','yacc.py',98),
+  ('logical -> EQUAL','logical',1,'p_logical','yacc.py',108),
+  ('logical -> NOTEQUAL','logical',1,'p_logical','yacc.py',109),
+  ('logical -> BIGGER_EQUAL','logical',1,'p_logical','yacc.py',110),
+  ('logical -> BIGGER','logical',1,'p_logical','yacc.py',111),
+  ('logical -> SMALLER_EQUAL','logical',1,'p_logical','yacc.py',112),
+  ('logical -> SMALLER','logical',1,'p_logical','yacc.py',113),
+  ('where -> WHERE conditions','where',2,'p_where','yacc.py',123),
+  ('where -> empty','where',1,'p_where_empty','yacc.py',128),
+  ('conditions -> LPAREN conditions RPAREN','conditions',3,'p_cond_parens','yacc.py',133),
+  ('conditions -> conditions AND conditions','conditions',3,'p_cond_3','yacc.py',138),
+  ('conditions -> conditions OR conditions','conditions',3,'p_cond_3','yacc.py',139),
+  ('conditions -> exp LIKE STRING','conditions',3,'p_cond_3','yacc.py',140),
+  ('conditions -> exp logical exp','conditions',3,'p_cond_3','yacc.py',141),
+  ('conditions -> NOT conditions','conditions',2,'p_conditions_not','yacc.py',146),
+  ('exp -> column','exp',1,'p_exp','yacc.py',156),
+  ('exp -> STRING','exp',1,'p_exp','yacc.py',157),
+  ('exp -> NUMBER','exp',1,'p_exp','yacc.py',158),
+  ('NUMBER -> NEGATIVE_INTNUMBER','NUMBER',1,'p_NUMBER','yacc.py',167),
+  ('NUMBER -> POSITIVE_INTNUMBER','NUMBER',1,'p_NUMBER','yacc.py',168),
+  ('NUMBER -> FLOATNUMBER','NUMBER',1,'p_NUMBER','yacc.py',169),
+  ('distinct -> DISTINCT','distinct',1,'p_distinct','yacc.py',179),
+  ('distinct -> empty','distinct',1,'p_distinct_empty','yacc.py',184),
+  ('column -> COLNUMBER','column',1,'p_column','yacc.py',192),
+  ('column -> BRACKETED_COLNAME','column',1,'p_column','yacc.py',193),
+  ('column -> SIMPLE_COLNAME','column',1,'p_column','yacc.py',194),
+  ('columns -> columns COMMA columns','columns',3,'p_columns','yacc.py',202),
+  ('columns -> select_unit','columns',1,'p_columns_base','yacc.py',209),
+  ('select_unit -> column','select_unit',1,'p_select_unit_col','yacc.py',214),
+  ('select_unit -> AGGREGATION_FUNCTION LPAREN column RPAREN','select_unit',4,'p_select_unit_agg','yacc.py',219),
+  ('select_unit -> AGGREGATION_FUNCTION LPAREN TIMES RPAREN','select_unit',4,'p_select_unit_agg','yacc.py',220),
+  ('select_unit -> column AS SIMPLE_COLNAME','select_unit',3,'p_select_unit_col_alias','yacc.py',232),
+  ('select_unit -> AGGREGATION_FUNCTION LPAREN column RPAREN AS SIMPLE_COLNAME','select_unit',6,'p_select_unit_agg_alias','yacc.py',237),
+  ('select_unit -> AGGREGATION_FUNCTION LPAREN TIMES RPAREN AS SIMPLE_COLNAME','select_unit',6,'p_select_unit_agg_alias','yacc.py',238),
+  ('arith -> LPAREN arith RPAREN','arith',3,'p_arith_paren','yacc.py',244),
+  ('arith -> column','arith',1,'p_arith_number_or_column','yacc.py',249),
+  ('arith -> NUMBER','arith',1,'p_arith_number_or_column','yacc.py',250),
+  ('arith -> arith PLUS arith','arith',3,'p_arith_binop','yacc.py',255),
+  ('arith -> arith MINUS arith','arith',3,'p_arith_binop','yacc.py',256),
+  ('arith -> arith TIMES arith','arith',3,'p_arith_binop','yacc.py',257),
+  ('arith -> arith DIVIDE arith','arith',3,'p_arith_binop','yacc.py',258),
+  ('arith -> arith PERCENT arith','arith',3,'p_arith_binop','yacc.py',259),
+  ('arith -> arith POWER arith','arith',3,'p_arith_binop','yacc.py',260),
+  ('arith -> SIMPLE_COLNAME LPAREN arith RPAREN','arith',4,'p_arith_func','yacc.py',269),
+  ('select_unit -> arith','select_unit',1,'p_select_unit_expr','yacc.py',275),
+  ('select_unit -> arith AS SIMPLE_COLNAME','select_unit',3,'p_select_unit_expr_alias','yacc.py',281),
+  ('aggregation_function -> AGGREGATION_FUNCTION LPAREN column RPAREN','aggregation_function',4,'p_aggregation_function','yacc.py',286),
+  ('aggregation_function -> AGGREGATION_FUNCTION LPAREN TIMES RPAREN','aggregation_function',4,'p_aggregation_function','yacc.py',287),
+  ('select_columns -> TIMES','select_columns',1,'p_select_columns_all','yacc.py',304),
+  ('select_columns -> columns','select_columns',1,'p_select_columns','yacc.py',309),
+  ('into_statement -> INTO DATASOURCE','into_statement',2,'p_into_statement','yacc.py',319),
+  ('into_statement -> empty','into_statement',1,'p_into_statement_empty','yacc.py',324),
+  ('group -> GROUP BY icolumns','group',3,'p_group','yacc.py',331),
+  ('group -> empty','group',1,'p_group_empty','yacc.py',336),
+  ('from_statement -> FROM datasource_alias','from_statement',2,'p_from_statement','yacc.py',341),
+  ('datasource_alias -> DATASOURCE','datasource_alias',1,'p_datasource_alias_plain','yacc.py',346),
+  ('datasource_alias -> DATASOURCE AS SIMPLE_COLNAME','datasource_alias',3,'p_datasource_alias_as','yacc.py',351),
+  ('datasource_alias -> DATASOURCE SIMPLE_COLNAME','datasource_alias',2,'p_datasource_alias_plainname','yacc.py',356),
+  ('from_statement -> FROM datasource_alias join_clauses','from_statement',3,'p_from_statement_join','yacc.py',361),
+  ('join_clauses -> join_clauses join_clause','join_clauses',2,'p_join_clauses','yacc.py',372),
+  ('join_clauses -> join_clause','join_clauses',1,'p_join_clauses_base','yacc.py',377),
+  ('join_clause -> join_type JOIN datasource_alias ON conditions','join_clause',5,'p_join_clause','yacc.py',382),
+  ('join_type -> INNER','join_type',1,'p_join_type_inner','yacc.py',387),
+  ('join_type -> empty','join_type',1,'p_join_type_inner','yacc.py',388),
+  ('join_type -> LEFT','join_type',1,'p_join_type_outer','yacc.py',393),
+  ('join_type -> LEFT OUTER','join_type',2,'p_join_type_outer','yacc.py',394),
+  ('join_type -> RIGHT','join_type',1,'p_join_type_outer','yacc.py',395),
+  ('join_type -> RIGHT OUTER','join_type',2,'p_join_type_outer','yacc.py',396),
+  ('join_type -> FULL','join_type',1,'p_join_type_full','yacc.py',401),
+  ('join_type -> FULL OUTER','join_type',2,'p_join_type_full','yacc.py',402),
+  ('join_type -> LEFT SEMI','join_type',2,'p_join_type_semi','yacc.py',407),
+  ('join_type -> LEFT ANTI','join_type',2,'p_join_type_semi','yacc.py',408),
+  ('simple_column_name -> SIMPLE_COLNAME','simple_column_name',1,'p_simple_column_name','yacc.py',416),
+  ('bracketed_column_name -> BRACKETED_COLNAME','bracketed_column_name',1,'p_bracketed_column_name','yacc.py',421),
+  ('column_index -> COLNUMBER','column_index',1,'p_column_index','yacc.py',428),
+  ('custom_column -> bracketed_column_name','custom_column',1,'p_custom_column','yacc.py',437),
+  ('custom_column -> simple_column_name','custom_column',1,'p_custom_column','yacc.py',438),
+  ('custom_column -> column_index','custom_column',1,'p_custom_column','yacc.py',439),
+  ('custom_aggregation_column -> AGGREGATION_FUNCTION LPAREN custom_column RPAREN','custom_aggregation_column',4,'p_custom_aggregation_column','yacc.py',444),
+  ('custom_aggregation_column -> AGGREGATION_FUNCTION LPAREN TIMES RPAREN','custom_aggregation_column',4,'p_custom_aggregation_column','yacc.py',445),
+  ('order_by_param -> custom_aggregation_column way','order_by_param',2,'p_order_by_param','yacc.py',454),
+  ('order_by_param -> custom_column way','order_by_param',2,'p_order_by_param','yacc.py',455),
+  ('order_by_parameters -> order_by_param','order_by_parameters',1,'p_order_by_parameters_base','yacc.py',462),
+  ('order_by_parameters -> order_by_parameters COMMA order_by_parameters','order_by_parameters',3,'p_order_by_parameters','yacc.py',467),
+  ('order -> ORDER BY order_by_parameters','order',3,'p_order','yacc.py',475),
+  ('order -> empty','order',1,'p_order_empty','yacc.py',480),
+  ('way -> ASC','way',1,'p_way_asc','yacc.py',485),
+  ('way -> empty','way',1,'p_way_asc','yacc.py',486),
+  ('way -> DESC','way',1,'p_way_desc','yacc.py',491),
+  ('limit_or_tail -> LIMIT POSITIVE_INTNUMBER','limit_or_tail',2,'p_limit_or_tail','yacc.py',501),
+  ('limit_or_tail -> TAIL POSITIVE_INTNUMBER','limit_or_tail',2,'p_limit_or_tail','yacc.py',502),
+  ('limit_or_tail -> empty','limit_or_tail',1,'p_limit_or_tail_empty','yacc.py',507),
+  ('value -> STRING','value',1,'p_value','yacc.py',517),
+  ('value -> NUMBER','value',1,'p_value','yacc.py',518),
+  ('values -> values COMMA values','values',3,'p_values','yacc.py',524),
+  ('values -> value','values',1,'p_values_end','yacc.py',536),
+  ('single_values -> LPAREN values RPAREN','single_values',3,'p_single_values','yacc.py',541),
+  ('insert_values -> insert_values COMMA insert_values','insert_values',3,'p_insert_values','yacc.py',546),
+  ('insert_values -> single_values','insert_values',1,'p_insert_values_end','yacc.py',553),
+  ('icolumn -> LPAREN icolumns RPAREN','icolumn',3,'p_icolumn','yacc.py',563),
+  ('icolumn -> empty','icolumn',1,'p_icolumn_empty','yacc.py',568),
+  ('icolumns -> icolumns COMMA icolumns','icolumns',3,'p_icolumns','yacc.py',573),
+  ('icolumns -> column','icolumns',1,'p_icolumns_base','yacc.py',580),
+  ('assign -> column EQUAL value','assign',3,'p_assign','yacc.py',590),
+  ('assigns -> assign COMMA assigns','assigns',3,'p_assigns','yacc.py',595),
+  ('assigns -> assign','assigns',1,'p_assigns_end','yacc.py',600),
+]
@@ -0,0 +1,246 @@
+from dataclasses import dataclass
+from typing import Any, Iterator
+
+from app.compiler.ast_nodes import JoinNode, OrderByNode
+
+
+class PlanNode:
+    """
+    A node of the logical plan of a SELECT statement.
+
+    The parser builds the plan bottom-up from the data sources: the scans (or
+    the join of them), then the WHERE filter, the grouping, the ordering, the
+    projection of the select columns, the LIMIT/TAIL and the INTO load, so a
+    plan has the shape
+
+        Load? -> Limit? -> Project -> Sort? -> Aggregate? -> Filter? -> Scan | Join
+
+    The optimizer rewrites this tree and the code generator turns it into the
+    python code that runs it.
+    """
+
+    __slots__ = ()
+
+    def children(self) -> list["PlanNode"]:
+        return []
+
+    def walk(self) -> Iterator["PlanNode"]:
+        """Yields this node and all the nodes under it, parents before children."""
+        yield self
+        for child in self.children():
+            yield from child.walk()
+
+    def __repr__(self) -> str:
+        fields = ", ".join(
+            f"{name}={getattr(self, name)!r}" for name in self.__class__.__slots__
+        )
+        return f"{self.__class__.__name__}({fields})"
+
+    def __eq__(self, other: Any) -> bool:
+        return type(self) is type(other) and all(
+            getattr(self, name) == getattr(other, name)
+            for name in self.__class__.__slots__
+        )
+
+
+class UnaryPlanNode(PlanNode):
+    __slots__ = ()
+
+    def children(self) -> list[PlanNode]:
+        return [self.child]
+
+
+class Scan(PlanNode):
+    """
+    Reads a data source. `columns`, `filters` and `limit` are filled by the
+    optimizer with what can be pushed down into the extraction.
+    """
+
+    __slots__ = ("source_type", "path", "alias", "columns", "filters", "limit")
+
+    def __init__(
+        self,
+        source_type: str,
+        path: str,
+        alias: str | None = None,
+        columns: list[str] | None = None,
+        filters: dict | None = None,
+        limit: int | None = None,
+    ):
+        self.source_type = source_type
+        self.path = path
+        self.alias = alias
+        self.columns = columns
+        self.filters = filters
+        self.limit = limit
+
+
+@dataclass(frozen=True)
+class KeyLink:
+    """
+    An equality between a key column of two scans of a join, the scans being
+    given by their position in the written order of the join's scans. A scan
+    can be reduced to the rows whose key is among the other scan's keys when
+    dropping its other rows doesn't change the result of the join.
+    """
+
+    left: int
+    left_key: str
+    right: int
+    right_key: str
+    reduce_left: bool
+    reduce_right: bool
+
+
+class Join(PlanNode):
+    """
+    Joins two plans. The top join of a chain holds the `key_links` between its
+    scans, filled by the optimizer.
+    """
+
+    __slots__ = ("left", "right", "condition", "join_type", "key_links")
+
+    def __init__(
+        self,
+        left: PlanNode,
+        right: PlanNode,
+        condition: dict,
+        join_type: str,
+        key_links: list[KeyLink] | None = None,
+    ):
+        self.left = left
+        self.right = right
+        self.condition = condition
+        self.join_type = join_type
+        self.key_links = key_links or []
+
+    def children(self) -> list[PlanNode]:
+        return [self.left, self.right]
+
+
+class Filter(UnaryPlanNode):
+    __slots__ = ("child", "condition")
+
+    def __init__(self, child: PlanNode, condition: dict):
+        self.child = child
+        self.condition = condition
+
+
+class Aggregate(UnaryPlanNode):
+    """Groups by `group_by` (None to aggregate all the rows into one) and
+    computes the aggregations of the select columns."""
+
+    __slots__ = ("child", "group_by", "columns")
+
+    def __init__(self, child: PlanNode, group_by: list[str] | None, columns: list):
+        self.child = child
+        self.group_by = group_by
+        self.columns = columns
+
+
+class Sort(UnaryPlanNode):
+    __slots__ = ("child", "order")
+
+    def __init__(self, child: PlanNode, order: OrderByNode):
+        self.child = child
+        self.order = order
+
+
+class Project(UnaryPlanNode):
+    """The select columns (`"__all__"` for `*`), deduplicated when `distinct`."""
+
+    __slots__ = ("child", "columns", "distinct")
+
+    def __init__(self, child: PlanNode, columns: list | str, distinct: bool):
+        self.child = child
+        self.columns = columns
+        self.distinct = distinct
+
+
+class Limit(UnaryPlanNode):
+    """Keeps the first (`operator` "limit") or last ("tail") `number` rows."""
+
+    __slots__ = ("child", "operator", "number")
+
+    def __init__(self, child: PlanNode, operator: str, number: int):
+        self.child = child
+        self.operator = operator
+        self.number = number
+
+
+class Load(UnaryPlanNode):
+    __slots__ = ("child", "destination_type", "destination_path")
+
+    def __init__(self, child: PlanNode, destination_type: str, destination_path: str):
+        self.child = child
+        self.destination_type = destination_type
+        self.destination_path = destination_path
+
+
+def is_aggregation_select(columns: list | str) -> bool:
+    # aggregation-only when all select items are tuples and not expression tuples
+    return columns != "__all__" and all(
+        isinstance(item, tuple) and item[0] != "expr" for item in columns
+    )
+
+
+def scan_from_datasource(datasource: str | tuple) -> Scan:
+    # a datasource is "type:path", or ("type:path", alias) when it's aliased
+    if isinstance(datasource, tuple):
+        datasource, alias = datasource
+    else:
+        alias = None
+    source_type, path = datasource.split(":", 1)
+    return Scan(source_type, path, alias)
+
+
+def source_plan(from_statement: str | tuple | JoinNode) -> Scan | Join:
+    if isinstance(from_statement, JoinNode):
+        return Join(
+            source_plan(from_statement.left),
+            scan_from_datasource(from_statement.right),
+            from_statement.condition,
+            from_statement.join_type,
+        )
+    return scan_from_datasource(from_statement)
+
+
+def join_scans(source: Scan | Join) -> list[Scan]:
+    """The scans of a left-deep join tree, in the order they are written in the query."""
+    if isinstance(source, Join):
+        return join_scans(source.left) + join_scans(source.right)
+    return [source]
+
+
+def join_chain(source: Scan | Join) -> list[Join]:
+    """The joins of a left-deep join tree, from the first one applied to the last."""
+    if isinstance(source, Join):
+        return join_chain(source.left) + [source]
+    return []
+
+
+def build_select_plan(
+    distinct: bool,
+    select_columns: list | str,
+    into: str | None,
+    source: PlanNode,
+    where: dict | None,
+    group: list[str] | None,
+    order: OrderByNode | None,
+    limit_or_tail: tuple[str, int] | None,
+) -> PlanNode:
+    plan = source
+    if where:
+        plan = Filter(plan, where)
+    if group or is_aggregation_select(select_columns):
+        plan = Aggregate(plan, group, select_columns)
+    if order:
+        plan = Sort(plan, order)
+    plan = Project(plan, select_columns, distinct)
+    if limit_or_tail is not None:
+        operator, number = limit_or_tail
+        plan = Limit(plan, operator, number)
+    if into:
+        destination_type, destination_path = into.split(":", 1)
+        plan = Load(plan, destination_type, destination_path)
+    return plan
@@ -0,0 +1,316 @@
+import re
+from typing import Any
+
+from app.compiler.ast_nodes import (
+    AggregationNode,
+    AliasNode,
+    ColumnIndexNode,
+    ColumnNameNode,
+    OrderByNode,
+)
+
+
+# identifiers inside an arithmetic select expression that are not function calls
+expression_identifier_re = re.compile(r"(?<![\w.])([_A-Za-z][\w.]*)(?![\w.]|\s*\()")
+expression_column_index_re = re.compile(r"\[\d+\]")
+
+
+class UnknownColumns(Exception):
+    """Raised while collecting references when the needed columns can't be known
+    before extraction (e.g. `SELECT *` or a column referenced by its number)."""
+
+
+def is_column_reference(operand: Any) -> bool:
+    return type(operand) == str and not (
+        operand.startswith('"') and operand.endswith('"')
+    )
+
+
+def is_column_index(column: str) -> bool:
+    return column.startswith("[") and column.endswith("]") and column[1:-1].isdigit()
+
+
+def _add_column(columns: dict[str, None], column: str) -> None:
+    if column == "*":
+        return
+    if is_column_index(column):
+        raise UnknownColumns()
+    columns[column] = None
+
+
+def _add_expression_columns(columns: dict[str, None], expression: str) -> None:
+    if expression_column_index_re.search(expression):
+        raise UnknownColumns()
+    for identifier in expression_identifier_re.findall(expression):
+        columns[identifier] = None
+
+
+def _add_select_item_columns(columns: dict[str, None], item: Any) -> None:
+    if isinstance(item, AliasNode):
+        _add_select_item_columns(columns, item.expr)
+    elif isinstance(item, tuple) and item[0] == "expr":
+        _add_expression_columns(columns, item[1])
+    elif isinstance(item, tuple):
+        # (aggregation, column) or (aggregation, column, alias)
+        _add_column(columns, item[1])
+    else:
+        _add_column(columns, item)
+
+
+def add_condition_columns(columns: dict[str, None], conditions: dict | None) -> None:
+    if not conditions or conditions["type"] == "const":
+        return
+    if conditions["type"] == "not":
+        add_condition_columns(columns, conditions["operand"])
+    elif conditions["type"] in ("and", "or"):
+        add_condition_columns(columns, conditions["left"])
+        add_condition_columns(columns, conditions["right"])
+    elif conditions["type"] == "in":
+        # the right operand of a membership test is a list of literals
+        if is_column_reference(conditions["left"]):
+            _add_column(columns, conditions["left"])
+    else:
+        for operand in (conditions["left"], conditions["right"]):
+            if is_column_reference(operand):
+                _add_column(columns, operand)
+
+
+def _add_order_columns(columns: dict[str, None], order: OrderByNode | None) -> None:
+    if not order:
+        return
+    for order_parameter in order.parameters:
+        parameter = order_parameter.parameter
+        if isinstance(parameter, AggregationNode):
+            parameter = parameter.column
+        if isinstance(parameter, ColumnIndexNode):
+            raise UnknownColumns()
+        if isinstance(parameter, ColumnNameNode):
+            _add_column(columns, parameter.name)
+        elif type(parameter) == str:
+            _add_column(columns, parameter)
+
+
+def referenced_columns(
+    select_columns: list | str,
+    where: dict | None,
+    group: list[str] | None,
+    order: OrderByNode | None,
+    join_condition: dict | None = None,
+) -> list[str] | None:
+    """
+    Collects every column a SELECT statement references in its SELECT, WHERE,
+    GROUP BY, ORDER BY and JOIN ... ON parts, in order of first appearance.
+
+    Returns None when the full set of columns is needed, that is when selecting
+    `*` or when a column is referenced by its number, since column numbers are
+    positions in the full source.
+    """
+    if select_columns == "__all__":
+        return None
+    columns: dict[str, None] = {}
+    try:
+        for item in select_columns:
+            _add_select_item_columns(columns, item)
+        add_condition_columns(columns, where)
+        for column in group or []:
+            _add_column(columns, column)
+        _add_order_columns(columns, order)
+        add_condition_columns(columns, join_condition)
+    except UnknownColumns:
+        return None
+    return list(columns)
+
+
+def source_columns(
+    columns: list[str] | None,
+    alias: str | None,
+    other_aliases: list[str | None] | None = None,
+) -> list[str] | None:
+    """
+    Narrows the referenced columns of a query down to the columns one of its
+    data sources has to provide, as they are named inside the source.
+
+    Columns of an aliased source are referenced as `alias.column`. An unaliased
+    source in a join owns every column that is not qualified by another
+    source's alias, and when no source in a join is aliased the owner of a
+    column can't be told apart, so the whole source is read.
+    """
+    if columns is None:
+        return None
+    if alias:
+        prefix = f"{alias}."
+        owned = [
+            column[len(prefix) :] for column in columns if column.startswith(prefix)
+        ]
+        if not other_aliases and len(owned) != len(columns):
+            # an unqualified column in a single aliased source won't be found anyway
+            return None
+    elif other_aliases:
+        if not all(other_aliases):
+            return None
+        prefixes = tuple(f"{other_alias}." for other_alias in other_aliases)
+        owned = [column for column in columns if not column.startswith(prefixes)]
+    else:
+        owned = list(columns)
+    # a source with no referenced column (e.g. SELECT size(*)) is read whole
+    return owned or None
+
+
+# the most literals of a membership test sent to a database as bind
+# parameters, below the lowest limit of the supported databases
+max_sql_membership_values = 900
+
+# the database sources a WHERE clause can be pushed into and whether their
+# translation keeps the case-sensitive, full-match semantics of LIKE
+sql_sources_like_support: dict[str, bool] = {
+    "sqlite": True,
+    "mssql": False,
+}
+
+
+def conjuncts(conditions: dict | None) -> list[dict]:
+    if not conditions:
+        return []
+    if conditions["type"] == "and":
+        return conjuncts(conditions["left"]) + conjuncts(conditions["right"])
+    return [conditions]
+
+
+def conjunction(conditions: list[dict]) -> dict | None:
+    if not conditions:
+        return None
+    result = conditions[0]
+    for condition in conditions[1:]:
+        result = {"type": "and", "left": result, "right": condition}
+    return result
+
+
+def _unqualified_column(column: str, alias: str | None) -> str | None:
+    if is_column_index(column):
+        return None
+    if not alias:
+        return column
+    prefix = f"{alias}."
+    return column[len(prefix) :] if column.startswith(prefix) else None
+
+
+def source_condition(
+    conditions: dict,
+    alias: str | None,
+    like_support: bool = True,
+    max_membership_values: int | None = None,
+) -> dict:
+    """
+    Returns the conditions with the columns as named inside the source, or
+    raises `UnknownColumns` when they can't be evaluated on the source alone:
+    a column is referenced by its number or belongs to another source, or
+    (for a database) a LIKE or a membership test can't be translated.
+    """
+    operator = conditions["type"]
+    if operator == "const":
+        return conditions
+    if operator == "not":
+        return {
+            "type": operator,
+            "operand": source_condition(
+                conditions["operand"], alias, like_support, max_membership_values
+            ),
+        }
+    if operator == "in":
+        column = conditions["left"]
+        if not is_column_reference(column) or (
+            max_membership_values is not None
+            and len(conditions["right"]) > max_membership_values
+        ):
+            raise UnknownColumns()
+        column = _unqualified_column(column, alias)
+        if column is None:
+            raise UnknownColumns()
+        return {"type": operator, "left": column, "right": conditions["right"]}
+    if operator in ("and", "or"):
+        return {
+            "type": operator,
+            "left": source_condition(
+                conditions["left"], alias, like_support, max_membership_values
+            ),
+            "right": source_condition(
+                conditions["right"], alias, like_support, max_membership_values
+            ),
+        }
+    if operator == "like" and not (
+        like_support and is_column_reference(conditions["left"])
+    ):
+        raise UnknownColumns()
+    operands = []
+    for operand in (conditions["left"], conditions["right"]):
+        if is_column_reference(operand):
+            operand = _unqualified_column(operand, alias)
+            if operand is None:
+                raise UnknownColumns()
+        operands.append(operand)
+    return {"type": operator, "left": operands[0], "right": operands[1]}
+
+
+def sql_condition(conditions: dict, source_type: str, alias: str | None) -> dict:
+    """`source_condition` for a database source, see `sql_sources_like_support`."""
+    return source_condition(
+        conditions,
+        alias,
+        sql_sources_like_support[source_type.lower()],
+        max_sql_membership_values,
+    )
+
+
+def split_pushable_conditions(
+    conditions: dict | None, source_type: str, alias: str | None = None
+) -> tuple[dict | None, dict | None]:
+    """
+    Splits the WHERE conditions of a single source query into the conditions
+    the source's database can evaluate and the residual conditions that are
+    left for pandas.
+
+    The split is done on the top level AND-ed conjuncts, a conjunct is pushed
+    when all its columns are referenced by name (column numbers are only known
+    after extraction) and all its operators can be translated to SQL.
+
+    Returns
+    -------
+    tuple[dict | None, dict | None]
+        The pushed conditions, with the columns named as inside the source, and
+        the residual conditions, each one None when empty.
+    """
+    source_type = source_type.lower()
+    if source_type not in sql_sources_like_support:
+        return None, conditions
+    pushed, residual = [], []
+    for condition in conjuncts(conditions):
+        try:
+            pushed.append(sql_condition(condition, source_type, alias))
+        except UnknownColumns:
+            residual.append(condition)
+    return conjunction(pushed), conjunction(residual)
+
+
+def pushable_limit(
+    select_columns: list | str,
+    distinct: bool,
+    where: dict | None,
+    group: list[str] | None,
+    order: OrderByNode | None,
+    limit_or_tail: tuple[str, int] | None,
+) -> int | None:
+    """
+    Returns the number of rows a single source query can stop reading at, when
+    its LIMIT can be applied while extracting, that is when no other step
+    between the extraction and the LIMIT needs to see all the rows.
+    """
+    if not limit_or_tail or limit_or_tail[0] != "limit":
+        return None
+    if distinct or where or group or order:
+        return None
+    if select_columns != "__all__" and any(
+        isinstance(item, tuple) and item[0] != "expr" for item in select_columns
+    ):
+        # aggregations are computed over all the rows
+        return None
+    return limit_or_tail[1]
@@ -8,6 +8,7 @@ from app.compiler.ast_nodes import (
     AliasNode,
     JoinNode,
 )
+from app.compiler.plan import build_select_plan, source_plan
 from app.core.errors import ParserError
 
 
@@ -48,76 +49,15 @@ def p_error(p):
 
 def p_select(p):
     """select : SELECT distinct select_columns into_statement from_statement where group order limit_or_tail SIMICOLON"""
-    # unpack parts for clarity
-    distinct = p[2]
-    select_columns = p[3]
-    into_stmt = p[4]
-    from_stmt = p[5]
-    where_clause = p[6]
-    group_clause = p[7]
-    order_clause = p[8]
-    limit_tail = p[9]
-
-    if type(select_columns) == str:
-        select_columns = "'" + select_columns + "'"
-
-    extraction_code = ""
-
-    if isinstance(from_stmt, JoinNode):
-        left_node = from_stmt.left
-        right_node = from_stmt.right
-
-        def get_source_info(node):
-            if isinstance(node, tuple):
-                return node[0], node[1]
-            return node, None
-
-        l_ds, l_alias = get_source_info(left_node)
-        r_ds, r_alias = get_source_info(right_node)
-
-        l_type, l_path = l_ds.split(":", 1)
-        r_type, r_path = r_ds.split(":", 1)
-
-        l_alias_repr = f"'{l_alias}'" if l_alias else "None"
-        r_alias_repr = f"'{r_alias}'" if r_alias else "None"
-
-        extraction_code = (
-            f"left_data = etl.extract('{l_type}', '{l_path}')\n"
-            f"right_data = etl.extract('{r_type}', '{r_path}')\n"
-            f"extracted_data = etl.apply_join(left_data, right_data, {from_stmt.condition}, '{from_stmt.join_type}', {l_alias_repr}, {r_alias_repr})\n"
-        )
-    else:
-        if isinstance(from_stmt, tuple):
-            datasource, alias = from_stmt
-            file_type, file_path = datasource.split(":", 1)
-            extraction_code = (
-                f"extracted_data = etl.extract('{file_type}','{file_path}')\n"
-                f"extracted_data = extracted_data.add_prefix('{alias}.')\n"
-            )
-        else:
-            datasource = from_stmt
-            file_type, file_path = datasource.split(":", 1)
-            extraction_code = f"extracted_data = etl.extract('{file_type}','{file_path}')\n"
-
-    if into_stmt:
-        load_type, load_path = into_stmt.split(":", 1)
-
-    p[0] = (
-        "from app import etl\n"
-        "from app.compiler.ast_nodes import *\n\n"
-        f"{extraction_code}"
-        f"transformed_data = etl.transform_select(\n"
-        f"   extracted_data,\n"
-        f"   {{\n"
-        f"        'COLUMNS':  {select_columns},\n"
-        f"        'DISTINCT': {distinct},\n"
-        f"        'FILTER':   {where_clause},\n"
-        f"        'GROUP':    {group_clause},\n"
-        f"        'ORDER':    {order_clause},\n"
-        f"        'LIMIT_OR_TAIL':    {limit_tail},\n"
-        f"    }}\n"
-        f")\n"
-        f"{f"etl.load(transformed_data,'{load_type}','{load_path}')" if into_stmt else "" }\n"
+    p[0] = build_select_plan(
+        distinct=p[2],
+        select_columns=p[3],
+        into=p[4],
+        source=source_plan(p[5]),
+        where=p[6],
+        group=p[7],
+        order=p[8],
+        limit_or_tail=p[9],
     )
 
 
@@ -418,8 +358,55 @@ def p_datasource_alias_plainname(p):
 
 
 def p_from_statement_join(p):
-    """from_statement : FROM datasource_alias INNER JOIN datasource_alias ON conditions"""
-    p[0] = JoinNode(left=p[2], right=p[5], join_type="inner", condition=p[7])
+    """from_statement : FROM datasource_alias join_clauses"""
+    # the joins are applied from left to right: ((A JOIN B) JOIN C) ...
+    result = p[2]
+    for join_type, datasource, condition in p[3]:
+        result = JoinNode(
+            left=result, right=datasource, join_type=join_type, condition=condition
+        )
+    p[0] = result
+
+
+def p_join_clauses(p):
+    """join_clauses : join_clauses join_clause"""
+    p[0] = p[1] + [p[2]]
+
+
+def p_join_clauses_base(p):
+    """join_clauses : join_clause"""
+    p[0] = [p[1]]
+
+
+def p_join_clause(p):
+    """join_clause : join_type JOIN datasource_alias ON conditions"""
+    p[0] = (p[1], p[3], p[5])
+
+
+def p_join_type_inner(p):
+    """join_type : INNER
+    | empty"""
+    p[0] = "inner"
+
+
+def p_join_type_outer(p):
+    """join_type : LEFT
+    | LEFT OUTER
+    | RIGHT
+    | RIGHT OUTER"""
+    p[0] = p[1]
+
+
+def p_join_type_full(p):
+    """join_type : FULL
+    | FULL OUTER"""
+    p[0] = "outer"
+
+
+def p_join_type_semi(p):
+    """join_type : LEFT SEMI
+    | LEFT ANTI"""
+    p[0] = p[2]
 
 
 ###########################
@@ -0,0 +1,78 @@
+from collections import OrderedDict
+from dataclasses import dataclass
+from threading import Lock
+from typing import Generic, Hashable, Optional, TypeVar
+
+K = TypeVar("K", bound=Hashable)  # Represents the key type
+V = TypeVar("V")  # Represents the cached value type
+
+
+@dataclass(frozen=True)
+class CacheStatistics:
+    hits: int
+    misses: int
+    size: int
+    capacity: int
+
+    @property
+    def hit_ratio(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+class LRUCache(Generic[K, V]):
+    """A bounded, thread-safe, least recently used cache with hit/miss counters."""
+
+    def __init__(self, capacity: int):
+        if capacity < 0:
+            raise ValueError("cache capacity can't be negative")
+        self.__capacity = capacity
+        self.__items: OrderedDict[K, V] = OrderedDict()
+        self.__lock = Lock()
+        self.__hits = 0
+        self.__misses = 0
+
+    @property
+    def capacity(self) -> int:
+        return self.__capacity
+
+    def get(self, key: K) -> Optional[V]:
+        with self.__lock:
+            if key not in self.__items:
+                self.__misses += 1
+                return None
+            self.__hits += 1
+            self.__items.move_to_end(key)
+            return self.__items[key]
+
+    def put(self, key: K, value: V) -> None:
+        with self.__lock:
+            self.__items[key] = value
+            self.__items.move_to_end(key)
+            self.__evict()
+
+    def resize(self, capacity: int) -> None:
+        if capacity < 0:
+            raise ValueError("cache capacity can't be negative")
+        with self.__lock:
+            self.__capacity = capacity
+            self.__evict()
+
+    def clear(self) -> None:
+        with self.__lock:
+            self.__items.clear()
+            self.__hits = 0
+            self.__misses = 0
+
+    def statistics(self) -> CacheStatistics:
+        with self.__lock:
+            return CacheStatistics(
+                self.__hits, self.__misses, len(self.__items), self.__capacity
+            )
+
+    def __len__(self) -> int:
+        return len(self.__items)
+
+    def __evict(self) -> None:
+        while len(self.__items) > self.__capacity:
+            self.__items.popitem(last=False)
@@ -1,12 +1,184 @@
-from app.compiler import parser, lexer
+from app.compiler import compiler_pool
+from app.compiler.codegen import generate_python
+from app.compiler.lex import reserved
+from app.compiler.optimizer import optimize
+from app.compiler.plan import PlanNode
 
 # from returns.result import Success, Failure
+from dataclasses import dataclass
+import hashlib
+from types import CodeType
 from typing import Union
 import traceback
 from pandas import DataFrame
 
 from app.core.errors import LexerError, ParserError, PythonExecutionError
+from app.core.lru_cache import CacheStatistics, LRUCache
 from app.core.result_monad import Failure, Success
+from app.etl.data.local.extract_cache import extract_cache_statistics
+from app.etl.execution_report import ExecutionReport, reporting
+from app.etl.streaming import streaming
+
+
+@dataclass(frozen=True)
+class CompiledQuery:
+    python_code: str
+    code: CodeType
+
+
+# compiled queries by their fingerprint, see `query_fingerprint`
+compiled_queries_cache = LRUCache[tuple, CompiledQuery](capacity=512)
+# code objects of the executed python code by the hash of its source
+code_objects_cache = LRUCache[str, CodeType](capacity=512)
+reserved_words = frozenset(reserved)
+
+
+def query_fingerprint(tokens: list) -> tuple:
+    """
+    The normalized form of a query used as its key in the compiled queries cache.
+
+    It is built from the query's tokens, so whitespace and comments are already
+    dropped, and the keywords are lowercased since their case doesn't change
+    the generated code, while names and strings stay case-sensitive.
+    """
+    return tuple(
+        (
+            token.type,
+            token.value.lower() if token.type in reserved_words else token.value,
+        )
+        for token in tokens
+    )
+
+
+def get_code_object(python_code: str) -> CodeType:
+    """
+    Returns the code object of the given python code, compiling it only the
+    first time the same source is seen. Surrounding whitespace is ignored, so
+    the code shown in and read back from the GUI is the same entry.
+    """
+    python_code = python_code.strip()
+    source_hash = hashlib.sha256(python_code.encode()).hexdigest()
+    code = code_objects_cache.get(source_hash)
+    if code is None:
+        code = compile(python_code, "<query>", "exec")
+        code_objects_cache.put(source_hash, code)
+    return code
+
+
+def set_compile_cache_capacity(capacity: int) -> None:
+    compiled_queries_cache.resize(capacity)
+    code_objects_cache.resize(capacity)
+
+
+def compile_cache_statistics() -> CacheStatistics:
+    return compiled_queries_cache.statistics()
+
+
+def code_cache_statistics() -> CacheStatistics:
+    return code_objects_cache.statistics()
+
+
+class QuerySession:
+    """
+    Compiles and executes queries with its own lexer and parser (taken from the
+    compiler pool for the time of a compilation) and keeps its own result, so
+    queries of different sessions can be compiled and executed concurrently
+    from different threads.
+    """
+
+    def __init__(self):
+        self.result: DataFrame | None = None
+        # the report of the last execution, see `ExecutionReport`
+        self.report: ExecutionReport | None = None
+
+    def compile(self, query: str) -> Union[
+        Success[str],
+        Failure[ParserError, None],
+        Failure[LexerError, None],
+        Failure[str, None],
+    ]:
+        """See `compile_to_python`."""
+        try:
+
+            with compiler_pool.instances() as (lexer, parser):
+                lexer.lineno = 1
+                lexer.input(query)
+                tokens = list(lexer)
+                # to handle when the query is only comments
+                if not tokens:
+                    return Success("")
+
+                fingerprint = query_fingerprint(tokens)
+                compiled_query = compiled_queries_cache.get(fingerprint)
+                if compiled_query is not None:
+                    return Success(compiled_query.python_code)
+
+                # the parser consumes the tokens already scanned instead of scanning again
+                remaining_tokens = iter(tokens)
+                parsing_result = parser.parse(
+                    lexer=lexer, tokenfunc=lambda: next(remaining_tokens, None)
+                )
+
+            if parsing_result is not None:
+                if isinstance(parsing_result, PlanNode):
+                    parsing_result = generate_python(optimize(parsing_result))
+                python_code = str(parsing_result)
+                compiled_queries_cache.put(
+                    fingerprint,
+                    CompiledQuery(python_code, get_code_object(python_code)),
+                )
+                return Success(python_code)  # type: ignore
+        except (LexerError, ParserError) as ex:
+            return Failure(ex, None)
+        except:
+            # Return a Failure monad containing the stack trace in case of an error
+            return Failure(traceback.format_exc())
+
+    def execute(
+        self, python_code: str, streaming_enabled: bool | None = None
+    ) -> Union[Success[DataFrame], Failure[PythonExecutionError, None]]:
+        """
+        See `execute_python_code`, the result is also kept in `self.result`.
+
+        `streaming_enabled` reads the source of a single CSV or JSON lines
+        source query in chunks (True) or whole (False), None streams the files
+        above `streaming_threshold_bytes` (see `app.etl.streaming`).
+        """
+        try:
+            namespace = {"__name__": "__query__"}
+            self.report = ExecutionReport()
+            with reporting(self.report), streaming(streaming_enabled):
+                exec(get_code_object(python_code), namespace)
+            # statements without a result (e.g. INSERT) give an empty table
+            transformed_data = namespace.get("transformed_data")
+            if transformed_data is None:
+                transformed_data = DataFrame()
+
+            self.result = transformed_data
+            return Success(transformed_data)
+
+        except Exception as ex:
+            print(ex)
+            print(traceback.format_exc())
+            return Failure(
+                PythonExecutionError(
+                    message=str(ex),
+                    code=python_code,
+                    line=None,
+                    position=None,
+                ),
+                None,
+            )
+            # return Failure(traceback.format_exc(), None)
+
+    def run(
+        self, query: str, streaming_enabled: bool | None = None
+    ) -> Union[Success[DataFrame], Failure[Exception | str, None]]:
+        """Compiles the query and executes the generated python code."""
+        compilation_result = self.compile(query)
+        if compilation_result.is_failure():
+            return compilation_result
+        return self.execute(compilation_result.unwrap(), streaming_enabled)
 
 
 def compile_to_python(
@@ -32,23 +204,7 @@ def compile_to_python(
             - Failure[LexerError, None]: Contains a `LexerError` object if tokenizing the query fails.
             - Failure[str, None]: Contains a generic error message with the stack trace if an unexpected exception occurs.
     """
-    try:
-
-        lexer.input(query)
-        # to handle when the query is only comments
-        tokens_exist = any(True for _ in lexer)
-        if tokens_exist:
-            parsing_result = parser.parse(query)
-        else:
-            parsing_result = ""
-
-        if parsing_result is not None:
-            return Success(str(parsing_result))  # type: ignore
-    except (LexerError, ParserError) as ex:
-        return Failure(ex, None)
-    except:
-        # Return a Failure monad containing the stack trace in case of an error
-        return Failure(traceback.format_exc())
+    return QuerySession().compile(query)
 
 
 def execute_python_code(
@@ -58,6 +214,9 @@ def execute_python_code(
     Executes the given Python code and returns the resulting transformed data as a `DataFrame`,
     or an error message if execution fails.
 
+    The code is compiled once per distinct source (see `get_code_object`) and every
+    execution runs in its own namespace, so concurrent executions don't share results.
+
     Args:
         python_code (str): The Python code to be executed. The code should perform data transformations
                            and create a variable named `transformed_data`, which will be returned as a `DataFrame`.
@@ -121,22 +280,4 @@ def execute_python_code(
             - Success[DataFrame]: Contains the resulting `DataFrame` if the code executes successfully.
             - Failure[PythonExecutionError, None]: Contains a `PythonExecutionError` object with details of the error and stack trace if execution fails.
     """
-    try:
-        exec(python_code)
-        from app.etl.core import transformed_data
-
-        return Success(transformed_data)
-
-    except Exception as ex:
-        print(ex)
-        print(traceback.format_exc())
-        return Failure(
-            PythonExecutionError(
-                message=str(ex),
-                code=python_code,
-                line=None,
-                position=None,
-            ),
-            None,
-        )
-        # return Failure(traceback.format_exc(), None)
+    return QuerySession().execute(python_code)
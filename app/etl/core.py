@@ -1,17 +1,27 @@
+from concurrent.futures import ThreadPoolExecutor
+import contextvars
+from dataclasses import dataclass, replace
 from typing import Any, Callable, Tuple
 import re
 import math
 import numpy as np
 import pandas as pd
 from app.compiler.ast_nodes import *
+from app.compiler.plan import KeyLink
+from app.compiler.pushdown import add_condition_columns, conjunction
 from app.etl.data.data_factories import (
     LoaderDataFactory,
     ExtractorDataFactory,
 )
 from app.etl.data.base_data_types import IExtractor, ILoader
+from app.etl.data.local.database import IDatabase
 from app.etl.helpers import (
+    Aggregate,
+    apply_alias,
     apply_filtering,
     apply_groupby,
+    apply_limit_or_tail,
+    build_filter_mask,
     apply_groupby_with_order,
     check_if_column_names_is_in_group_by,
     convert_select_column_indices_to_name,
@@ -19,22 +29,233 @@ from app.etl.helpers import (
     get_unique,
     group_by_columns_names,
     apply_order_by_without_groupby,
-    apply_join,
 )
+from app.etl.execution_report import timed_source
+from app.etl.joins import apply_join, apply_joins
+from app.etl.key_filter import (
+    KeyFilter,
+    build_key_filter,
+    key_filter_reductions,
+    source_bytes,
+)
+from app.etl.settings import settings as execution_settings
+from app.etl.parallel import transform_select_parallel, use_parallel
+from app.etl.streaming import ChunkedSource, transform_select_chunks, use_streaming
 
 
-transformed_data = None
+def extract_filtered(
+    data_extractor: IExtractor,
+    columns: list[str] | None,
+    filters: dict | None,
+    key_filters: list[KeyFilter],
+    limit: int | None,
+) -> pd.DataFrame:
+    """
+    Extracts a source that can't run filters itself, chunk by chunk, keeping
+    the rows of each chunk that pass the filters and the key filters, so the
+    rows they leave out are never all in memory. The columns only the filters
+    reference are read for them and dropped right after.
+    """
+    read_columns = None
+    if columns is not None:
+        filter_columns: dict[str, None] = dict.fromkeys(columns)
+        add_condition_columns(filter_columns, filters)
+        for key_filter in key_filters:
+            filter_columns[key_filter.column] = None
+        read_columns = list(filter_columns)
+    chunks: list[pd.DataFrame] = []
+    rows = 0
+    for chunk in data_extractor.extract_chunks(
+        read_columns, execution_settings.extraction_chunk_rows
+    ):
+        mask = np.ones(len(chunk), dtype=bool)
+        if filters:
+            mask &= build_filter_mask(chunk, filters).to_numpy()
+        for key_filter in key_filters:
+            mask &= key_filter.contains(chunk[key_filter.column])
+        chunk = chunk[mask]
+        if columns is not None:
+            chunk = chunk[columns]
+        if len(chunk) or not chunks:
+            chunks.append(chunk)
+        rows += len(chunk)
+        if limit is not None and rows >= limit:
+            break
+    if not chunks:
+        return pd.DataFrame(columns=columns)
+    non_empty = [chunk for chunk in chunks if len(chunk)] or chunks[:1]
+    data = pd.concat(non_empty, ignore_index=True)
+    return data if limit is None else data[:limit]
 
 
-def extract(data_source_type: str, data_source_path: str) -> pd.DataFrame:
+def extract(
+    data_source_type: str,
+    data_source_path: str,
+    columns: list[str] | None = None,
+    filters: dict | None = None,
+    limit: int | None = None,
+    key_filters: list[KeyFilter] | None = None,
+) -> pd.DataFrame:
+    """
+    Extracts a data source, reading only the given `columns` (None for all)
+    and the rows that pass the `filters` and the `key_filters` of a join,
+    up to `limit` rows.
+    """
+    key_filters = key_filters or []
+    with timed_source(data_source_type, data_source_path) as measures:
+        data_extractor: IExtractor = ExtractorDataFactory.create(
+            data_source_type, data_source_path
+        )
+        if not (filters or key_filters):
+            data: pd.DataFrame = data_extractor.extract(columns, limit=limit)
+        elif isinstance(data_extractor, IDatabase):
+            # the databases run the filters as SQL, and the key filters that
+            # are short enough as IN lists
+            sql_key_filters = [key_filter.sql_condition() for key_filter in key_filters]
+            sql_filters = conjunction(
+                ([filters] if filters else [])
+                + [condition for condition in sql_key_filters if condition]
+            )
+            data: pd.DataFrame = data_extractor.extract(
+                columns, limit=limit, filters=sql_filters
+            )
+            for key_filter, condition in zip(key_filters, sql_key_filters):
+                if not condition:
+                    mask = key_filter.contains(data[key_filter.column])
+                    data = data[mask].reset_index(drop=True)
+        else:
+            data: pd.DataFrame = extract_filtered(
+                data_extractor, columns, filters, key_filters, limit
+            )
+        measures["rows"] = len(data) if isinstance(data, pd.DataFrame) else None
+    return data
+
+
+def extract_lazy(
+    data_source_type: str,
+    data_source_path: str,
+    columns: list[str] | None = None,
+    alias: str | None = None,
+) -> pd.DataFrame | ChunkedSource:
+    """
+    Extracts the data source of a single source query, with its columns named
+    `alias.column` when it has an alias. When the query is streamed (see
+    `app.etl.streaming`) the source isn't read here but returned as a
+    `ChunkedSource` that `transform_select` reads chunk by chunk.
+    """
     data_extractor: IExtractor = ExtractorDataFactory.create(
         data_source_type, data_source_path
     )
-    data: pd.DataFrame = data_extractor.extract()
-    return data
+    if use_streaming(data_extractor, data_source_path):
+        return ChunkedSource(
+            data_extractor, data_source_type, data_source_path, columns, alias
+        )
+    data = extract(data_source_type, data_source_path, columns)
+    return apply_alias(data, alias) if alias else data
+
+
+@dataclass(frozen=True)
+class Extraction:
+    """The arguments of an `extract` call, for `extract_many`."""
+
+    data_source_type: str
+    data_source_path: str
+    columns: list[str] | None = None
+    filters: dict | None = None
+    limit: int | None = None
+    key_filters: list[KeyFilter] | None = None
+
+    def run(self) -> pd.DataFrame:
+        return extract(
+            self.data_source_type,
+            self.data_source_path,
+            self.columns,
+            self.filters,
+            self.limit,
+            self.key_filters,
+        )
+
+
+def run_extractions(extractions: list[Extraction]) -> list[pd.DataFrame]:
+    workers = min(execution_settings.max_extraction_workers, len(extractions))
+    if workers <= 1:
+        return [extraction.run() for extraction in extractions]
+    with ThreadPoolExecutor(
+        max_workers=workers, thread_name_prefix="extraction"
+    ) as executor:
+        futures = [
+            executor.submit(contextvars.copy_context().run, extraction.run)
+            for extraction in extractions
+        ]
+        return [future.result() for future in futures]
 
 
-def transform_select(data: pd.DataFrame, criteria: dict) -> pd.DataFrame:
+def extract_many(
+    extractions: list[Extraction], key_links: list[KeyLink] | None = None
+) -> list[pd.DataFrame]:
+    """
+    Extracts independent data sources concurrently, on a pool of at most
+    `max_extraction_workers` threads (see `app.etl.settings`), and returns
+    their data in the order of the extractions.
+
+    The extractions mostly wait on files, databases and parsers that release
+    the GIL, so a slow source (e.g. an Excel workbook) no longer delays the
+    others. Each extraction runs in a copy of the caller's context, so it is
+    timed in the caller's execution report.
+
+    The sources of a join are given with the `key_links` between them, a
+    large source is then extracted after the small sources it is linked to
+    and only its rows whose key is among theirs are kept while reading (see
+    `app.etl.key_filter`).
+    """
+    reductions = key_filter_reductions(
+        [source_bytes(extraction.data_source_path) for extraction in extractions],
+        [bool(extraction.filters) for extraction in extractions],
+        key_links or [],
+    )
+    if not reductions:
+        return run_extractions(extractions)
+    reduced = {reduced for reduced, _, _, _ in reductions}
+    first = [index for index in range(len(extractions)) if index not in reduced]
+    data: dict[int, pd.DataFrame] = dict(
+        zip(first, run_extractions([extractions[index] for index in first]))
+    )
+    key_filters: dict[int, list[KeyFilter]] = {index: [] for index in reduced}
+    for reduced_index, reduced_key, building_index, building_key in reductions:
+        key_filter = build_key_filter(reduced_key, data[building_index][building_key])
+        if key_filter is not None:
+            key_filters[reduced_index].append(key_filter)
+    second = sorted(reduced)
+    data.update(
+        zip(
+            second,
+            run_extractions(
+                [
+                    replace(extractions[index], key_filters=key_filters[index])
+                    for index in second
+                ]
+            ),
+        )
+    )
+    return [data[index] for index in range(len(extractions))]
+
+
+def transform_select(
+    data: pd.DataFrame | ChunkedSource,
+    criteria: dict,
+    aggregate: Aggregate | None = None,
+) -> pd.DataFrame:
+    """
+    Runs the SELECT described by `criteria` over the extracted data.
+
+    `aggregate` computes the aggregations of GROUP BY and of a select of
+    aggregations only, instead of computing them from `data`, e.g. to merge
+    the partial aggregates of the chunks of a source (see `Aggregate`).
+    """
+    if isinstance(data, ChunkedSource):
+        if use_parallel(data, criteria):
+            return transform_select_parallel(data, criteria, transform_select)
+        return transform_select_chunks(data, criteria, transform_select)
     are_select_columns_aggregation = False
     if criteria["COLUMNS"] != "__all__":
         # consider aggregation-only when all select items are tuples and not expression tuples
@@ -53,7 +274,12 @@ def transform_select(data: pd.DataFrame, criteria: dict) -> pd.DataFrame:
         and not are_select_columns_aggregation
     ):
         order_by_node: OrderByNode = criteria["ORDER"]
-        data = apply_order_by_without_groupby(data, order_by_node)
+        # DISTINCT drops rows between the ordering and the LIMIT
+        data = apply_order_by_without_groupby(
+            data,
+            order_by_node,
+            None if criteria["DISTINCT"] else criteria["LIMIT_OR_TAIL"],
+        )
 
     if criteria["GROUP"]:
         groupby_columns = get_unique(group_by_columns_names(data, criteria["GROUP"]))
@@ -64,11 +290,17 @@ def transform_select(data: pd.DataFrame, criteria: dict) -> pd.DataFrame:
             raise Exception("there are is a column isn't in groupby columns")
         if criteria["ORDER"]:
             order_by_node: OrderByNode = criteria["ORDER"]
+            # like above, the LIMIT comes after DISTINCT
             data = apply_groupby_with_order(
-                data, select_columns, groupby_columns, order_by_node
+                data,
+                select_columns,
+                groupby_columns,
+                order_by_node,
+                None if criteria["DISTINCT"] else criteria["LIMIT_OR_TAIL"],
+                aggregate,
             )
         else:
-            data = apply_groupby(data, select_columns, groupby_columns)
+            data = apply_groupby(data, select_columns, groupby_columns, aggregate)
 
     else:
         if criteria["COLUMNS"] != "__all__":
@@ -97,7 +329,7 @@ def transform_select(data: pd.DataFrame, criteria: dict) -> pd.DataFrame:
                         new_col = f"{agg}_{col_name}"
                         alias_map[new_col] = alias
 
-                data = generate_aggregation_row(data, aggregate_columns)
+                data = generate_aggregation_row(data, aggregate_columns, aggregate)
                 if alias_map:
                     data = data.rename(columns=alias_map)
 
@@ -259,17 +491,8 @@ def transform_select(data: pd.DataFrame, criteria: dict) -> pd.DataFrame:
 
     # limit
     if criteria["LIMIT_OR_TAIL"] != None:
-        operator, number = criteria["LIMIT_OR_TAIL"]
-        if number == 0:
-            # empty data frame
-            data = pd.DataFrame(columns=data.columns)
-        elif operator == "limit":
-            data = data[:number]
-        else:
-            data = data[-number:]
+        data = apply_limit_or_tail(data, criteria["LIMIT_OR_TAIL"])
 
-    global transformed_data
-    transformed_data = data
     return data
 
 
@@ -1,5 +1,6 @@
 from pandas import DataFrame
 from abc import ABC, abstractmethod
+from typing import Iterator
 
 
 class FieldPathBase:
@@ -9,9 +10,72 @@ class FieldPathBase:
 
 class IExtractor(ABC):
     @abstractmethod
-    def extract(self) -> DataFrame:
+    def extract(
+        self, columns: list[str] | None = None, limit: int | None = None
+    ) -> DataFrame:
+        """
+        Extracts the data source as a DataFrame.
+
+        `columns` are the only columns the query references, extractors that can
+        read a subset of the columns should read only those, the others may
+        ignore it and return every column. None means every column is needed.
+
+        `limit` is the number of leading rows the query needs, extractors that
+        can stop reading early should, the others may return more rows.
+        """
         pass
 
+    def can_extract_chunks(self) -> bool:
+        """Whether `extract_chunks` reads the source in parts."""
+        return False
+
+    def extract_chunks(
+        self, columns: list[str] | None, chunk_rows: int
+    ) -> Iterator[DataFrame]:
+        """
+        Extracts the data source as consecutive DataFrames of about `chunk_rows`
+        rows, so rows can be dropped before the whole source is in memory.
+        Extractors that can't read a source in parts yield it whole.
+        """
+        yield self.extract(columns)
+
+    def can_extract_rows(self) -> bool:
+        """Whether `row_count` and `extract_rows` can be used."""
+        return False
+
+    def row_count(self) -> int:
+        """The number of rows of the data source."""
+        raise NotImplementedError
+
+    def extract_rows(
+        self, start: int, stop: int, columns: list[str] | None
+    ) -> DataFrame:
+        """
+        Extracts the rows from `start` to `stop` (excluded) without reading the
+        rows before them, indexed by their position in the source.
+        """
+        raise NotImplementedError
+
+    def can_extract_ranges(self) -> bool:
+        """Whether the source can be split by `split_ranges` for `extract_range`."""
+        return False
+
+    def split_ranges(self, parts: int) -> list[tuple[int, int]]:
+        """
+        Splits the data source into about `parts` consecutive byte ranges that
+        can be extracted independently, e.g. by different processes.
+        """
+        raise NotImplementedError
+
+    def extract_range(
+        self, start: int, end: int, columns: list[str] | None
+    ) -> DataFrame:
+        """
+        Extracts the rows of a range given by `split_ranges`, as a DataFrame
+        indexed from 0.
+        """
+        raise NotImplementedError
+
 
 class ILoader(ABC):
     @abstractmethod
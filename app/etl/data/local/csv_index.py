@@ -0,0 +1,205 @@
+from dataclasses import dataclass
+import hashlib
+import json
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+from app.etl.settings import settings
+
+
+# the byte offset of every `index_step_rows`-th row is indexed
+index_step_rows = 8192
+# the bytes scanned at a time while indexing
+index_block_bytes = 16 * 1024 * 1024
+index_version = 1
+
+QUOTE, NEWLINE, CARRIAGE_RETURN = ord('"'), ord("\n"), ord("\r")
+
+
+@dataclass
+class CSVIndex:
+    """
+    The rows of a CSV file by their position in the file: the byte offset
+    where every `step`-th row starts (`offsets[k]` is the start of row
+    `k * step`, rows numbered from 0 after the header), the number of rows
+    and the column names of the header.
+
+    It is valid as long as the file keeps the modification time and size it
+    was built for (`modified`, `size`).
+    """
+
+    header: list[str]
+    rows: int
+    step: int
+    offsets: np.ndarray
+    modified: int
+    size: int
+
+    def row_offset(self, row: int) -> tuple[int, int]:
+        """An indexed row at or before `row`, as `(its number, its offset)`."""
+        position = min(row // self.step, len(self.offsets) - 1)
+        return position * self.step, int(self.offsets[position])
+
+    def balanced_ranges(self, parts: int) -> list[tuple[int, int]]:
+        """
+        Splits the rows into about `parts` byte ranges of about the same size,
+        cut where indexed rows start, so never inside a quoted value.
+        """
+        if not self.rows:
+            return []
+        first = self.offsets[0]
+        targets = first + (self.size - first) * np.arange(1, parts) // parts
+        # the first indexed row at or after each target
+        positions = np.searchsorted(self.offsets, targets)
+        cuts = np.unique(self.offsets[positions[positions < len(self.offsets)]])
+        bounds = [int(first), *map(int, cuts[cuts > first]), self.size]
+        return list(zip(bounds, bounds[1:]))
+
+
+def row_starts(
+    data: np.ndarray, base: int, quoted: bool, after_newline: bool
+) -> tuple[np.ndarray, bool, bool]:
+    """
+    The offsets of the rows that start in a block of the file, skipping blank
+    lines like `pd.read_csv` does. The line breaks inside quoted values are
+    told apart by the parity of the quotes before them (an escaped quote `""`
+    counts twice), so the quotes are expected to enclose whole values like in
+    RFC 4180. `quoted` and `after_newline` carry the state of the scan from
+    the previous block.
+    """
+    quotes = np.flatnonzero(data == QUOTE)
+    newlines = np.flatnonzero(data == NEWLINE)
+    # the newlines that are outside quotes end a line
+    inside = (np.searchsorted(quotes, newlines) + quoted) % 2 == 1
+    line_ends = newlines[~inside]
+    # a line starts after each line end, and at the block start after one
+    starts = line_ends + 1
+    if after_newline:
+        starts = np.concatenate(([0], starts))
+    starts = starts[starts < len(data)]
+    # blank lines (only a line break) aren't rows
+    first_bytes = data[starts]
+    blank = first_bytes == NEWLINE
+    crlf = (first_bytes == CARRIAGE_RETURN) & (starts + 1 < len(data))
+    blank[crlf] = data[starts[crlf] + 1] == NEWLINE
+    quoted = (len(quotes) + quoted) % 2 == 1
+    after_newline = len(line_ends) > 0 and line_ends[-1] == len(data) - 1
+    return starts[~blank] + base, quoted, after_newline
+
+
+def build_index(path: str) -> CSVIndex:
+    status = os.stat(path)
+    header = pd.read_csv(path, nrows=0).columns.tolist()
+    offsets: list[np.ndarray] = []
+    rows = 0
+    # the file starts like a line after a line break
+    quoted, after_newline, header_found = False, True, False
+    with open(path, "rb") as file:
+        base = 0
+        while block := file.read(index_block_bytes):
+            if block.endswith(b"\r"):
+                # keep a \r\n line break in one block
+                block += file.read(1)
+            data = np.frombuffer(block, dtype=np.uint8)
+            starts, quoted, after_newline = row_starts(
+                data, base, quoted, after_newline
+            )
+            if not header_found and len(starts):
+                # the header is the first line, the rows start after it
+                starts = starts[1:]
+                header_found = True
+            if len(starts):
+                # the rows of this block that are indexed
+                first = (-rows) % index_step_rows
+                offsets.append(starts[first::index_step_rows])
+                rows += len(starts)
+            base += len(block)
+    return CSVIndex(
+        header,
+        rows,
+        index_step_rows,
+        np.concatenate(offsets) if offsets else np.zeros(0, dtype=np.int64),
+        status.st_mtime_ns,
+        status.st_size,
+    )
+
+
+def index_path(path: str) -> str:
+    name = hashlib.sha256(os.path.abspath(path).encode()).hexdigest()
+    return os.path.join(settings.cache_directory, "csv_index", f"{name}.npz")
+
+
+def save_index(path: str, index: CSVIndex) -> None:
+    target = index_path(path)
+    try:
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        metadata = {
+            "version": index_version,
+            "path": os.path.abspath(path),
+            "header": index.header,
+            "rows": index.rows,
+            "step": index.step,
+            "modified": index.modified,
+            "size": index.size,
+        }
+        temporary = f"{target}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temporary, "wb") as file:
+            np.savez(
+                file, offsets=index.offsets, metadata=np.array(json.dumps(metadata))
+            )
+        os.replace(temporary, target)
+    except OSError:
+        # a read-only cache directory, the index lives in memory only
+        pass
+
+
+def load_index(path: str) -> CSVIndex | None:
+    try:
+        with np.load(index_path(path)) as stored:
+            metadata = json.loads(str(stored["metadata"]))
+            offsets = stored["offsets"]
+    except (OSError, ValueError, KeyError):
+        return None
+    if metadata.get("version") != index_version:
+        return None
+    return CSVIndex(
+        metadata["header"],
+        metadata["rows"],
+        metadata["step"],
+        offsets,
+        metadata["modified"],
+        metadata["size"],
+    )
+
+
+# the indexes already loaded or built in this process, by path
+loaded_indexes: dict[str, CSVIndex] = {}
+indexes_lock = threading.Lock()
+
+
+def csv_index(path: str) -> CSVIndex:
+    """
+    The index of a CSV file, read from the cache directory or built by
+    scanning the file once (without parsing it) and stored there. An index
+    whose file changed since is rebuilt.
+    """
+    status = os.stat(path)
+    with indexes_lock:
+        index = loaded_indexes.get(path)
+    if index is None or (index.modified, index.size) != (
+        status.st_mtime_ns,
+        status.st_size,
+    ):
+        index = load_index(path)
+        if index is None or (index.modified, index.size) != (
+            status.st_mtime_ns,
+            status.st_size,
+        ):
+            index = build_index(path)
+            save_index(path, index)
+        with indexes_lock:
+            loaded_indexes[path] = index
+    return index
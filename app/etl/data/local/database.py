@@ -1,15 +1,17 @@
 from abc import ABC, abstractmethod
 from enum import Enum
-from typing import final, override
+from typing import Any, final, override
 
 import sqlalchemy
 import pandas as pd
 
+from app.compiler.pushdown import add_condition_columns, conjunction, conjuncts
 from app.etl.data.base_data_types import (
     FieldPathBase,
     IExtractor,
     ILoader,
 )
+from app.etl.helpers import build_filter_mask
 
 
 class DatabaseTypes(Enum):
@@ -18,10 +20,16 @@ class DatabaseTypes(Enum):
 
 
 class IDatabase(FieldPathBase, IExtractor, ILoader, ABC):
+    # whether comparing strings in SQL gives the case-sensitive results pandas
+    # gives, which depends on the collation of the database
+    case_sensitive_strings: bool = True
+
     def __init__(self, path: str):
         FieldPathBase.__init__(self, path)
         self.table_name: str = None  # type: ignore
         self.engine: sqlalchemy.Engine = None  # type: ignore
+        # the kinds of the columns by name, see `column_kinds`
+        self.kinds: dict[str, str | None] | None = None
         self.initialize_connection()
 
     @abstractmethod
@@ -29,15 +37,220 @@ class IDatabase(FieldPathBase, IExtractor, ILoader, ABC):
         pass
 
     @final
-    def extract(self) -> pd.DataFrame:
-        return pd.read_sql(f"select * from {self.table_name};", self.engine)
+    def extract(
+        self,
+        columns: list[str] | None = None,
+        limit: int | None = None,
+        filters: dict | None = None,
+    ) -> pd.DataFrame:
+        """
+        Reads the rows of the table that pass the `filters`. The conditions the
+        database would evaluate differently than pandas (see `is_pushable`)
+        are evaluated on the rows read instead, with the LIMIT after them.
+        """
+        pushed, residual = self.split_filters(filters)
+        read_columns = columns
+        if residual and columns is not None:
+            filter_columns: dict[str, None] = dict.fromkeys(columns)
+            add_condition_columns(filter_columns, residual)
+            read_columns = list(filter_columns)
+        sql_limit = None if residual else limit
+        parameters: dict[str, Any] = {}
+        query = f"select {self.top_clause(sql_limit)}{self.select_list(read_columns)} from {self.table_name}"
+        if pushed:
+            query += f" where {self.where_clause(pushed, parameters)}"
+        query += self.limit_clause(sql_limit)
+        data = pd.read_sql(sqlalchemy.text(query), self.engine, params=parameters)
+        if residual:
+            data = data[build_filter_mask(data, residual).to_numpy()]
+            if columns is not None:
+                data = data[columns]
+            data = data.reset_index(drop=True)
+            if limit is not None:
+                data = data.head(limit)
+        return data
+
+    @final
+    def split_filters(self, filters: dict | None) -> tuple[dict | None, dict | None]:
+        """The AND-ed conjuncts of the filters run in SQL, and the other ones."""
+        pushed, residual = [], []
+        for condition in conjuncts(filters):
+            (pushed if self.is_pushable(condition) else residual).append(condition)
+        return conjunction(pushed), conjunction(residual)
+
+    @final
+    def column_kinds(self) -> dict[str, str | None]:
+        """
+        The kind of the values of each column, from its declared type: "number",
+        "string" or None for the other types and the columns without one.
+        """
+        if self.kinds is None:
+            try:
+                declared = sqlalchemy.inspect(self.engine).get_columns(self.table_name)
+            except sqlalchemy.exc.SQLAlchemyError:
+                declared = []
+            self.kinds = {}
+            for column in declared:
+                column_type = column["type"]
+                if isinstance(column_type, (sqlalchemy.Integer, sqlalchemy.Numeric)):
+                    self.kinds[column["name"]] = "number"
+                elif isinstance(column_type, sqlalchemy.String):
+                    self.kinds[column["name"]] = "string"
+                else:
+                    self.kinds[column["name"]] = None
+        return self.kinds
+
+    def operand_kind(self, operand: Any) -> str | None:
+        if self.is_column(operand):
+            return self.column_kinds().get(operand)
+        if type(operand) == str:
+            return "string"
+        if type(operand) in (int, float):
+            return "number"
+        return None
+
+    @final
+    def is_pushable(self, filters: dict) -> bool:
+        """
+        Whether the database evaluates the condition like pandas does: when
+        each comparison is between operands of the same kind, columns by their
+        declared type. The databases convert the operands of different types
+        to compare them (with SQLite's type affinity, `int_col = "5"` is true
+        while pandas finds 5 and "5" different), and a column without a
+        declared type can hold both.
+        """
+        operator: str = filters["type"]
+        if operator == "const":
+            return True
+        if operator == "not":
+            return self.is_pushable(filters["operand"])
+        if operator in ("and", "or"):
+            return self.is_pushable(filters["left"]) and self.is_pushable(
+                filters["right"]
+            )
+        if operator == "in":
+            operands = [filters["left"], *filters["right"]]
+        elif operator == "like":
+            operands = [filters["left"], '""']
+        else:
+            operands = [filters["left"], filters["right"]]
+        kinds = {self.operand_kind(operand) for operand in operands}
+        if kinds == {"string"}:
+            return self.case_sensitive_strings
+        return kinds == {"number"}
+
+    def top_clause(self, limit: int | None) -> str:
+        return ""
+
+    def limit_clause(self, limit: int | None) -> str:
+        return "" if limit is None else f" limit {int(limit)}"
+
+    @final
+    def select_list(self, columns: list[str] | None) -> str:
+        if columns is None:
+            return "*"
+        quote = self.engine.dialect.identifier_preparer.quote
+        return ", ".join(quote(column) for column in columns)
+
+    @final
+    def where_clause(
+        self, filters: dict, parameters: dict[str, Any], negated: bool = False
+    ) -> str:
+        """
+        Translates a filters expressions tree into a parameterized SQL condition,
+        the literals are added to `parameters` as bind parameters.
+
+        The translation keeps the results pandas gives for missing values: a
+        comparison with a missing value is False, except `!=` which is True,
+        also when it is negated by NOT.
+        """
+        operator: str = filters["type"]
+        if operator == "const":
+            return "1 = 1" if filters["value"] else "1 = 0"
+        if operator == "not":
+            operand = self.where_clause(filters["operand"], parameters, not negated)
+            return f"NOT ({operand})"
+        if operator in ("and", "or"):
+            left = self.where_clause(filters["left"], parameters, negated)
+            right = self.where_clause(filters["right"], parameters, negated)
+            return f"({left}) {operator.upper()} ({right})"
+
+        operands = [filters["left"]]
+        if operator != "in":
+            operands.append(filters["right"])
+        column_operands = [
+            self.sql_operand(operand, parameters)
+            for operand in operands
+            if self.is_column(operand)
+        ]
+        left = self.sql_operand(filters["left"], parameters)
+        if operator == "in":
+            values = [self.sql_operand(value, parameters) for value in filters["right"]]
+            condition = f"{left} IN ({', '.join(values)})"
+        elif operator == "like":
+            pattern: str = filters["right"][1:-1]
+            condition = self.like_condition(left, pattern, parameters)
+        else:
+            right = self.sql_operand(filters["right"], parameters)
+            condition = f"{left} {sql_operators[operator]} {right}"
+
+        if operator in ("!=", "<>"):
+            return " OR ".join(
+                [condition] + [f"{column} IS NULL" for column in column_operands]
+            )
+        if negated and column_operands:
+            return " AND ".join(
+                [condition] + [f"{column} IS NOT NULL" for column in column_operands]
+            )
+        return condition
+
+    @staticmethod
+    def is_column(operand: Any) -> bool:
+        return type(operand) == str and not (
+            operand.startswith('"') and operand.endswith('"')
+        )
+
+    @staticmethod
+    def bind(value: Any, parameters: dict[str, Any]) -> str:
+        name = f"p{len(parameters)}"
+        parameters[name] = value
+        return f":{name}"
+
+    @final
+    def sql_operand(self, operand: Any, parameters: dict[str, Any]) -> str:
+        if self.is_column(operand):
+            return self.engine.dialect.identifier_preparer.quote(operand)
+        if type(operand) == str:
+            operand = operand[1:-1]
+        return self.bind(operand, parameters)
+
+    def like_condition(
+        self, column: str, pattern: str, parameters: dict[str, Any]
+    ) -> str:
+        raise NotImplementedError(
+            f"LIKE can't be evaluated by {self.__class__.__name__}"
+        )
 
     @final
     def load(self, data: pd.DataFrame):
         data.to_sql(self.table_name, self.engine, if_exists="append", index=False)
 
 
+sql_operators: dict[str, str] = {
+    "==": "=",
+    "!=": "<>",
+    "<>": "<>",
+    ">": ">",
+    ">=": ">=",
+    "<": "<",
+    "<=": "<=",
+}
+
+
 class MSSQLDatabase(IDatabase):
+    # the default collations of SQL Server compare strings case-insensitively
+    case_sensitive_strings = False
+
     def __init__(self, path: str):
         IDatabase.__init__(self, path)
 
@@ -51,6 +264,14 @@ class MSSQLDatabase(IDatabase):
             f"mssql+pyodbc://@{server_name}/{data_base_name}?trusted_connection=yes&driver=ODBC+Driver+18+for+SQL+Server&Encrypt=no"
         )
 
+    @override
+    def top_clause(self, limit: int | None) -> str:
+        return "" if limit is None else f"top {int(limit)} "
+
+    @override
+    def limit_clause(self, limit: int | None) -> str:
+        return ""
+
 
 class SQLITEDatabase(IDatabase):
     def __init__(self, path: str):
@@ -62,3 +283,13 @@ class SQLITEDatabase(IDatabase):
         data_base_name = path_parts[0]
         self.table_name = path_parts[1]
         self.engine = sqlalchemy.create_engine(f"sqlite:///{data_base_name}")
+
+    @override
+    def like_condition(
+        self, column: str, pattern: str, parameters: dict[str, Any]
+    ) -> str:
+        # GLOB is case sensitive like the regular expression pandas uses,
+        # the LIKE wildcards are translated and GLOB's own are escaped
+        glob_characters = {"%": "*", "_": "?", "*": "[*]", "?": "[?]", "[": "[[]"}
+        glob_pattern = "".join(glob_characters.get(c, c) for c in pattern)
+        return f"{column} GLOB {self.bind(glob_pattern, parameters)}"
@@ -0,0 +1,206 @@
+import hashlib
+import os
+import threading
+import time
+from typing import Callable
+
+import pandas as pd
+
+from app.core.lru_cache import CacheStatistics
+from app.etl.settings import settings
+
+try:
+    import pyarrow  # noqa: F401
+
+    arrow_available = True
+except ImportError:
+    arrow_available = False
+
+
+extract_cache_version = 1
+# the entries are Feather files, never pickles: unpickling a file another
+# user or process could write would run its code
+entry_extension = ".feather"
+
+statistics_lock = threading.Lock()
+hits = 0
+misses = 0
+
+
+def cache_directory() -> str:
+    return os.path.join(settings.cache_directory, "extracts")
+
+
+def file_status(path: str) -> tuple[int, int]:
+    status = os.stat(path)
+    return status.st_mtime_ns, status.st_size
+
+
+def entry_prefix(path: str, selector: str) -> str:
+    """The start of the names of the entries of a table of a file."""
+    key = f"{os.path.abspath(path)}\0{selector}"
+    return hashlib.sha256(key.encode()).hexdigest()[:32]
+
+
+def entry_base(path: str, selector: str, status: tuple[int, int]) -> str:
+    """The path of the entry of a table of a file, without its extension."""
+    version = f"{extract_cache_version}\0{status[0]}\0{status[1]}"
+    suffix = hashlib.sha256(version.encode()).hexdigest()[:16]
+    return os.path.join(cache_directory(), f"{entry_prefix(path, selector)}-{suffix}")
+
+
+def is_volatile(status: tuple[int, int]) -> bool:
+    """Whether the file changed too recently to expect it to stay as it is."""
+    return time.time() - status[0] / 1e9 < settings.extract_cache_min_age_seconds
+
+
+def count(hit: bool) -> None:
+    global hits, misses
+    with statistics_lock:
+        if hit:
+            hits += 1
+        else:
+            misses += 1
+
+
+def read_entry(base: str) -> pd.DataFrame | None:
+    entry = base + entry_extension
+    try:
+        data = pd.read_feather(entry)
+    except FileNotFoundError:
+        return None
+    except Exception:
+        # a corrupted or incompatible entry is a miss
+        return None
+    try:
+        # the entries are evicted from the least recently used
+        os.utime(entry)
+    except OSError:
+        pass
+    return data
+
+
+def is_feather_compatible(data: pd.DataFrame) -> bool:
+    """
+    Whether the DataFrame is read back from Feather as it is: with the default
+    index, string column names and, in its object columns, strings only (other
+    objects, e.g. numbers mixed with strings, would be converted).
+    """
+    return (
+        isinstance(data.index, pd.RangeIndex)
+        and data.index.start == 0
+        and data.index.step == 1
+        and all(isinstance(name, str) for name in data.columns)
+        and data.columns.is_unique
+        and all(
+            pd.api.types.infer_dtype(values, skipna=True) in ("string", "empty")
+            for _, values in data.select_dtypes(include="object").items()
+        )
+    )
+
+
+def write_entry(base: str, data: pd.DataFrame) -> None:
+    temporary = f"{base}.{os.getpid()}.{threading.get_ident()}.tmp"
+    data.to_feather(temporary)
+    os.replace(temporary, base + entry_extension)
+
+
+def evict(keep: str) -> None:
+    """
+    Removes the other entries of the same table, whose file changed since, and
+    the least recently used entries while they take more than
+    `settings.extract_cache_bytes`.
+    """
+    directory = cache_directory()
+    prefix = os.path.basename(keep).split("-")[0]
+    entries = []
+    for name in os.listdir(directory):
+        entry = os.path.join(directory, name)
+        if not name.endswith(entry_extension):
+            continue
+        try:
+            if name.startswith(prefix) and not entry.startswith(keep):
+                os.remove(entry)
+                continue
+            status = os.stat(entry)
+        except OSError:
+            # removed by another process meanwhile
+            continue
+        entries.append((status.st_mtime, status.st_size, entry))
+    entries.sort()
+    used = sum(size for _, size, _ in entries)
+    for _, size, entry in entries:
+        if used <= settings.extract_cache_bytes:
+            break
+        try:
+            os.remove(entry)
+        except OSError:
+            pass
+        used -= size
+
+
+def is_enabled() -> bool:
+    # without pyarrow there is no Feather, and the tables aren't kept at all
+    return settings.extract_cache and arrow_available
+
+
+def is_cached(path: str, selector: str) -> bool:
+    """Whether a table of a file can be read from the cache."""
+    if not is_enabled() or not os.path.isfile(path):
+        return False
+    base = entry_base(path, selector, file_status(path))
+    return os.path.isfile(base + entry_extension)
+
+
+def cached_extract(
+    path: str, selector: str, read: Callable[[], pd.DataFrame]
+) -> pd.DataFrame:
+    """
+    A table of a file (`selector` tells it apart from the other tables of the
+    file, e.g. a sheet), read by `read` the first time and kept in the cache
+    directory as a Feather file. The entry is used as long as the file keeps
+    its modification time and size.
+
+    The files modified in the last `settings.extract_cache_min_age_seconds`
+    are always read, they may still be being written, and so are the tables
+    Feather can't hold as they are (see `is_feather_compatible`), or all of
+    them when pyarrow isn't installed.
+    """
+    if not is_enabled() or not os.path.isfile(path):
+        return read()
+    status = file_status(path)
+    if is_volatile(status):
+        return read()
+    base = entry_base(path, selector, status)
+    data = read_entry(base)
+    count(data is not None)
+    if data is not None:
+        return data
+    data = read()
+    if file_status(path) == status and is_feather_compatible(data):
+        try:
+            os.makedirs(cache_directory(), exist_ok=True)
+            write_entry(base, data)
+            evict(base)
+        except (OSError, ValueError, TypeError):
+            # a read-only or full cache directory, or a table pyarrow can't
+            # write after all, the table isn't kept
+            pass
+    return data
+
+
+def extract_cache_statistics() -> CacheStatistics:
+    """
+    The hits and misses of the extract cache in this process, with the bytes
+    its entries take (`size`) and may take (`capacity`).
+    """
+    used = 0
+    try:
+        with os.scandir(cache_directory()) as entries:
+            for entry in entries:
+                if entry.name.endswith(entry_extension):
+                    used += entry.stat().st_size
+    except OSError:
+        pass
+    with statistics_lock:
+        return CacheStatistics(hits, misses, used, settings.extract_cache_bytes)
@@ -1,9 +1,14 @@
 from abc import ABC
 from enum import Enum
+import io
+import os
 import re
-from typing import Any, override
+from typing import Any, Iterator, override
 
 import pandas as pd
+from app.etl.data.local.csv_index import csv_index
+from app.etl.data.local.extract_cache import cached_extract, is_cached
+from app.etl.data.local.schema_cache import SchemaReading
 from app.etl.data.base_data_types import (
     FieldPathBase,
     IExtractor,
@@ -11,6 +16,10 @@ from app.etl.data.base_data_types import (
 )
 
 
+# the extensions pandas reads as compressed files
+compressed_extensions = (".gz", ".bz2", ".zip", ".xz", ".zst", ".tar")
+
+
 class FlatDataTypes(Enum):
     CSV = "csv"
     EXCEL = "excel"
@@ -23,14 +32,131 @@ class IFlatData(FieldPathBase, IExtractor, ILoader, ABC):
     def __init__(self, path: str) -> None:
         FieldPathBase.__init__(self, path)
 
+    @staticmethod
+    def select_columns(
+        data: pd.DataFrame, columns: list[str] | None, limit: int | None = None
+    ) -> pd.DataFrame:
+        # for the formats that can't skip columns or stop early while parsing,
+        # at least don't carry the unneeded ones through the rest of the query
+        if columns is not None:
+            data = data[columns]
+        if limit is not None:
+            data = data.head(limit)
+        return data
+
 
 class CSVFlatData(IFlatData):
     def __init__(self, path: str) -> None:
         IFlatData.__init__(self, path)
 
     @override
-    def extract(self) -> pd.DataFrame:
-        return pd.read_csv(self.path)
+    def extract(
+        self, columns: list[str] | None = None, limit: int | None = None
+    ) -> pd.DataFrame:
+        reading = SchemaReading(self.path, columns)
+        data = pd.read_csv(self.path, usecols=columns, nrows=limit, **reading.options)
+        if limit is None:
+            reading.add(data)
+            reading.store()
+        return data
+
+    @override
+    def can_extract_chunks(self) -> bool:
+        return True
+
+    @override
+    def extract_chunks(
+        self, columns: list[str] | None, chunk_rows: int
+    ) -> Iterator[pd.DataFrame]:
+        reading = SchemaReading(self.path, columns)
+        with pd.read_csv(
+            self.path, usecols=columns, chunksize=chunk_rows, **reading.options
+        ) as reader:
+            for chunk in reader:
+                reading.add(chunk)
+                yield chunk
+        # the types of all the chunks together, which may differ from the
+        # types of each chunk (e.g. ints in a chunk and floats in the next)
+        reading.store()
+
+    @override
+    def can_extract_rows(self) -> bool:
+        # the byte offsets of a compressed file aren't the ones of its rows
+        return not self.path.lower().endswith(compressed_extensions)
+
+    @override
+    def row_count(self) -> int:
+        return csv_index(self.path).rows
+
+    @override
+    def extract_rows(
+        self, start: int, stop: int, columns: list[str] | None
+    ) -> pd.DataFrame:
+        index = csv_index(self.path)
+        stop = min(stop, index.rows)
+        if start >= stop:
+            return pd.DataFrame(columns=index.header)[columns or index.header]
+        # read from the indexed rows around the range
+        first, begin = index.row_offset(start)
+        next_indexed = -(-stop // index.step)
+        end = (
+            int(index.offsets[next_indexed])
+            if next_indexed < len(index.offsets)
+            else index.size
+        )
+        with open(self.path, "rb") as file:
+            file.seek(begin)
+            content = file.read(end - begin)
+        data = pd.read_csv(
+            io.BytesIO(content),
+            header=None,
+            names=index.header,
+            usecols=columns,
+            nrows=stop - first,
+            **SchemaReading(self.path, columns).options,
+        ).iloc[start - first :]
+        data.index = pd.RangeIndex(start, stop)
+        return data
+
+    @override
+    def can_extract_ranges(self) -> bool:
+        return self.can_extract_rows()
+
+    @override
+    def split_ranges(self, parts: int) -> list[tuple[int, int]]:
+        # cut where indexed rows start, never inside a quoted value
+        return csv_index(self.path).balanced_ranges(parts)
+
+    @override
+    def extract_range(
+        self, start: int, end: int, columns: list[str] | None
+    ) -> pd.DataFrame:
+        # a range holds the lines that start in it, the ones before and after
+        # it are cut at line breaks
+        names = csv_index(self.path).header
+        with open(self.path, "rb") as file:
+            if start == 0:
+                file.readline()
+            else:
+                file.seek(start - 1)
+                file.readline()
+            begin = file.tell()
+            content = b""
+            if begin < end:
+                file.seek(end - 1)
+                file.readline()
+                stop = file.tell()
+                file.seek(begin)
+                content = file.read(stop - begin)
+        if not content.strip():
+            return pd.DataFrame(columns=names)[columns or names]
+        return pd.read_csv(
+            io.BytesIO(content),
+            header=None,
+            names=names,
+            usecols=columns,
+            **SchemaReading(self.path, columns).options,
+        )
 
     @override
     def load(self, data: pd.DataFrame) -> None:
@@ -42,8 +168,14 @@ class EXCELFlatData(IFlatData):
         IFlatData.__init__(self, path)
 
     @override
-    def extract(self) -> pd.DataFrame:
-        return pd.read_excel(self.path)
+    def extract(
+        self, columns: list[str] | None = None, limit: int | None = None
+    ) -> pd.DataFrame:
+        if limit is not None and not is_cached(self.path, "sheet 0"):
+            # a few rows aren't worth parsing the whole sheet to keep it
+            return pd.read_excel(self.path, usecols=columns, nrows=limit)
+        data = cached_extract(self.path, "sheet 0", lambda: pd.read_excel(self.path))
+        return self.select_columns(data, columns, limit)
 
     @override
     def load(self, data: pd.DataFrame) -> None:
@@ -53,13 +185,37 @@ class EXCELFlatData(IFlatData):
 class JSONFlatData(IFlatData):
     def __init__(self, path: str) -> None:
         IFlatData.__init__(self, path)
+        # JSON lines files hold one record per line and can be read line by line
+        self.lines: bool = self.path.lower().endswith((".jsonl", ".ndjson"))
+
+    @override
+    def extract(
+        self, columns: list[str] | None = None, limit: int | None = None
+    ) -> pd.DataFrame:
+        if self.lines:
+            data = pd.read_json(self.path, lines=True, nrows=limit)
+            return self.select_columns(data, columns)
+        return self.select_columns(pd.read_json(self.path), columns, limit)
+
+    @override
+    def can_extract_chunks(self) -> bool:
+        return self.lines
 
     @override
-    def extract(self) -> pd.DataFrame:
-        return pd.read_json(self.path)
+    def extract_chunks(
+        self, columns: list[str] | None, chunk_rows: int
+    ) -> Iterator[pd.DataFrame]:
+        if not self.lines:
+            yield self.extract(columns)
+            return
+        with pd.read_json(self.path, lines=True, chunksize=chunk_rows) as reader:
+            for chunk in reader:
+                yield self.select_columns(chunk, columns)
 
     @override
     def load(self, data: pd.DataFrame) -> None:
+        if self.lines:
+            return data.to_json(self.path, orient="records", lines=True)
         return data.to_json(self.path)
 
 
@@ -68,8 +224,11 @@ class XMLFlatData(IFlatData):
         IFlatData.__init__(self, path)
 
     @override
-    def extract(self) -> pd.DataFrame:
-        return pd.read_xml(self.path)
+    def extract(
+        self, columns: list[str] | None = None, limit: int | None = None
+    ) -> pd.DataFrame:
+        data = cached_extract(self.path, "document", lambda: pd.read_xml(self.path))
+        return self.select_columns(data, columns, limit)
 
     @override
     def load(self, data: pd.DataFrame) -> None:
@@ -107,9 +266,16 @@ class HTMLFlatData(IFlatData):
         IFlatData.__init__(self, path)
 
     @override
-    def extract(self) -> pd.DataFrame:
+    def extract(
+        self, columns: list[str] | None = None, limit: int | None = None
+    ) -> pd.DataFrame:
         file_path, table_number = self.path.split("|", 1)
-        return pd.read_html(file_path)[int(table_number) - 1]
+        data = cached_extract(
+            file_path,
+            f"table {table_number}",
+            lambda: pd.read_html(file_path)[int(table_number) - 1],
+        )
+        return self.select_columns(data, columns, limit)
 
     @override
     def load(self, data: pd.DataFrame) -> None:
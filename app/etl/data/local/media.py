@@ -25,7 +25,9 @@ class BirdImagesMedia(IMedia):
     def __init__(self, path: str):
         IMedia.__init__(self, path)
 
-    def extract(self) -> DataFrame:
+    def extract(
+        self, columns: list[str] | None = None, limit: int | None = None
+    ) -> DataFrame:
         return DataFrame(get_details(self.path))
 
 
@@ -33,7 +35,9 @@ class VideoMaximumBirdsInFrameMedia(IMedia):
     def __init__(self, path: str):
         IMedia.__init__(self, path)
 
-    def extract(self) -> DataFrame:
+    def extract(
+        self, columns: list[str] | None = None, limit: int | None = None
+    ) -> DataFrame:
         data_dictionary: dict[Any, Any] = read_and_detect(self.path)
         #! DataFrame(data_dictionary, index=[0]) will work fine only if the dictionary keys and values are scaler
         return DataFrame(data_dictionary, index=[0])
@@ -0,0 +1,203 @@
+import hashlib
+import json
+import os
+import threading
+from typing import Any
+
+import pandas as pd
+
+from app.etl.settings import settings
+
+
+schema_version = 3
+
+
+def column_kind(values: pd.Series) -> str:
+    """
+    What a column read without a schema holds: "empty" (only nulls), "int",
+    "float", "bool", "string" (only strings) or "object" (anything else, left
+    to pandas to infer).
+    """
+    if not values.notna().any():
+        return "empty"
+    kind = values.dtype.kind
+    if kind == "i":
+        return "int"
+    if kind == "f":
+        return "float"
+    if kind == "b":
+        return "bool"
+    if kind != "O":
+        return "object"
+    # the types are checked on the distinct values, much fewer than the rows
+    distinct = pd.Series(values.unique()).dropna()
+    if pd.api.types.infer_dtype(distinct, skipna=False) != "string":
+        return "object"
+    return "string"
+
+
+def merge_kinds(first: str, second: str) -> str:
+    """The kind of a column whose parts have the given kinds."""
+    if first == "empty":
+        # the nulls of the empty part make an int column float, and a bool
+        # column object (a bool dtype can't hold nulls)
+        if second == "int":
+            return "float"
+        return "object" if second == "bool" else second
+    if second == "empty":
+        return merge_kinds(second, first)
+    if first == second:
+        return first
+    if {first, second} == {"int", "float"}:
+        return "float"
+    return "object"
+
+
+class SchemaBuilder:
+    """Infers the schema of a file from the DataFrames of all its rows."""
+
+    def __init__(self):
+        self.columns: dict[str, str] = {}
+
+    def add(self, data: pd.DataFrame) -> None:
+        for name in data.columns:
+            kind = column_kind(data[name])
+            if name in self.columns:
+                kind = merge_kinds(self.columns[name], kind)
+            self.columns[name] = kind
+
+    def schema(self) -> dict[str, str]:
+        return dict(self.columns)
+
+
+# the dtypes a column of each kind is read with, the ones pandas would infer
+# for it anyway, so a cached schema never changes what a query sees (the
+# strings aren't parsed as dates or made categorical)
+kind_dtypes: dict[str, Any] = {
+    "int": "int64",
+    "float": "float64",
+    "empty": "float64",
+    "bool": "bool",
+    "string": object,
+}
+
+
+def read_options(schema: dict[str, str], columns: list[str] | None) -> dict[str, Any]:
+    """
+    The arguments of `pd.read_csv` that read the given columns with the types
+    of the schema, so pandas doesn't infer them again.
+    """
+    dtypes = {
+        name: kind_dtypes[schema[name]]
+        for name in (columns if columns is not None else schema)
+        if schema.get(name) in kind_dtypes
+    }
+    return {"dtype": dtypes}
+
+
+def schema_path(path: str) -> str:
+    name = hashlib.sha256(os.path.abspath(path).encode()).hexdigest()
+    return os.path.join(settings.cache_directory, "schema", f"{name}.json")
+
+
+# the schemas already loaded in this process, by path, with the modification
+# time and size of the file they were inferred from
+loaded_schemas: dict[str, tuple[int, int, dict]] = {}
+schemas_lock = threading.Lock()
+
+
+def file_status(path: str) -> tuple[int, int]:
+    status = os.stat(path)
+    return status.st_mtime_ns, status.st_size
+
+
+def cached_schema(path: str) -> dict[str, str] | None:
+    """
+    The schema inferred from a previous read of the file, None when it was
+    never fully read or changed since.
+    """
+    if not settings.schema_cache or not os.path.isfile(path):
+        return None
+    status = file_status(path)
+    with schemas_lock:
+        loaded = loaded_schemas.get(path)
+    if loaded is None or loaded[:2] != status:
+        # another process may have stored the schema of the file since
+        loaded = None
+        try:
+            with open(schema_path(path)) as file:
+                stored = json.load(file)
+            if stored.get("version") == schema_version:
+                loaded = (stored["modified"], stored["size"], stored["columns"])
+        except (OSError, ValueError, KeyError):
+            return None
+        if loaded is not None:
+            with schemas_lock:
+                loaded_schemas[path] = loaded
+    if loaded is None or loaded[:2] != status:
+        return None
+    return loaded[2]
+
+
+def store_schema(path: str, builder: SchemaBuilder, status: tuple[int, int]) -> None:
+    """
+    Stores the schema inferred from a read of the file, merged with the
+    columns of a previous read of other columns. `status` is the
+    modification time and size of the file when the read started.
+    """
+    if not settings.schema_cache or file_status(path) != status:
+        return
+    schema = dict(cached_schema(path) or {})
+    schema.update(builder.schema())
+    with schemas_lock:
+        loaded_schemas[path] = (*status, schema)
+    target = schema_path(path)
+    try:
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        temporary = f"{target}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temporary, "w") as file:
+            json.dump(
+                {
+                    "version": schema_version,
+                    "path": os.path.abspath(path),
+                    "modified": status[0],
+                    "size": status[1],
+                    "columns": schema,
+                },
+                file,
+            )
+        os.replace(temporary, target)
+    except OSError:
+        # a read-only cache directory, the schema lives in memory only
+        pass
+
+
+class SchemaReading:
+    """
+    A read of (some columns of) a file: `options` read the columns with the
+    types of the cached schema, and the types of the columns it doesn't have
+    yet are inferred from the rows given to `add` and stored by `store`, once
+    all the rows were added.
+    """
+
+    def __init__(self, path: str, columns: list[str] | None):
+        self.path = path
+        self.status = (
+            file_status(path)
+            if settings.schema_cache and os.path.isfile(path)
+            else None
+        )
+        self.schema = cached_schema(path) if self.status is not None else None
+        self.options = read_options(self.schema or {}, columns)
+        self.builder = SchemaBuilder()
+
+    def add(self, data: pd.DataFrame) -> None:
+        if self.status is None:
+            return
+        missing = [name for name in data.columns if name not in (self.schema or {})]
+        if missing:
+            self.builder.add(data[missing])
+
+    def store(self) -> None:
+        if self.status is not None and self.builder.columns:
+            store_schema(self.path, self.builder, self.status)
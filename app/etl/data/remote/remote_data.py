@@ -20,7 +20,9 @@ class GEEDataExtractor(FieldPathBase, IExtractor):
         # GoogleEarthAPIDataCollector no longer requires a project id at init
         self.gee_api_collector = GoogleEarthAPIDataCollector()
 
-    def extract(self) -> DataFrame:
+    def extract(
+        self, columns: list[str] | None = None, limit: int | None = None
+    ) -> DataFrame:
 
         return self.gee_api_collector.collect(
             satellite=self.path_parts[0],
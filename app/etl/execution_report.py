@@ -0,0 +1,87 @@
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Iterator
+
+
+@dataclass(frozen=True)
+class SourceTiming:
+    source_type: str
+    path: str
+    rows: int | None
+    seconds: float
+    thread: str
+
+
+@dataclass
+class ExecutionReport:
+    """What the execution of a query's python code did and how long it took."""
+
+    seconds: float = 0.0
+    sources: list[SourceTiming] = field(default_factory=list)
+
+    def __post_init__(self):
+        self.__lock = threading.Lock()
+
+    def add_source(self, timing: SourceTiming) -> None:
+        # sources extracted concurrently are added from different threads
+        with self.__lock:
+            self.sources.append(timing)
+
+    @property
+    def extraction_seconds(self) -> float:
+        return sum(timing.seconds for timing in self.sources)
+
+    def summary(self) -> str:
+        lines = [f"executed in {self.seconds:.3f} s"]
+        for timing in self.sources:
+            rows = "?" if timing.rows is None else timing.rows
+            lines.append(
+                f"  extracted {timing.source_type}:{timing.path} ({rows} rows) "
+                f"in {timing.seconds:.3f} s on {timing.thread}"
+            )
+        return "\n".join(lines)
+
+
+# the report of the execution running in the current context, if any
+current_report: ContextVar[ExecutionReport | None] = ContextVar(
+    "current_report", default=None
+)
+
+
+@contextmanager
+def reporting(report: ExecutionReport) -> Iterator[ExecutionReport]:
+    """Makes the report the current one while running the block, and times it."""
+    token = current_report.set(report)
+    start_time = time.perf_counter()
+    try:
+        yield report
+    finally:
+        report.seconds = time.perf_counter() - start_time
+        current_report.reset(token)
+
+
+@contextmanager
+def timed_source(source_type: str, path: str) -> Iterator[dict]:
+    """
+    Times the extraction of a data source into the current report. The block
+    sets the number of extracted rows in the yielded dict's "rows" item.
+    """
+    report = current_report.get()
+    measures: dict = {"rows": None}
+    start_time = time.perf_counter()
+    try:
+        yield measures
+    finally:
+        if report is not None:
+            report.add_source(
+                SourceTiming(
+                    source_type,
+                    path,
+                    measures["rows"],
+                    time.perf_counter() - start_time,
+                    threading.current_thread().name,
+                )
+            )
@@ -1,80 +1,154 @@
+import numpy as np
 import pandas as pd
 import re
-from typing import Any, Generic, Tuple, TypeVar
+from typing import Any, Callable, Generic, Tuple, TypeVar
 
 from app.compiler.ast_nodes import *
 
 
+# computes the aggregations of the groups of the rows, like `group_aggregates`
+Aggregate = Callable[[pd.DataFrame, list[str], list[tuple[str, str]]], pd.DataFrame]
+
+
 def column_index_to_column_name(
     data: pd.DataFrame, parameter: ColumnIndexNode
 ) -> ColumnNameNode:
     return ColumnNameNode(data.columns[parameter.index])
 
 
-def apply_filtering(data: pd.DataFrame, filters_expressions_tree: dict) -> pd.DataFrame:
-    # if it's a unary expression
-    if len(filters_expressions_tree) == 2:
-        operator: str = filters_expressions_tree["type"]
-        operand: dict = filters_expressions_tree["operand"]
-        if operator == "not":
-            removed_data = apply_filtering(data, operand)
-            return pd.concat([data, removed_data]).drop_duplicates(keep=False)
+def resolve_filter_operand(data: pd.DataFrame, operand: Any) -> Any:
+    """
+    Resolves a leaf operand of a filters expressions tree to a value that can
+    be compared in a vectorized way: a column `pd.Series` when the operand is
+    a column name or a column number (e.g. `[2]`), or a scalar literal when it
+    is a quoted string or a number.
+    """
+    if type(operand) != str:
+        return operand
+    if operand.startswith('"') and operand.endswith('"'):
+        return operand[1:-1]
+    if is_index(operand):
+        return data[column_index_to_name(data, operand)]
+    return data[operand]
+
+
+def like_pattern_to_regex(pattern: str) -> str:
+    pattern = re.escape(pattern)
+    pattern = pattern.replace(r"\%", "%").replace(r"\_", "_")
+    pattern = pattern.replace("%", ".*").replace("_", ".")
+    return f"^{pattern}$"
+
+
+def has_pattern_matching(filters_expressions_tree: dict) -> bool:
     operator: str = filters_expressions_tree["type"]
-    if operator == "or" or operator == "and":
-        # if it's a binary expression
-        left_operand: dict = filters_expressions_tree["left"]
-        right_operand: dict = filters_expressions_tree["right"]
-        # data after applying left operand
-        left = apply_filtering(data, left_operand)
-        right = apply_filtering(data, right_operand)
-
-        if operator == "or":
-            data = pd.concat([left, right])
-        else:
-            data = pd.merge(left, right)
-        return data[~data.index.duplicated(keep="first")]
-
-    left_operand: str = filters_expressions_tree["left"]
-
-    right_operand = filters_expressions_tree["right"]
-    # region get the value in the right operand and check if it is an int or float or string or its a column passed by name or number
-    if type(right_operand) == str:
-        if right_operand.startswith('"') and right_operand.endswith('"'):
-            right_operand: str = right_operand[1:-1]
-        elif right_operand.startswith("[") and right_operand.endswith("]"):
-            column_number = int(right_operand[1:-1])
-            right_operand: pd.DataFrame = data[data.columns[column_number]]
-        else:
-            right_operand: pd.DataFrame = data[right_operand]
-    # endregion
-    # get the column in the left operand and check if its passed by name or number
-    if left_operand.startswith("[") and left_operand.endswith("]"):
-        column_number = int(left_operand[1:-1])
-        left_operand = data[data.columns[column_number]]
-    else:
-        left_operand = data[left_operand]
-
-    if operator == "like":
-        pattern = re.escape(right_operand)
-        pattern = pattern.replace(r"\%", "%").replace(r"\_", "_")
-        pattern = pattern.replace("%", ".*").replace("_", ".")
-        pattern = f"^{pattern}$"
-        return data[left_operand.astype(str).str.match(pattern, na=False)]
-
-    if operator == ">":
-        return data[left_operand > right_operand]
-    if operator == ">=":
-        return data[left_operand >= right_operand]
+    if operator == "not":
+        return has_pattern_matching(filters_expressions_tree["operand"])
+    if operator in ("and", "or"):
+        return has_pattern_matching(
+            filters_expressions_tree["left"]
+        ) or has_pattern_matching(filters_expressions_tree["right"])
+    return operator == "like"
+
+
+def build_filter_mask(data: pd.DataFrame, filters_expressions_tree: dict) -> pd.Series:
+    """
+    Compiles a filters expressions tree (as produced by the `where` rule of the
+    parser) into one boolean mask aligned with `data.index`.
+
+    Leaves are evaluated as vectorized comparisons and the inner nodes are
+    combined with `&`, `|` and `~`. The right operand of an AND or an OR that
+    has LIKE pattern matching is only evaluated on the rows the left operand
+    leaves undecided.
+
+    Parameters
+    ----------
+    data : pd.DataFrame
+        The DataFrame the filters are evaluated against.
+    filters_expressions_tree : dict
+        Either a binary node `{"type": ..., "left": ..., "right": ...}` (where
+        the right operand of an `in` node is a list of literals), a unary node
+        `{"type": "not", "operand": ...}` or a `{"type": "const", "value": ...}`.
+
+    Returns
+    -------
+    pd.Series
+        A boolean Series, True for the rows that satisfy the filters.
+    """
+    operator: str = filters_expressions_tree["type"]
+    if operator == "const":
+        return pd.Series(
+            filters_expressions_tree["value"], index=data.index, dtype=bool
+        )
+    if operator == "not":
+        return ~build_filter_mask(data, filters_expressions_tree["operand"])
+    if operator in ("and", "or"):
+        left_mask = build_filter_mask(data, filters_expressions_tree["left"])
+        right_tree = filters_expressions_tree["right"]
+        if not has_pattern_matching(right_tree):
+            right_mask = build_filter_mask(data, right_tree)
+            return (
+                left_mask & right_mask if operator == "and" else left_mask | right_mask
+            )
+        # an expensive right operand is only evaluated on the rows it can still
+        # change: the rows the left operand kept for AND, the ones it dropped for OR
+        undecided = left_mask if operator == "and" else ~left_mask
+        if undecided.all():
+            return build_filter_mask(data, right_tree)
+        mask = left_mask.copy()
+        if undecided.any():
+            mask[undecided.to_numpy()] = build_filter_mask(
+                data[undecided.to_numpy()], right_tree
+            ).to_numpy()
+        return mask
+
+    left_operand = resolve_filter_operand(data, filters_expressions_tree["left"])
+    right_operand = resolve_filter_operand(data, filters_expressions_tree["right"])
+
+    if operator == "in":
+        if not isinstance(left_operand, pd.Series):
+            left_operand = pd.Series(left_operand, index=data.index)
+        values = [resolve_filter_operand(data, value) for value in right_operand]
+        mask = left_operand.isin(values)
+    elif operator == "like":
+        if not isinstance(left_operand, pd.Series):
+            left_operand = pd.Series(left_operand, index=data.index)
+        mask = left_operand.astype(str).str.match(
+            like_pattern_to_regex(right_operand), na=False
+        )
+    elif operator == ">":
+        mask = left_operand > right_operand
+    elif operator == ">=":
+        mask = left_operand >= right_operand
     elif operator == "<":
-        return data[left_operand < right_operand]
+        mask = left_operand < right_operand
     elif operator == "<=":
-        return data[left_operand <= right_operand]
+        mask = left_operand <= right_operand
     elif operator == "==":
-        return data[left_operand == right_operand]
+        mask = left_operand == right_operand
     elif operator == "!=" or operator == "<>":
-        return data[left_operand != right_operand]
+        mask = left_operand != right_operand
+    else:
+        mask = True
 
-    return data
+    # comparing two literals gives back a scalar, broadcast it over the rows
+    if not isinstance(mask, pd.Series):
+        mask = pd.Series(bool(mask), index=data.index)
+    return mask
+
+
+def apply_filtering(data: pd.DataFrame, filters_expressions_tree: dict) -> pd.DataFrame:
+    return data[build_filter_mask(data, filters_expressions_tree)]
+
+
+def apply_alias(data: pd.DataFrame, alias: str) -> pd.DataFrame:
+    """
+    Names the columns of a data source `alias.column`. Unlike `add_prefix` the
+    renamed frame shares the data of the given one instead of copying it.
+    """
+    # a shallow copy, renamed without changing the columns of the given frame
+    aliased = data.copy(deep=False)
+    aliased.columns = [f"{alias}.{column}" for column in data.columns]
+    return aliased
 
 
 def get_scaler_aggregate(df: pd.DataFrame, aggregate: str, column: str) -> Any:
@@ -115,13 +189,15 @@ def get_scaler_aggregate(df: pd.DataFrame, aggregate: str, column: str) -> Any:
         return df[column].sum()
     elif aggregate == "count":
         # Count of non-null values
-        return df[column].shape[0]
+        return df[column].count()
     elif aggregate == "first":
-        # First value in the column
-        return df[column].iloc[0]
+        # First non-null value in the column
+        values = df[column].dropna()
+        return values.iloc[0] if len(values) else np.nan
     elif aggregate == "last":
-        # Last value in the column
-        return df[column].iloc[-1]
+        # Last non-null value in the column
+        values = df[column].dropna()
+        return values.iloc[-1] if len(values) else np.nan
     elif aggregate == "mean":
         # Average (mean) of values
         return df[column].mean()
@@ -160,15 +236,112 @@ def get_scaler_aggregate(df: pd.DataFrame, aggregate: str, column: str) -> Any:
         return None
 
 
-def generate_aggregation_row(df: pd.DataFrame, aggregation_list: list[Tuple[str, str]]):
+# the aggregates `column_aggregates` computes from the non-null values of a
+# numeric column, the others are left to `get_scaler_aggregate`
+numeric_aggregates = {
+    "sum",
+    "count",
+    "first",
+    "last",
+    "mean",
+    "median",
+    "min",
+    "max",
+    "std",
+    "var",
+    "prod",
+    "sem",
+    "quantile",
+    "nunique",
+}
+
+
+def column_aggregates(values: pd.Series, aggregates: set[str]) -> dict[str, Any]:
+    """
+    Computes the aggregates of a numeric column together, so the work they
+    share is done once: the non-null values are selected once, the sum feeds
+    the mean, the mean and the sum of squared deviations feed var, std and sem,
+    and median and quantile (of 0.5) are the same value. Nulls are skipped
+    like pandas does (`count` is the number of non-null values).
+    """
+    array = values.to_numpy()
+    mask = ~np.isnan(array) if array.dtype.kind == "f" else None
+    valid = array if mask is None or mask.all() else array[mask]
+    count = len(valid)
+    results: dict[str, Any] = {}
+    if "count" in aggregates:
+        results["count"] = count
+    if "first" in aggregates:
+        results["first"] = valid[0] if count else np.nan
+    if "last" in aggregates:
+        results["last"] = valid[-1] if count else np.nan
+    if "min" in aggregates:
+        results["min"] = valid.min() if count else np.nan
+    if "max" in aggregates:
+        results["max"] = valid.max() if count else np.nan
+    if "prod" in aggregates:
+        results["prod"] = valid.prod()
+    if "nunique" in aggregates:
+        results["nunique"] = len(pd.unique(valid))
+    if aggregates & {"median", "quantile"}:
+        median = np.median(valid) if count else np.nan
+        results.update(dict.fromkeys(aggregates & {"median", "quantile"}, median))
+    if aggregates & {"sum", "mean", "var", "std", "sem"}:
+        total = valid.sum()
+        results["sum"] = total
+        mean = total / count if count else np.nan
+        results["mean"] = mean
+        if aggregates & {"var", "std", "sem"}:
+            if count > 1:
+                deviations = valid - mean
+                variance = np.dot(deviations, deviations) / (count - 1)
+            else:
+                variance = np.nan
+            results["var"] = variance
+            results["std"] = np.sqrt(variance)
+            results["sem"] = np.sqrt(variance / count) if count else np.nan
+    return results
+
+
+def generate_aggregation_row(
+    df: pd.DataFrame,
+    aggregation_list: list[Tuple[str, str]],
+    aggregate: Aggregate | None = None,
+):
+    """
+    The row of the aggregations of all the rows, with a column per item of
+    `aggregation_list` named by `aggregation_name`. `aggregate` computes the
+    aggregations instead when given, as one group without group columns.
+    """
+    if aggregate is not None:
+        aggregated = aggregate(df, [], aggregation_list)
+        return aggregated[[aggregation_name(*item) for item in aggregation_list]]
+    # the aggregates of each column, computed together in `column_aggregates`
+    column_aggregate_names: dict[str, set[str]] = {}
+    for agg_func, column in aggregation_list:
+        column_aggregate_names.setdefault(column, set()).add(agg_func)
+    column_values: dict[str, dict[str, Any]] = {}
+    for column, aggregates in column_aggregate_names.items():
+        if (
+            column != "*"
+            and df[column].dtype.kind in "iuf"
+            and aggregates <= numeric_aggregates
+        ):
+            column_values[column] = column_aggregates(df[column], aggregates)
+
     agg_dict = {}
     new_column_names: list[str] = [None] * len(aggregation_list)
     for index, item in enumerate(aggregation_list):
         agg_func, column = item
+        if column in column_values:
+            column_value = column_values[column][agg_func]
+        else:
+            column_value = get_scaler_aggregate(
+                df, agg_func, "rows" if column == "*" else column
+            )
         if column == "*":
             column = "rows"
         new_column_name = f"{agg_func}_{column}"
-        column_value = get_scaler_aggregate(df, agg_func, column)
         if new_column_name not in agg_dict:
             agg_dict[new_column_name] = column_value
         new_column_names[index] = new_column_name
@@ -284,50 +457,151 @@ def check_if_column_names_is_in_group_by(
     return all(column_name in groupby_columns for column_name in columns_names)
 
 
+def aggregation_name(aggregate: str, column: str) -> str:
+    """The name of an aggregation's column in the result, e.g. `sum_age`."""
+    return f"{aggregate}_{'rows' if column == '*' else column}"
+
+
+def group_aggregates(
+    df: pd.DataFrame,
+    groupby_columns: list[str],
+    aggregations: list[tuple[str, str]],
+) -> pd.DataFrame:
+    """
+    Groups the rows by the given columns and computes the aggregations of each
+    group. The result has a row per group, in the order the groups first
+    appear, with the group columns followed by a column per distinct
+    aggregation named by `aggregation_name`.
+
+    `size` (and `count` of a column without nulls, or of `*`) is read from
+    the group sizes, the other aggregations are computed by one named
+    aggregation. Groups with a null key are left out.
+
+    Dictionary-encoded (categorical) keys are grouped by their codes, only
+    the categories that appear in the rows make groups.
+    """
+    grouped = df.groupby(groupby_columns, sort=False, observed=True)
+    named_aggregations: dict[str, tuple[str, str]] = {}
+    size_names: list[str] = []
+    for aggregate, column in aggregations:
+        name = aggregation_name(aggregate, column)
+        if name in named_aggregations or name in size_names:
+            continue
+        if aggregate == "size" or (
+            aggregate == "count" and (column == "*" or not df[column].hasnans)
+        ):
+            size_names.append(name)
+        else:
+            named_aggregations[name] = (column, aggregate)
+    if named_aggregations:
+        result = grouped.agg(**named_aggregations)
+    else:
+        result = pd.DataFrame(index=grouped.size().index)
+    if size_names:
+        sizes = grouped.size()
+        for name in size_names:
+            result[name] = sizes
+    return result.reset_index()
+
+
+def select_group_columns(
+    grouped_df: pd.DataFrame, select_columns: list[str | tuple | AliasNode]
+) -> pd.DataFrame:
+    """The select columns of the grouped rows, under their aliases if any."""
+    names, output_names = [], []
+    for item in select_columns:
+        alias = None
+        if isinstance(item, AliasNode):
+            item, alias = item.expr, item.alias
+        if type(item) == tuple:
+            name = aggregation_name(item[0], item[1])
+            if len(item) == 3:
+                alias = item[2]
+        else:
+            name = item
+        names.append(name)
+        output_names.append(alias or name)
+    return grouped_df[names].set_axis(output_names, axis=1)
+
+
+def select_aggregations(select_columns: list) -> list[tuple[str, str]]:
+    aggregations = []
+    for item in select_columns:
+        if isinstance(item, AliasNode):
+            item = item.expr
+        if type(item) == tuple:
+            aggregations.append((item[0], item[1]))
+    return aggregations
+
+
 def apply_groupby(
-    df: pd.DataFrame, select_columns: list[str | tuple], groupby_columns: list[str]
+    df: pd.DataFrame,
+    select_columns: list[str | tuple],
+    groupby_columns: list[str],
+    aggregate: Aggregate | None = None,
 ) -> pd.DataFrame:
-    size_columns = []
-    for i in range(len(select_columns)):
-        c = select_columns[i]
-        if type(c) == tuple:
-            if c == ("size", "*"):
-                size_columns.append((i, "size_rows"))
-            elif c[0] == "size":
-                size_columns.append((i, f"size_{c[1]}"))
-
-    if size_columns:
-        for item in size_columns:
-            index: int = item[0]
-            select_columns[index] = ("size", df.columns[0])
-
-    new_column_names = list(
-        map(lambda x: "_".join(x) if type(x) == tuple else x, select_columns)
+    """
+    Groups the rows and selects the select columns of the groups. The groups
+    are computed by `aggregate`, `group_aggregates` by default.
+    """
+    grouped_df = (aggregate or group_aggregates)(
+        df, groupby_columns, select_aggregations(select_columns)
     )
+    return select_group_columns(grouped_df, select_columns)
 
-    dict = {}
-    aggregation_columns = list(filter(lambda x: type(x) == tuple, select_columns))
-    for agg_function, column in aggregation_columns:
-        current_functions: list = dict.get(column, list())
-        current_functions.append(agg_function)
-        dict[column] = current_functions
 
-    for column, agg_functions in dict.items():
-        dict[column] = list(set(agg_functions))
-    grouped_df = df.groupby(groupby_columns).agg(dict).reset_index()
-    # region flatten columns
-    list_of_columns = flatten_columns(grouped_df)
-    grouped_df.columns = list_of_columns
-    # endregion
-    grouped_df = grouped_df[new_column_names]
+def order_keys(values: pd.Series, ascending: bool) -> np.ndarray | None:
+    """
+    Numbers without nulls that sort like the given column does in the given
+    direction when sorted ascending, nulls sorting last like in `sort_values`.
+    Returns None when the values can't be compared with each other.
+    """
+    if values.dtype.kind == "f" and not values.hasnans:
+        keys = values.to_numpy()
+        return keys if ascending else -keys
+    if values.dtype.kind == "i" and values.min() > np.iinfo(values.dtype).min:
+        keys = values.to_numpy()
+        return keys if ascending else -keys
+    try:
+        codes, _ = pd.factorize(values, sort=True)
+    except TypeError:
+        return None
+    if ascending:
+        # the nulls' code is -1, put them after the largest value
+        return np.where(codes < 0, codes.max() + 1, codes)
+    return -codes
 
-    if size_columns:
-        original_columns_names = new_column_names.copy()
-        for i, column in size_columns:
-            original_columns_names[i] = column
-        grouped_df.columns = original_columns_names
 
-    return grouped_df
+def top_rows(
+    data: pd.DataFrame,
+    columns: list[str],
+    ascending: list[bool],
+    limit_or_tail: tuple[str, int],
+) -> pd.DataFrame:
+    """
+    The rows a LIMIT (or a TAIL) keeps of the data sorted by the columns, the
+    same rows in the same order as a stable `sort_values` followed by `head`
+    (or `tail`), without sorting all the rows: the columns are turned into
+    keys sorted in the same direction (see `order_keys`), the rows are
+    selected with `nsmallest`/`nlargest` and only those are sorted.
+    """
+    operator, number = limit_or_tail
+    if number >= len(data):
+        return data.sort_values(columns, ascending=ascending, kind="stable")
+    keys = [order_keys(data[column], way) for column, way in zip(columns, ascending)]
+    if any(key is None for key in keys):
+        data = data.sort_values(columns, ascending=ascending, kind="stable")
+        return data.head(number) if operator == "limit" else data.tail(number)
+    keys_df = pd.DataFrame({index: key for index, key in enumerate(keys)})
+    if operator == "limit":
+        selected = keys_df.nsmallest(number, list(keys_df.columns), keep="first")
+    else:
+        # the last rows among equal keys are the ones a tail keeps
+        selected = keys_df.nlargest(number, list(keys_df.columns), keep="last")
+    positions = np.sort(selected.index.to_numpy())
+    # a stable sort of the selected rows, by the first key then the next ones
+    order = np.lexsort([key[positions] for key in reversed(keys)])
+    return data.iloc[positions[order]]
 
 
 def apply_groupby_with_order(
@@ -335,7 +609,14 @@ def apply_groupby_with_order(
     select_columns: list[str | tuple],
     groupby_columns: list[str],
     order_by_node: OrderByNode,
+    limit_or_tail: tuple[str, int] | None = None,
+    aggregate: Aggregate | None = None,
 ) -> pd.DataFrame:
+    """
+    Groups like `apply_groupby` and orders the groups. The LIMIT or TAIL of the
+    query is given as `limit_or_tail` so only the groups it keeps are selected
+    instead of sorting them all (see `top_rows`).
+    """
     order_parameters = order_by_node.parameters
     test_set = set(groupby_columns)
     for order_parameter in order_parameters:
@@ -372,105 +653,47 @@ def apply_groupby_with_order(
     if len(order_columns) != len(set(order_columns)):
         raise Exception("there are duplicate columns in order by")
 
-    size_columns_order = []
-    for i in range(len(order_columns)):
-        c = order_columns[i]
-        if type(c) == tuple:
-            if c == ("size", "*"):
-                size_columns_order.append((i, "size_rows"))
-            elif c[0] == "size":
-                size_columns_order.append((i, f"size_{c[1]}"))
-
-    size_columns = []
-    for i in range(len(select_columns)):
-        c = select_columns[i]
-        if type(c) == tuple:
-            if c == ("size", "*"):
-                size_columns.append((i, "size_rows"))
-            elif c[0] == "size":
-                size_columns.append((i, f"size_{c[1]}"))
-
-    for item in size_columns:
-        index: int = item[0]
-        select_columns[index] = ("size", df.columns[0])
-
-    for item in size_columns_order:
-        index: int = item[0]
-        order_columns[index] = ("size", df.columns[0])
-
-    new_column_names = list(
-        map(lambda x: "_".join(x) if type(x) == tuple else x, select_columns)
+    order_aggregations = [column for column in order_columns if type(column) == tuple]
+    grouped_df = (aggregate or group_aggregates)(
+        df, groupby_columns, select_aggregations(select_columns) + order_aggregations
     )
-    order_columns_names = list(
-        map(lambda x: "_".join(x) if type(x) == tuple else x, order_columns)
-    )
-
-    dict = {}
-    aggregation_columns = list(
-        filter(lambda x: type(x) == tuple, select_columns + order_columns)
-    )
-    for agg_function, column in aggregation_columns:
-        current_functions: list = dict.get(column, list())
-        current_functions.append(agg_function)
-        dict[column] = current_functions
-
-    for column, agg_functions in dict.items():
-        dict[column] = list(set(agg_functions))
-    grouped_df: pd.DataFrame = df.groupby(groupby_columns).agg(dict).reset_index()
-
-    # region flatten columns
-    list_of_columns = flatten_columns(grouped_df)
-    grouped_df.columns = list_of_columns
-    # endregion
-    grouped_df = grouped_df.sort_values(
-        order_columns_names, ascending=order_ways_boolean
-    )[new_column_names]
+    order_columns_names = [
+        aggregation_name(*column) if type(column) == tuple else column
+        for column in order_columns
+    ]
+    if limit_or_tail and limit_or_tail[1] > 0:
+        grouped_df = top_rows(
+            grouped_df, order_columns_names, order_ways_boolean, limit_or_tail
+        )
+    else:
+        grouped_df = grouped_df.sort_values(
+            order_columns_names, ascending=order_ways_boolean, kind="stable"
+        )
+    return select_group_columns(grouped_df, select_columns)
 
-    if size_columns:
-        original_columns_names = new_column_names.copy()
-        for i, column in size_columns:
-            original_columns_names[i] = column
-        grouped_df.columns = original_columns_names
 
-    return grouped_df
+def apply_limit_or_tail(
+    data: pd.DataFrame, limit_or_tail: tuple[str, int]
+) -> pd.DataFrame:
+    operator, number = limit_or_tail
+    if number == 0:
+        # empty data frame
+        return pd.DataFrame(columns=data.columns)
+    if operator == "limit":
+        return data[:number]
+    return data[-number:]
 
 
-def flatten_columns(grouped_df) -> list:
+def apply_order_by_without_groupby(
+    data: pd.DataFrame,
+    order_by_node: OrderByNode,
+    limit_or_tail: tuple[str, int] | None = None,
+):
     """
-    This function takes in a grouped DataFrame and returns a list of
-    flattened column names. The function works by iterating over the
-    columns of the DataFrame and checking if the column is a tuple or
-    not. If the column is a tuple, it is assumed to be a multi-level
-    index and the function tries to flatten the column name by
-    concatenating the aggregation function and the column name with
-    an underscore. If the column is not a tuple, it is simply added to
-    the list of flattened column names.
-
-    Parameters
-    ----------
-    grouped_df : pd.DataFrame
-        The grouped DataFrame to flatten the column names of.
-
-    Returns
-    -------
-    list
-        A list of flattened column names.
+    Sorts the rows. When the LIMIT or TAIL that is applied to the sorted rows
+    is given as `limit_or_tail`, only the rows it keeps are selected and
+    sorted (see `top_rows`).
     """
-    list_of_columns = []
-    for column in grouped_df.columns:
-        if type(column) is tuple:
-            column_name: str = column[0]
-            agg: str = column[1]
-            if agg.strip():
-                list_of_columns.append(f"{agg}_{column_name}")
-            else:
-                list_of_columns.append(column_name)
-        else:
-            list_of_columns.append(column)
-    return list_of_columns
-
-
-def apply_order_by_without_groupby(data: pd.DataFrame, order_by_node: OrderByNode):
     order_parameters: list[OrderByParameter] = order_by_node.parameters
     if any(
         type(order_parameter.parameter) is AggregationNode
@@ -491,7 +714,9 @@ def apply_order_by_without_groupby(data: pd.DataFrame, order_by_node: OrderByNod
     ]
     if len(order_columns) != len(set(order_columns)):
         raise Exception("there are duplicate columns in order by")
-    data = data.sort_values(order_columns, ascending=order_ways_boolean)
+    if limit_or_tail and limit_or_tail[1] > 0:
+        return top_rows(data, order_columns, order_ways_boolean, limit_or_tail)
+    data = data.sort_values(order_columns, ascending=order_ways_boolean, kind="stable")
     return data
 
 
@@ -512,52 +737,3 @@ def apply_order_by_without_groupby(data: pd.DataFrame, order_by_node: OrderByNod
 #         return 'XML'
 #     elif re.search( r'(.+\.xlsx)| (.+\.xls) | (.+\.xlsm)| (.+\.xlsb)| (.+\.odf)| (.+\.ods)| (.+\.odt)', data_source):
 #         return 'EXCEL'
-
-
-def apply_join(
-    left_df: pd.DataFrame,
-    right_df: pd.DataFrame,
-    condition: dict,
-    join_type: str,
-    left_alias: str | None,
-    right_alias: str | None,
-) -> pd.DataFrame:
-    if left_alias:
-        left_df = left_df.add_prefix(f"{left_alias}.")
-    if right_alias:
-        right_df = right_df.add_prefix(f"{right_alias}.")
-
-    left_on = []
-    right_on = []
-
-    def extract_keys(cond):
-        if cond["type"] == "and":
-            extract_keys(cond["left"])
-            extract_keys(cond["right"])
-        elif cond["type"] == "==":
-            l, r = cond["left"], cond["right"]
-            # Check columns
-            if str(l) in left_df.columns and str(r) in right_df.columns:
-                left_on.append(l)
-                right_on.append(r)
-            elif str(l) in right_df.columns and str(r) in left_df.columns:
-                left_on.append(r)
-                right_on.append(l)
-
-    extract_keys(condition)
-
-    if not left_on or not right_on:
-        # Fallback if no keys found (e.g. cross join logic or complex condition)
-        # For inner join, we typically need keys.
-        # If keys are empty, pandas merge requires 'cross' or similar.
-        # Here we attempt a merge if keys exist, otherwise we might need to handle differently.
-        # For now, assuming keys are present for INNER JOIN.
-        result = pd.merge(left_df, right_df, how="cross")
-    else:
-        result = pd.merge(
-            left_df, right_df, left_on=left_on, right_on=right_on, how=join_type
-        )
-
-    # Apply the full condition as a filter to handle non-equi joins or complex logic
-    result = apply_filtering(result, condition)
-    return result
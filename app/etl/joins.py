@@ -0,0 +1,681 @@
+import itertools
+from typing import Any, Iterator
+
+import numpy as np
+import pandas as pd
+
+from app.compiler.pushdown import (
+    UnknownColumns,
+    add_condition_columns,
+    conjunction,
+    conjuncts,
+)
+from app.etl.helpers import apply_alias, build_filter_mask
+
+# the most (left row, right row) pairs checked at once when no equality key
+# nor range can narrow down the candidates, bounds the memory of a block
+max_pairs_per_block = 1_000_000
+
+range_operators = (">", ">=", "<", "<=")
+# the operator that keeps the meaning of a comparison when its operands are swapped
+swapped_range_operators = {">": "<", ">=": "<=", "<": ">", "<=": ">="}
+
+
+class JoinColumns:
+    """
+    The columns of the result of joining two DataFrames, named as `pd.merge`
+    names them: the left columns then the right ones, a right key column with
+    the same name as its left key is dropped (both hold the same values), and
+    the other names both sides have are suffixed with `_x` and `_y`.
+    """
+
+    def __init__(
+        self, left_df: pd.DataFrame, right_df: pd.DataFrame, coalesced: set[str]
+    ):
+        self.coalesced = coalesced
+        overlapping = (set(left_df.columns) & set(right_df.columns)) - coalesced
+        self.left: dict[Any, Any] = {
+            column: f"{column}_x" if column in overlapping else column
+            for column in left_df.columns
+        }
+        self.right: dict[Any, Any] = {
+            column: f"{column}_y" if column in overlapping else column
+            for column in right_df.columns
+            if column not in coalesced
+        }
+
+    def names(self) -> list:
+        return list(self.left.values()) + list(self.right.values())
+
+
+def sided_comparison(
+    condition: dict, left_df: pd.DataFrame, right_df: pd.DataFrame
+) -> tuple[str, str, str] | None:
+    """
+    Returns `(left column, operator, right column)` when the condition compares
+    a column of each side, written with the left side's column first.
+    """
+    operator = condition["type"]
+    if operator != "==" and operator not in range_operators:
+        return None
+    first, second = condition["left"], condition["right"]
+    if type(first) != str or type(second) != str:
+        return None
+    if first in left_df.columns and second in right_df.columns:
+        return first, operator, second
+    if first in right_df.columns and second in left_df.columns:
+        return second, swapped_range_operators.get(operator, operator), first
+    return None
+
+
+def key_codes(
+    left_keys: list[pd.Series], right_keys: list[pd.Series]
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Encodes the equality keys of both sides into integers, equal for rows with
+    equal keys on all the columns and -1 when a key is missing, since a missing
+    value is never equal to another one.
+    """
+    left_length = len(left_keys[0])
+    codes = None
+    for left_key, right_key in zip(left_keys, right_keys):
+        values = pd.concat([left_key, right_key], ignore_index=True)
+        column_codes, uniques = pd.factorize(values)
+        column_codes = column_codes.astype(np.int64)
+        if codes is None:
+            codes = column_codes
+            continue
+        missing = (codes == -1) | (column_codes == -1)
+        # refactorize the combined codes so they stay small integers
+        codes, _ = pd.factorize(codes * (len(uniques) + 1) + column_codes)
+        codes = codes.astype(np.int64)
+        codes[missing] = -1
+    return codes[:left_length], codes[left_length:]
+
+
+def hash_join_pairs(
+    left_codes: np.ndarray, right_codes: np.ndarray
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Matches the rows with equal key codes. The smaller side is the build side,
+    its rows are bucketed by code with a counting sort, and every row of the
+    other side is expanded into the bucket of its code.
+
+    Returns the positions of the matching rows, ordered by left row then by
+    right row like `pd.merge` orders an inner join.
+    """
+    build_left = len(left_codes) < len(right_codes)
+    build_codes, probe_codes = (
+        (left_codes, right_codes) if build_left else (right_codes, left_codes)
+    )
+    code_count = int(max(build_codes.max(initial=-1), probe_codes.max(initial=-1))) + 1
+
+    valid_build = np.flatnonzero(build_codes >= 0)
+    counts = np.bincount(build_codes[valid_build], minlength=code_count)
+    bucketed = valid_build[np.argsort(build_codes[valid_build], kind="stable")]
+    bucket_starts = np.cumsum(counts) - counts
+
+    probe_positions = np.flatnonzero(probe_codes >= 0)
+    probe_codes = probe_codes[probe_positions]
+    matches = counts[probe_codes]
+    probe_indices = np.repeat(probe_positions, matches)
+    # the offset of each pair inside the bucket of its probe row
+    offsets = np.arange(len(probe_indices)) - np.repeat(
+        np.cumsum(matches) - matches, matches
+    )
+    build_indices = bucketed[np.repeat(bucket_starts[probe_codes], matches) + offsets]
+
+    if not build_left:
+        return probe_indices, build_indices
+    order = np.argsort(build_indices, kind="stable")
+    return build_indices[order], probe_indices[order]
+
+
+def range_join_blocks(
+    left_values: pd.Series,
+    right_values: pd.Series,
+    lower: tuple[str, str] | None,
+    upper: tuple[str, str] | None,
+) -> Iterator[tuple[np.ndarray, np.ndarray]] | None:
+    """
+    Matches the rows where the left value is in a range of the right value,
+    `lower` and `upper` are `(operator, ...)` bounds of `left op right` as
+    `">"`/`">="` and `"<"`/`"<="`. The right side is sorted once and the
+    matching right rows of each left row are a slice of it found by binary
+    search.
+
+    Returns the matching pairs in blocks of a bounded size, grouped by left
+    row, or None when the values can't be ordered (e.g. mixed types).
+    """
+    left_positions = np.flatnonzero(left_values.notna().to_numpy())
+    right_positions = np.flatnonzero(right_values.notna().to_numpy())
+    try:
+        left_array = left_values.to_numpy()[left_positions]
+        right_array = right_values.to_numpy()[right_positions]
+        order = np.argsort(right_array, kind="stable")
+        sorted_right = right_array[order]
+        start = np.zeros(len(left_array), dtype=np.int64)
+        stop = np.full(len(left_array), len(sorted_right), dtype=np.int64)
+        # left > right: the right values strictly under the left value
+        if lower is not None:
+            side = "left" if lower[0] == ">" else "right"
+            stop = np.searchsorted(sorted_right, left_array, side=side)
+        # left < right: the right values strictly over the left value
+        if upper is not None:
+            side = "right" if upper[0] == "<" else "left"
+            start = np.searchsorted(sorted_right, left_array, side=side)
+    except TypeError:
+        return None
+
+    matches = np.maximum(stop - start, 0)
+    # the left rows are split where the running count of pairs fills a block
+    block_ends = np.searchsorted(
+        np.cumsum(matches),
+        np.arange(max_pairs_per_block, int(matches.sum()), max_pairs_per_block),
+        side="right",
+    )
+    block_bounds = np.unique(np.concatenate([[0], block_ends, [len(matches)]]))
+
+    def blocks() -> Iterator[tuple[np.ndarray, np.ndarray]]:
+        for block_start, block_stop in zip(block_bounds[:-1], block_bounds[1:]):
+            block_matches = matches[block_start:block_stop]
+            left_indices = np.repeat(
+                left_positions[block_start:block_stop], block_matches
+            )
+            offsets = np.arange(len(left_indices)) - np.repeat(
+                np.cumsum(block_matches) - block_matches, block_matches
+            )
+            sorted_indices = (
+                np.repeat(start[block_start:block_stop], block_matches) + offsets
+            )
+            yield left_indices, right_positions[order[sorted_indices]]
+
+    return blocks()
+
+
+def in_row_order(
+    left_indices: np.ndarray, right_indices: np.ndarray, right_length: int
+) -> tuple[np.ndarray, np.ndarray]:
+    # orders pairs by left row then by right row, like `pd.merge` does
+    pair_order = np.argsort(left_indices * right_length + right_indices)
+    return left_indices[pair_order], right_indices[pair_order]
+
+
+def comparison_condition(
+    columns: JoinColumns, comparison: tuple[str, str, str]
+) -> dict:
+    # a comparison of the two sides written with the joined columns' names
+    left, operator, right = comparison
+    return {
+        "type": operator,
+        "left": columns.left[left],
+        "right": columns.right.get(right, columns.left.get(right)),
+    }
+
+
+def cross_pairs_blocks(left_length: int, right_length: int):
+    """Yields the (left row, right row) pairs of a cross join block by block."""
+    block_size = max(1, max_pairs_per_block // max(right_length, 1))
+    for block_start in range(0, left_length, block_size):
+        block = np.arange(block_start, min(block_start + block_size, left_length))
+        yield np.repeat(block, right_length), np.tile(
+            np.arange(right_length), len(block)
+        )
+
+
+def take_rows(data: pd.DataFrame, indices: np.ndarray) -> pd.DataFrame:
+    # rows at the given positions, a row of missing values for the position -1
+    if len(indices) == 0 or indices.min() >= 0:
+        return data.take(indices).reset_index(drop=True)
+    return data.reset_index(drop=True).reindex(indices).reset_index(drop=True)
+
+
+def pairs_frame(
+    left_df: pd.DataFrame,
+    right_df: pd.DataFrame,
+    columns: JoinColumns,
+    left_indices: np.ndarray,
+    right_indices: np.ndarray,
+    needed: set | None = None,
+) -> pd.DataFrame:
+    """
+    The joined rows of the given pairs, only the `needed` output columns when
+    given. A side's position is -1 in the pairs of an outer join's unmatched
+    rows, its columns are missing values there, except the coalesced keys
+    which hold the other side's key.
+    """
+    left_columns = [
+        column
+        for column, name in columns.left.items()
+        if needed is None or name in needed
+    ]
+    right_columns = [
+        column
+        for column, name in columns.right.items()
+        if needed is None or name in needed
+    ]
+    left_part = take_rows(left_df[left_columns], left_indices)
+    for column in columns.coalesced.intersection(left_columns):
+        unmatched = left_indices < 0
+        if unmatched.any():
+            keys = left_part[column].where(
+                ~unmatched, take_rows(right_df[[column]], right_indices)[column]
+            )
+            if not keys.isna().any():
+                # no missing key is left, the key keeps its type (e.g. integers)
+                keys = keys.astype(left_df[column].dtype)
+            left_part[column] = keys
+    left_part.columns = [columns.left[column] for column in left_columns]
+    right_part = take_rows(right_df[right_columns], right_indices)
+    right_part.columns = [columns.right[column] for column in right_columns]
+    return pd.concat([left_part, right_part], axis=1)
+
+
+def filter_pairs(
+    left_df: pd.DataFrame,
+    right_df: pd.DataFrame,
+    columns: JoinColumns,
+    left_indices: np.ndarray,
+    right_indices: np.ndarray,
+    residual: dict | None,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Keeps the pairs satisfying the residual condition, evaluated on the
+    columns it references only."""
+    if residual is None or len(left_indices) == 0:
+        return left_indices, right_indices
+    referenced: dict[str, None] = {}
+    try:
+        add_condition_columns(referenced, residual)
+        needed = set(referenced)
+    except UnknownColumns:
+        # a column referenced by its number is a position among all the columns
+        needed = None
+    pairs = pairs_frame(left_df, right_df, columns, left_indices, right_indices, needed)
+    mask = build_filter_mask(pairs, residual).to_numpy()
+    return left_indices[mask], right_indices[mask]
+
+
+def join_pairs(
+    left_df: pd.DataFrame,
+    right_df: pd.DataFrame,
+    columns: JoinColumns,
+    keys: list[tuple[str, str, str]],
+    ranges: list[tuple[str, str, str]],
+    residual: list[dict],
+) -> tuple[np.ndarray, np.ndarray]:
+    if keys:
+        left_codes, right_codes = key_codes(
+            [left_df[left] for left, _, _ in keys],
+            [right_df[right] for _, _, right in keys],
+        )
+        left_indices, right_indices = hash_join_pairs(left_codes, right_codes)
+        residual = [
+            comparison_condition(columns, comparison) for comparison in ranges
+        ] + residual
+        return filter_pairs(
+            left_df,
+            right_df,
+            columns,
+            left_indices,
+            right_indices,
+            conjunction(residual),
+        )
+
+    blocks = None
+    if ranges:
+        # the bounds of the first compared pair of columns narrow the candidates
+        left_column, _, right_column = ranges[0]
+        lower = upper = None
+        remaining = []
+        for comparison in ranges:
+            left, operator, right = comparison
+            if (left, right) == (left_column, right_column):
+                if operator in (">", ">=") and lower is None:
+                    lower = (operator, right)
+                    continue
+                if operator in ("<", "<=") and upper is None:
+                    upper = (operator, right)
+                    continue
+            remaining.append(comparison)
+        blocks = range_join_blocks(
+            left_df[left_column], right_df[right_column], lower, upper
+        )
+        if blocks is not None:
+            ranges = remaining
+
+    if blocks is None:
+        # no equality nor orderable range, all the pairs are checked
+        blocks = cross_pairs_blocks(len(left_df), len(right_df))
+    condition = conjunction(
+        [comparison_condition(columns, comparison) for comparison in ranges] + residual
+    )
+    left_blocks, right_blocks = [np.array([], dtype=np.int64)], [
+        np.array([], dtype=np.int64)
+    ]
+    for left_indices, right_indices in blocks:
+        left_indices, right_indices = filter_pairs(
+            left_df, right_df, columns, left_indices, right_indices, condition
+        )
+        left_blocks.append(left_indices)
+        right_blocks.append(right_indices)
+    # only the pairs left after the residual conditions are reordered
+    return in_row_order(
+        np.concatenate(left_blocks), np.concatenate(right_blocks), len(right_df)
+    )
+
+
+join_types = ("inner", "left", "right", "outer", "semi", "anti")
+
+
+def split_condition(
+    condition: dict, left_df: pd.DataFrame, right_df: pd.DataFrame
+) -> tuple[list, list, list[dict]]:
+    """Splits the AND-ed conjuncts of an ON condition into the equality keys,
+    the range comparisons and the residual conditions."""
+    keys, ranges, residual = [], [], []
+    for conjunct in conjuncts(condition):
+        comparison = sided_comparison(conjunct, left_df, right_df)
+        if comparison is None:
+            residual.append(conjunct)
+        elif comparison[1] == "==":
+            keys.append(comparison)
+        else:
+            ranges.append(comparison)
+    return keys, ranges, residual
+
+
+def unmatched_rows(length: int, matched_indices: np.ndarray) -> np.ndarray:
+    matched = np.zeros(length, dtype=bool)
+    matched[matched_indices] = True
+    return np.flatnonzero(~matched)
+
+
+def matched_left_rows(
+    left_df: pd.DataFrame, right_df: pd.DataFrame, condition: dict
+) -> np.ndarray:
+    """
+    Whether each left row has at least one matching right row, for semi and
+    anti joins. When the condition is only equality keys it is a membership
+    test of the left keys in the set of the right keys, otherwise the pairs
+    are matched as for an inner join, but no pair is ever materialized beyond
+    the columns the residual conditions reference.
+    """
+    keys, ranges, residual = split_condition(condition, left_df, right_df)
+    if keys and not ranges and not residual:
+        left_codes, right_codes = key_codes(
+            [left_df[left] for left, _, _ in keys],
+            [right_df[right] for _, _, right in keys],
+        )
+        return (left_codes >= 0) & np.isin(left_codes, right_codes[right_codes >= 0])
+    columns = JoinColumns(
+        left_df, right_df, {left for left, _, right in keys if left == right}
+    )
+    left_indices, _ = join_pairs(left_df, right_df, columns, keys, ranges, residual)
+    matched = np.zeros(len(left_df), dtype=bool)
+    matched[left_indices] = True
+    return matched
+
+
+def join(
+    left_df: pd.DataFrame,
+    right_df: pd.DataFrame,
+    condition: dict,
+    join_type: str = "inner",
+) -> pd.DataFrame:
+    """
+    Joins two DataFrames on a JOIN ... ON condition without materializing
+    their cross product.
+
+    The top level AND-ed conjuncts of the condition are split into:
+        - equality keys between a column of each side, matched with a hash
+          join built on the smaller side
+        - range comparisons between a column of each side, matched with a
+          sort-based range join when there are no equality keys
+        - the residual conditions, evaluated only on the matched pairs and
+          only on the columns they reference
+    When no conjunct can narrow down the candidates the pairs are checked a
+    block at a time, so the memory stays bounded.
+
+    The join type is one of `join_types`:
+        - inner: the rows and columns of the `pd.merge` of both sides on the
+          equality keys filtered by the whole condition
+        - left, right and outer: the inner join plus the rows of the left, the
+          right or both sides with no match, with missing values on the other
+          side, in the order of the left rows (the right rows for right joins)
+        - semi and anti: the left rows with at least one match, or with none,
+          and only the left side's columns
+    """
+    if join_type not in join_types:
+        raise ValueError(f"unsupported join type '{join_type}'")
+    if join_type in ("semi", "anti"):
+        matched = matched_left_rows(left_df, right_df, condition)
+        rows = matched if join_type == "semi" else ~matched
+        return left_df[rows].reset_index(drop=True)
+
+    keys, ranges, residual = split_condition(condition, left_df, right_df)
+    coalesced = {left for left, _, right in keys if left == right}
+    columns = JoinColumns(left_df, right_df, coalesced)
+    left_indices, right_indices = join_pairs(
+        left_df, right_df, columns, keys, ranges, residual
+    )
+
+    if join_type in ("left", "outer"):
+        unmatched = unmatched_rows(len(left_df), left_indices)
+        left_indices = np.concatenate([left_indices, unmatched])
+        right_indices = np.concatenate([right_indices, np.full(len(unmatched), -1)])
+        order = np.argsort(left_indices, kind="stable")
+        left_indices, right_indices = left_indices[order], right_indices[order]
+    if join_type in ("right", "outer"):
+        unmatched = unmatched_rows(len(right_df), right_indices[right_indices >= 0])
+        left_indices = np.concatenate([left_indices, np.full(len(unmatched), -1)])
+        right_indices = np.concatenate([right_indices, unmatched])
+        if join_type == "right":
+            order = np.argsort(right_indices, kind="stable")
+            left_indices, right_indices = left_indices[order], right_indices[order]
+    return pairs_frame(left_df, right_df, columns, left_indices, right_indices)
+
+
+def apply_join(
+    left_df: pd.DataFrame,
+    right_df: pd.DataFrame,
+    condition: dict,
+    join_type: str,
+    left_alias: str | None,
+    right_alias: str | None,
+) -> pd.DataFrame:
+    if left_alias:
+        left_df = apply_alias(left_df, left_alias)
+    if right_alias:
+        right_df = apply_alias(right_df, right_alias)
+    return join(left_df, right_df, condition, join_type)
+
+
+# the rows the distinct values of a join key are estimated from
+distinct_sample_size = 10_000
+# the fraction of the pairs a comparison between the sides is assumed to keep
+range_selectivity = 1 / 3
+
+
+def estimate_distinct(values: pd.Series) -> float:
+    """
+    Estimates the number of distinct values of a column from a sample of its
+    rows, with the GEE estimator: the values seen once in the sample are
+    scaled up by sqrt(rows / sample rows), the others are counted once.
+    """
+    values = values.dropna()
+    if len(values) <= distinct_sample_size:
+        return max(values.nunique(), 1)
+    sample = values.sample(distinct_sample_size, random_state=0)
+    frequencies = sample.value_counts().value_counts()
+    seen_once = frequencies.get(1, 0)
+    seen_more = frequencies.sum() - seen_once
+    scale = np.sqrt(len(values) / distinct_sample_size)
+    return max(min(scale * seen_once + seen_more, len(values)), 1)
+
+
+class JoinRelation:
+    """A relation of a join chain with its row count and the estimated
+    distinct values of its columns."""
+
+    def __init__(self, data: pd.DataFrame):
+        self.columns = set(data.columns)
+        self.__data = data
+        self.__distinct: dict[str, float] = {}
+
+    @property
+    def rows(self) -> float:
+        return len(self.__data)
+
+    def distinct(self, column: str) -> float:
+        if column not in self.__distinct:
+            self.__distinct[column] = estimate_distinct(self.__data[column])
+        return self.__distinct[column]
+
+
+class JoinedRelation(JoinRelation):
+    """The estimated result of joining two relations, the distinct values of
+    its columns are bounded by its estimated rows."""
+
+    def __init__(self, left: JoinRelation, right: JoinRelation, rows: float):
+        self.columns = left.columns | right.columns
+        self.__left = left
+        self.__right = right
+        self.__rows = rows
+
+    @property
+    def rows(self) -> float:
+        return self.__rows
+
+    def distinct(self, column: str) -> float:
+        side = self.__left if column in self.__left.columns else self.__right
+        return max(min(side.distinct(column), self.__rows), 1)
+
+
+def condition_columns(condition: dict) -> set[str] | None:
+    columns: dict[str, None] = {}
+    try:
+        add_condition_columns(columns, condition)
+    except UnknownColumns:
+        return None
+    return set(columns)
+
+
+def estimated_join(
+    left: JoinRelation,
+    right: JoinRelation,
+    conditions: list[tuple[dict, set[str]]],
+) -> tuple[tuple[bool, float], list[dict]]:
+    """
+    Estimates joining two relations on the conjuncts whose columns they both
+    have. An equality of a column of each side keeps 1 / max(distinct values
+    of both columns) of the pairs, the other comparisons of the sides keep
+    `range_selectivity` of them.
+
+    Returns the ranking key of the join, `(is a cross product, estimated
+    rows)`, and the conjuncts evaluated by the join.
+    """
+    rows = float(left.rows) * right.rows
+    is_linked = False
+    applicable = []
+    for condition, needed in conditions:
+        if not needed <= left.columns | right.columns:
+            continue
+        applicable.append(condition)
+        if not (needed & left.columns and needed & right.columns):
+            continue
+        is_linked = True
+        operator = condition["type"]
+        first, second = condition.get("left"), condition.get("right")
+        if operator == "==" and needed == {first, second}:
+            if first in right.columns:
+                first, second = second, first
+            rows /= max(left.distinct(first), right.distinct(second))
+        elif operator in range_operators:
+            rows *= range_selectivity
+    return (not is_linked, rows), applicable
+
+
+def greedy_join_order(
+    relations: list[JoinRelation], conditions: list[tuple[dict, set[str]]]
+) -> list[tuple[int, list[dict]]]:
+    """
+    Chooses the order to join the relations of an inner join chain in, so
+    the smallest intermediate results are built first: it starts from the
+    pair of relations with the smallest estimated join, then joins the
+    relation that gives the smallest estimated result to it, and so on.
+    Relations sharing no condition with the joined ones come last.
+
+    Returns the relations' positions in join order, each with the conjuncts
+    evaluated when it is joined, the first relation has none.
+    """
+    best = None
+    for first, second in itertools.combinations(range(len(relations)), 2):
+        key, _ = estimated_join(relations[first], relations[second], conditions)
+        if best is None or key < best[0]:
+            best = (key, first, second)
+    _, first, second = best
+    if relations[second].rows < relations[first].rows:
+        first, second = second, first
+
+    order = [(first, [])]
+    current = relations[first]
+    remaining = list(conditions)
+    candidates = [second] + [
+        index for index in range(len(relations)) if index not in (first, second)
+    ]
+    while candidates:
+        best = None
+        for index in candidates:
+            key, applicable = estimated_join(current, relations[index], remaining)
+            if best is None or key < best[0]:
+                best = (key, index, applicable)
+        (_, rows), index, applicable = best
+        candidates.remove(index)
+        order.append((index, applicable))
+        remaining = [item for item in remaining if item[0] not in applicable]
+        current = JoinedRelation(current, relations[index], rows)
+    return order
+
+
+def apply_joins(
+    sources: list[tuple[pd.DataFrame, str | None]],
+    joins: list[tuple[dict, str]],
+) -> pd.DataFrame:
+    """
+    Joins a chain of data sources, `A JOIN B ON ... JOIN C ON ...`, where the
+    i-th join joins the result of the previous joins with the (i + 1)-th source.
+
+    Inner joins can be applied in any order, so when all the joins of the
+    chain are inner joins the order is chosen by `greedy_join_order` from the
+    sources' row counts and the estimated distinct values of their join keys,
+    and the result has the columns in the order of the query. Otherwise, or
+    when the order can't be changed safely (the sources share column names or
+    a condition references a column by its number), the joins are applied in
+    the order of the query.
+    """
+    frames = [apply_alias(data, alias) if alias else data for data, alias in sources]
+    written_columns = [column for frame in frames for column in frame.columns]
+    conditions = [
+        (conjunct, condition_columns(conjunct))
+        for condition, _ in joins
+        for conjunct in conjuncts(condition)
+    ]
+    reorderable = (
+        all(join_type == "inner" for _, join_type in joins)
+        and len(set(written_columns)) == len(written_columns)
+        and all(needed is not None for _, needed in conditions)
+        and all(needed <= set(written_columns) for _, needed in conditions)
+    )
+    if not reorderable:
+        result = frames[0]
+        for frame, (condition, join_type) in zip(frames[1:], joins):
+            result = join(result, frame, condition, join_type)
+        return result
+
+    relations = [JoinRelation(frame) for frame in frames]
+    order = greedy_join_order(relations, conditions)
+    result = frames[order[0][0]]
+    for index, joined_conditions in order[1:]:
+        condition = conjunction(joined_conditions) or {"type": "const", "value": True}
+        result = join(result, frames[index], condition, "inner")
+    return result[written_columns]
@@ -0,0 +1,183 @@
+import os
+from abc import ABC, abstractmethod
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+from app.compiler.plan import KeyLink
+from app.compiler.pushdown import max_sql_membership_values
+from app.etl.settings import settings
+
+
+# the keys are held exactly up to this many distinct keys, in a Bloom filter above
+max_exact_keys = 100_000
+# the most distinct keys a filter is built for, with more keys most rows of the
+# other side match anyway
+max_filter_keys = 2_000_000
+# about 1% of false positives
+bloom_bits_per_key = 10
+bloom_hashes = 7
+bloom_hash_keys = ("queryflow-bloom-1", "queryflow-bloom-2")
+
+
+class KeyFilter(ABC):
+    """The join keys of one data source, tested against the keys of another."""
+
+    def __init__(self, column: str):
+        # the key column of the filtered source
+        self.column = column
+
+    @abstractmethod
+    def contains(self, keys: pd.Series) -> np.ndarray:
+        """
+        The mask of the keys that may be among the filter's keys. A key that is
+        among them is never left out, missing keys always are.
+        """
+        pass
+
+    def sql_condition(self) -> dict | None:
+        """The filter as a condition a database can run, None when it can't."""
+        return None
+
+
+class ExactKeyFilter(KeyFilter):
+    def __init__(self, column: str, keys: np.ndarray):
+        KeyFilter.__init__(self, column)
+        self.keys = keys
+
+    def contains(self, keys: pd.Series) -> np.ndarray:
+        return keys.isin(self.keys).to_numpy()
+
+    def sql_condition(self) -> dict | None:
+        if len(self.keys) > max_sql_membership_values:
+            return None
+        values: list[Any] = []
+        for key in self.keys:
+            if isinstance(key, np.generic):
+                key = key.item()
+            if isinstance(key, str):
+                values.append(f'"{key}"')
+            elif isinstance(key, (int, float)) and not isinstance(key, bool):
+                values.append(key)
+            else:
+                return None
+        return {"type": "in", "left": self.column, "right": values}
+
+
+def hashed_keys(keys: np.ndarray, hash_key: str) -> np.ndarray:
+    return pd.util.hash_array(keys, hash_key=hash_key.ljust(16)[:16])
+
+
+def comparable_keys(keys: pd.Series) -> tuple[bool, np.ndarray]:
+    """
+    The keys in the form they are hashed in, so the keys that are equal in a
+    join hash to the same bits whatever the dtype of their column: numbers as
+    floats (1 and 1.0 are the same key) and the other keys as strings.
+    """
+    if keys.dtype.kind in "iufb":
+        return True, keys.to_numpy(dtype=np.float64)
+    return False, keys.astype(str).to_numpy(dtype=object)
+
+
+class BloomKeyFilter(KeyFilter):
+    """
+    A Bloom filter of the keys: a bit array where each key sets `bloom_hashes`
+    bits, a key whose bits are all set is probably among the keys.
+    """
+
+    def __init__(self, column: str, keys: pd.Series):
+        KeyFilter.__init__(self, column)
+        self.numeric, values = comparable_keys(keys)
+        self.size = max(64, len(values) * bloom_bits_per_key)
+        bits = np.zeros(self.size, dtype=bool)
+        for positions in self.bit_positions(values):
+            bits[positions] = True
+        self.bits = np.packbits(bits)
+
+    def bit_positions(self, values: np.ndarray):
+        # double hashing, the i-th bit of a key is h1 + i * h2
+        first, second = (hashed_keys(values, key) for key in bloom_hash_keys)
+        size = np.uint64(self.size)
+        for index in range(bloom_hashes):
+            yield ((first + np.uint64(index) * second) % size).astype(np.int64)
+
+    def contains(self, keys: pd.Series) -> np.ndarray:
+        numeric, values = comparable_keys(keys)
+        if numeric != self.numeric:
+            # numbers never equal strings in a join, but keep the rows to be safe
+            return np.ones(len(keys), dtype=bool)
+        result = keys.notna().to_numpy()
+        for positions in self.bit_positions(values):
+            result &= (self.bits[positions >> 3] >> (7 - (positions & 7))) & 1 == 1
+        return result
+
+
+def build_key_filter(column: str, keys: pd.Series) -> KeyFilter | None:
+    """
+    Builds the filter of the given keys, to be tested against the `column` of
+    another source. Returns None when there are too many distinct keys for the
+    filter to leave out many rows.
+    """
+    keys = pd.Series(keys.dropna().unique())
+    if len(keys) > max_filter_keys:
+        return None
+    if len(keys) <= max_exact_keys:
+        return ExactKeyFilter(column, keys.to_numpy())
+    return BloomKeyFilter(column, keys)
+
+
+def source_bytes(data_source_path: str) -> int | None:
+    """The size of the file a data source is read from, None when unknown."""
+    # the database sources are given as `database|table`
+    path = data_source_path.split("|")[0]
+    try:
+        return os.path.getsize(path) if os.path.isfile(path) else None
+    except OSError:
+        return None
+
+
+def key_filter_reductions(
+    sizes: list[int | None],
+    filtered: list[bool],
+    key_links: list[KeyLink],
+) -> list[tuple[int, str, int, str]]:
+    """
+    Chooses the sources reduced by the keys of another source along the key
+    links of a join, as `(reduced source, its key, building source, its key)`.
+
+    A source is reduced when its file is at least
+    `settings.min_key_filter_source_bytes` and the other source is known to be
+    small next to it: its file is less than half the size, or it is filtered.
+    A reduced source waits for the extraction of the building source, so a
+    source is never both reduced and building.
+    """
+    candidates = []
+    for link in key_links:
+        sides = (
+            (link.left, link.left_key, link.right, link.right_key, link.reduce_left),
+            (link.right, link.right_key, link.left, link.left_key, link.reduce_right),
+        )
+        for reduced, reduced_key, building, building_key, allowed in sides:
+            size = sizes[reduced]
+            if not allowed or size is None:
+                continue
+            if size < settings.min_key_filter_source_bytes:
+                continue
+            building_size = sizes[building]
+            if filtered[building] or (
+                building_size is not None and building_size * 2 <= size
+            ):
+                candidates.append((size, reduced, reduced_key, building, building_key))
+    reductions = []
+    reduced_sources: set[int] = set()
+    building_sources: set[int] = set()
+    for _, reduced, reduced_key, building, building_key in sorted(
+        candidates, key=lambda candidate: -candidate[0]
+    ):
+        if reduced in building_sources or building in reduced_sources:
+            continue
+        reductions.append((reduced, reduced_key, building, building_key))
+        reduced_sources.add(reduced)
+        building_sources.add(building)
+    return reductions
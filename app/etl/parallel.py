@@ -0,0 +1,313 @@
+from concurrent.futures import Future, ProcessPoolExecutor, wait
+from dataclasses import dataclass, field, fields, replace
+import math
+import multiprocessing
+from multiprocessing import shared_memory
+import pickle
+import threading
+from typing import Callable
+
+import pandas as pd
+
+from app.etl.data.base_data_types import IExtractor
+from app.etl.execution_report import timed_source
+from app.etl.helpers import (
+    apply_alias,
+    apply_filtering,
+    apply_limit_or_tail,
+    apply_order_by_without_groupby,
+    generate_aggregation_row,
+)
+from app.etl.key_filter import source_bytes
+from app.etl.partial_aggregates import PartialGrouping
+from app.etl.settings import ExecutionSettings, settings
+from app.etl.streaming import (
+    ChunkedSource,
+    concat_chunks,
+    is_aggregation_only,
+    reads_row_numbers,
+)
+
+
+# the smallest source split between processes, below it the processes cost
+# more than they save
+min_parallel_source_bytes = 64 * 1024 * 1024
+# the largest range of a source a process reads at once
+max_range_bytes = 32 * 1024 * 1024
+
+
+class SharedFrame:
+    """
+    A DataFrame sent from a worker process without pickling its data: it is
+    pickled with protocol 5, whose out-of-band buffers (the arrays of the
+    columns) are written to a shared memory block, and only the rest of the
+    pickle goes through the pipe.
+    """
+
+    def __init__(self, data: pd.DataFrame):
+        buffers: list[pickle.PickleBuffer] = []
+        self.payload = pickle.dumps(data, protocol=5, buffer_callback=buffers.append)
+        views = [buffer.raw() for buffer in buffers]
+        self.sizes = [view.nbytes for view in views]
+        self.name: str | None = None
+        if sum(self.sizes):
+            block = shared_memory.SharedMemory(create=True, size=sum(self.sizes))
+            offset = 0
+            for view in views:
+                block.buf[offset : offset + view.nbytes] = view
+                offset += view.nbytes
+            self.name = block.name
+            block.close()
+
+    def load(self) -> pd.DataFrame:
+        """Rebuilds the DataFrame and frees the shared memory block."""
+        buffers = []
+        if self.name is not None:
+            block = shared_memory.SharedMemory(name=self.name)
+            try:
+                offset = 0
+                for size in self.sizes:
+                    # copied out, so the block is freed right away
+                    with block.buf[offset : offset + size] as view:
+                        buffers.append(bytearray(view))
+                    offset += size
+            finally:
+                block.close()
+                block.unlink()
+        return pickle.loads(self.payload, buffers=buffers)
+
+
+@dataclass
+class RangeTask:
+    """The part of a query a worker runs over a byte range of its source."""
+
+    data_extractor: IExtractor
+    start: int
+    end: int
+    columns: list[str] | None
+    alias: str | None
+    criteria: dict
+    # "aggregate", "top" (the ordered rows a LIMIT/TAIL keeps), "select" or
+    # "filter" (the filtered rows, for the steps that need them all)
+    step: str
+    transform_select: Callable[..., pd.DataFrame]
+    groupby_columns: list[str] = field(default_factory=list)
+    aggregations: list[tuple[str, str]] = field(default_factory=list)
+
+
+@dataclass
+class RangeResult:
+    # the rows of the range before filtering, to number the rows of the next ones
+    rows: int
+    data: SharedFrame | None = None
+    grouping: PartialGrouping | None = None
+
+
+def run_range(task: RangeTask) -> RangeResult:
+    """Runs in a worker process."""
+    data = task.data_extractor.extract_range(task.start, task.end, task.columns)
+    rows = len(data)
+    if task.alias:
+        data = apply_alias(data, task.alias)
+    criteria = dict(task.criteria, FILTER=None)
+    if task.criteria["FILTER"] and rows:
+        data = apply_filtering(data, task.criteria["FILTER"])
+    if task.step == "aggregate":
+        grouping = PartialGrouping(task.groupby_columns, task.aggregations)
+        if len(data):
+            grouping.update(data)
+        return RangeResult(rows, grouping=grouping)
+    if not len(data):
+        return RangeResult(rows)
+    if task.step == "top":
+        data = apply_order_by_without_groupby(
+            data, criteria["ORDER"], criteria["LIMIT_OR_TAIL"]
+        )
+    elif task.step == "select":
+        data = task.transform_select(data, dict(criteria, LIMIT_OR_TAIL=None))
+    return RangeResult(rows, data=SharedFrame(data))
+
+
+pool: ProcessPoolExecutor | None = None
+# the settings the worker processes were started with
+pool_settings: ExecutionSettings | None = None
+pool_lock = threading.Lock()
+
+
+def use_settings(values: ExecutionSettings) -> None:
+    """
+    Runs in each worker process when it starts: the settings of the process
+    that started it, which the spawned process would otherwise build again
+    from the environment, missing the changes made at runtime (e.g. by
+    `--no-cache`).
+    """
+    for setting in fields(values):
+        setattr(settings, setting.name, getattr(values, setting.name))
+
+
+def worker_pool() -> ProcessPoolExecutor:
+    """
+    The worker processes, started the first time they are needed and kept for
+    the next queries while the settings stay the same. They are spawned, not
+    forked, since the GUI's threads can't be forked safely.
+    """
+    global pool, pool_settings
+    with pool_lock:
+        if pool is None or pool_settings != settings:
+            if pool is not None:
+                pool.shutdown(wait=False)
+            pool_settings = replace(settings)
+            pool = ProcessPoolExecutor(
+                settings.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=use_settings,
+                initargs=(pool_settings,),
+            )
+        return pool
+
+
+def use_parallel(source: ChunkedSource, criteria: dict) -> bool:
+    if settings.workers <= 1 or not source.data_extractor.can_extract_ranges():
+        return False
+    if reads_row_numbers(source, criteria):
+        return False
+    size = source_bytes(source.data_source_path)
+    if size is None or size < min_parallel_source_bytes:
+        return False
+    limit_or_tail = criteria["LIMIT_OR_TAIL"]
+    if limit_or_tail and limit_or_tail[1] == 0:
+        return False
+    # a LIMIT alone stops reading the source early, which one process does best
+    return not (
+        limit_or_tail
+        and limit_or_tail[0] == "limit"
+        and not (
+            criteria["GROUP"] or criteria["ORDER"] or is_aggregation_only(criteria)
+        )
+    )
+
+
+def run_ranges(
+    source: ChunkedSource,
+    criteria: dict,
+    step: str,
+    transform_select: Callable[..., pd.DataFrame],
+    **arguments,
+) -> list[RangeResult]:
+    size = source_bytes(source.data_source_path) or 0
+    parts = max(settings.workers, math.ceil(size / max_range_bytes))
+    tasks = [
+        RangeTask(
+            source.data_extractor,
+            start,
+            end,
+            source.columns,
+            source.alias,
+            criteria,
+            step,
+            transform_select,
+            **arguments,
+        )
+        for start, end in source.data_extractor.split_ranges(parts)
+    ]
+    futures: list[Future] = [worker_pool().submit(run_range, task) for task in tasks]
+    try:
+        return [future.result() for future in futures]
+    except BaseException:
+        for future in futures:
+            future.cancel()
+        # the running ranges can't be cancelled, wait for them so the shared
+        # memory of every range that succeeded is freed
+        wait(futures)
+        for future in futures:
+            if not future.cancelled() and future.exception() is None:
+                result = future.result()
+                if result.data is not None:
+                    result.data.load()
+        raise
+
+
+def numbered_frames(results: list[RangeResult]) -> list[pd.DataFrame]:
+    """
+    The rows of the ranges, indexed by their position in the source like the
+    rows of an extracted DataFrame.
+    """
+    frames = []
+    offset = 0
+    for result in results:
+        if result.data is not None:
+            data = result.data.load()
+            data.index = data.index + offset
+            frames.append(data)
+        offset += result.rows
+    return frames
+
+
+def transform_select_parallel(
+    source: ChunkedSource,
+    criteria: dict,
+    transform_select: Callable[..., pd.DataFrame],
+) -> pd.DataFrame:
+    """
+    Runs a SELECT over a source split into byte ranges between
+    `settings.workers` processes, with the same result as `transform_select`
+    over the whole source.
+
+    Each worker parses and filters its ranges. GROUP BY and the aggregations
+    run in the workers too, which send back the partial aggregates of their
+    groups (see `PartialGrouping`), merged here in the order of the ranges.
+    Otherwise the workers select the columns of their rows, or the top rows
+    of an ORDER BY with a LIMIT or TAIL, and send them back through shared
+    memory (see `SharedFrame`) to be concatenated here.
+    """
+    empty = source.empty()
+    limit_or_tail = criteria["LIMIT_OR_TAIL"]
+    with timed_source(source.data_source_type, source.data_source_path) as measures:
+        if criteria["GROUP"] or is_aggregation_only(criteria):
+
+            def aggregate(
+                data: pd.DataFrame,
+                groupby_columns: list[str],
+                aggregations: list[tuple[str, str]],
+            ) -> pd.DataFrame:
+                results = run_ranges(
+                    source,
+                    criteria,
+                    "aggregate",
+                    transform_select,
+                    groupby_columns=groupby_columns,
+                    aggregations=aggregations,
+                )
+                measures["rows"] = sum(result.rows for result in results)
+                grouping = PartialGrouping(groupby_columns, aggregations)
+                for result in results:
+                    grouping.merge(result.grouping)
+                if not groupby_columns and not grouping.rows:
+                    return generate_aggregation_row(data, aggregations)
+                return grouping.result()
+
+            return transform_select(empty, dict(criteria, FILTER=None), aggregate)
+
+        if criteria["ORDER"] and limit_or_tail and not criteria["DISTINCT"]:
+            step = "top"
+        elif criteria["ORDER"]:
+            step = "filter"
+        else:
+            step = "select"
+        results = run_ranges(source, criteria, step, transform_select)
+        measures["rows"] = sum(result.rows for result in results)
+        frames = numbered_frames(results)
+
+    if not frames:
+        return transform_select(empty, dict(criteria, FILTER=None))
+    data = concat_chunks(frames)
+    if step == "top":
+        # the rows are kept in the source's order, which breaks the ties
+        data = apply_order_by_without_groupby(
+            data, criteria["ORDER"], limit_or_tail
+        ).sort_index(kind="stable")
+    if step != "select":
+        return transform_select(data, dict(criteria, FILTER=None))
+    if criteria["DISTINCT"]:
+        data = data.drop_duplicates()
+    return apply_limit_or_tail(data, limit_or_tail) if limit_or_tail else data
@@ -0,0 +1,376 @@
+from abc import ABC, abstractmethod
+from typing import Iterable
+
+import numpy as np
+import pandas as pd
+from pandas.core.groupby import DataFrameGroupBy
+
+from app.etl.helpers import aggregation_name
+
+
+# the most points a quantile sketch holds, it is exact below
+max_sketch_points = 4096
+# the partial states of a grouping are merged when this many parts are held
+max_held_parts = 8
+
+
+class QuantileSketch:
+    """
+    The values of a group summarized for its quantiles: the sorted values
+    while there are at most `max_sketch_points` of them, then weighted
+    points, each standing for consecutive values, that are merged to keep
+    the sketch bounded.
+    """
+
+    def __init__(self, values: np.ndarray, weights: np.ndarray | None = None):
+        order = np.argsort(values, kind="stable")
+        self.values = values[order]
+        # None while the sketch holds every value once
+        self.weights = None if weights is None else weights[order]
+
+    @classmethod
+    def merged(cls, sketches: Iterable["QuantileSketch"]) -> "QuantileSketch":
+        sketches = list(sketches)
+        values = np.concatenate([sketch.values for sketch in sketches])
+        if all(sketch.weights is None for sketch in sketches):
+            weights = None
+        else:
+            weights = np.concatenate(
+                [
+                    (
+                        np.ones(len(sketch.values))
+                        if sketch.weights is None
+                        else sketch.weights
+                    )
+                    for sketch in sketches
+                ]
+            )
+        sketch = cls(values, weights)
+        if len(sketch.values) > max_sketch_points:
+            sketch.compress(max_sketch_points // 2)
+        return sketch
+
+    def compress(self, points: int) -> None:
+        # bins of about the same weight, each becomes its weighted mean value
+        weights = np.ones(len(self.values)) if self.weights is None else self.weights
+        total = np.cumsum(weights)
+        bins = np.minimum((total - weights / 2) * points // total[-1], points - 1)
+        bin_weights = np.bincount(
+            bins.astype(np.int64), weights=weights, minlength=points
+        )
+        bin_sums = np.bincount(
+            bins.astype(np.int64), weights=weights * self.values, minlength=points
+        )
+        used = bin_weights > 0
+        self.values = bin_sums[used] / bin_weights[used]
+        self.weights = bin_weights[used]
+
+    def quantile(self, q: float) -> float:
+        if len(self.values) == 0:
+            return np.nan
+        if self.weights is None:
+            return np.quantile(self.values, q)
+        # each point stands at the middle of the values it summarizes
+        centers = np.cumsum(self.weights) - self.weights / 2
+        return np.interp(q * self.weights.sum(), centers, self.values)
+
+
+def by_levels(states: pd.Series | pd.DataFrame, levels: list[int]):
+    """
+    The states grouped by the given levels of their index, only the groups
+    that have states (categorical levels would add every other category).
+    """
+    return states.groupby(level=levels, sort=False, observed=True)
+
+
+class PartialAggregate(ABC):
+    """
+    An aggregation computed by parts: `update` computes the state of the
+    aggregation over a part of the rows of each group, `merge` combines the
+    states of the parts of the groups and `finalize` turns a state into the
+    aggregation's value. The states are DataFrames indexed by the group keys,
+    with a column per `states` item.
+    """
+
+    states: tuple[str, ...] = ()
+
+    def __init__(self, column: str):
+        self.column = column
+
+    @abstractmethod
+    def update(self, grouped: DataFrameGroupBy) -> pd.DataFrame:
+        pass
+
+    @abstractmethod
+    def merge(self, states: pd.DataFrame, levels: list[int]) -> pd.DataFrame:
+        pass
+
+    @abstractmethod
+    def finalize(self, states: pd.DataFrame) -> pd.Series:
+        pass
+
+
+class ReducedAggregate(PartialAggregate):
+    """
+    An aggregation whose state is the aggregation itself, merged by
+    aggregating the values of the parts with `merging` (e.g. the sum of the
+    parts' sums, the minimum of their minimums or the first of their first
+    values).
+    """
+
+    states = ("value",)
+    function = ""
+    merging = ""
+
+    def update(self, grouped: DataFrameGroupBy) -> pd.DataFrame:
+        return grouped[self.column].agg(self.function).to_frame("value")
+
+    def merge(self, states: pd.DataFrame, levels: list[int]) -> pd.DataFrame:
+        grouped = by_levels(states["value"], levels)
+        return grouped.agg(self.merging).to_frame("value")
+
+    def finalize(self, states: pd.DataFrame) -> pd.Series:
+        return states["value"]
+
+
+class SumAggregate(ReducedAggregate):
+    function = merging = "sum"
+
+
+class MinAggregate(ReducedAggregate):
+    function = merging = "min"
+
+
+class MaxAggregate(ReducedAggregate):
+    function = merging = "max"
+
+
+class ProdAggregate(ReducedAggregate):
+    function = merging = "prod"
+
+
+class FirstAggregate(ReducedAggregate):
+    # the parts are merged in the order of the rows
+    function = merging = "first"
+
+
+class LastAggregate(ReducedAggregate):
+    function = merging = "last"
+
+
+class CountAggregate(ReducedAggregate):
+    function = "count"
+    merging = "sum"
+
+    def update(self, grouped: DataFrameGroupBy) -> pd.DataFrame:
+        if self.column == "*":
+            return grouped.size().to_frame("value")
+        return ReducedAggregate.update(self, grouped)
+
+
+class SizeAggregate(ReducedAggregate):
+    merging = "sum"
+
+    def update(self, grouped: DataFrameGroupBy) -> pd.DataFrame:
+        return grouped.size().to_frame("value")
+
+
+class MeanAggregate(PartialAggregate):
+    states = ("count", "sum")
+
+    def update(self, grouped: DataFrameGroupBy) -> pd.DataFrame:
+        return grouped[self.column].agg(["count", "sum"])
+
+    def merge(self, states: pd.DataFrame, levels: list[int]) -> pd.DataFrame:
+        return by_levels(states, levels).sum()
+
+    def finalize(self, states: pd.DataFrame) -> pd.Series:
+        return states["sum"] / states["count"].where(states["count"] > 0)
+
+
+class MomentsAggregate(PartialAggregate):
+    """
+    var, std and sem from the count, the mean and the sum of squared
+    deviations from the mean (M2) of each part, merged with Chan's formula:
+    M2 = sum(M2_i + n_i * (mean_i - mean)^2).
+    """
+
+    states = ("count", "mean", "m2")
+
+    def update(self, grouped: DataFrameGroupBy) -> pd.DataFrame:
+        states = grouped[self.column].agg(["count", "mean"])
+        variance = grouped[self.column].var(ddof=0)
+        states["m2"] = (variance * states["count"]).fillna(0.0)
+        return states
+
+    def merge(self, states: pd.DataFrame, levels: list[int]) -> pd.DataFrame:
+        count, mean = states["count"], states["mean"].fillna(0.0)
+        grouped_count = by_levels(count, levels)
+        total = grouped_count.transform("sum")
+        weighted_means = by_levels(count * mean, levels)
+        merged_mean = weighted_means.transform("sum") / total.where(total > 0)
+        deviations = states["m2"] + count * (mean - merged_mean.fillna(0.0)) ** 2
+        merged = pd.DataFrame(
+            {
+                "count": grouped_count.sum(),
+                "mean": weighted_means.sum(),
+                "m2": by_levels(deviations, levels).sum(),
+            }
+        )
+        merged["mean"] = merged["mean"] / merged["count"].where(merged["count"] > 0)
+        return merged
+
+    def variance(self, states: pd.DataFrame) -> pd.Series:
+        count = states["count"]
+        return states["m2"] / (count - 1).where(count > 1)
+
+
+class VarAggregate(MomentsAggregate):
+    def finalize(self, states: pd.DataFrame) -> pd.Series:
+        return self.variance(states)
+
+
+class StdAggregate(MomentsAggregate):
+    def finalize(self, states: pd.DataFrame) -> pd.Series:
+        return np.sqrt(self.variance(states))
+
+
+class SemAggregate(MomentsAggregate):
+    def finalize(self, states: pd.DataFrame) -> pd.Series:
+        return np.sqrt(self.variance(states) / states["count"])
+
+
+class NuniqueAggregate(PartialAggregate):
+    # the distinct values of each group, merged by union
+    states = ("values",)
+
+    def update(self, grouped: DataFrameGroupBy) -> pd.DataFrame:
+        values = grouped[self.column].agg(lambda values: set(values.dropna()))
+        return values.to_frame("values")
+
+    def merge(self, states: pd.DataFrame, levels: list[int]) -> pd.DataFrame:
+        grouped = by_levels(states["values"], levels)
+        return grouped.agg(lambda sets: set().union(*sets)).to_frame("values")
+
+    def finalize(self, states: pd.DataFrame) -> pd.Series:
+        return states["values"].map(len)
+
+
+class QuantileAggregate(PartialAggregate):
+    """median and quantile (of 0.5, like pandas' default) from a `QuantileSketch`."""
+
+    states = ("sketch",)
+
+    def update(self, grouped: DataFrameGroupBy) -> pd.DataFrame:
+        sketches = grouped[self.column].agg(
+            lambda values: QuantileSketch(values.dropna().to_numpy(dtype=np.float64))
+        )
+        return sketches.to_frame("sketch")
+
+    def merge(self, states: pd.DataFrame, levels: list[int]) -> pd.DataFrame:
+        grouped = by_levels(states["sketch"], levels)
+        return grouped.agg(QuantileSketch.merged).to_frame("sketch")
+
+    def finalize(self, states: pd.DataFrame) -> pd.Series:
+        return states["sketch"].map(lambda sketch: sketch.quantile(0.5)).astype(float)
+
+
+# the partial aggregate of every function of `lex.agg_functions`
+partial_aggregates: dict[str, type[PartialAggregate]] = {
+    "sum": SumAggregate,
+    "mean": MeanAggregate,
+    "median": QuantileAggregate,
+    "min": MinAggregate,
+    "max": MaxAggregate,
+    "count": CountAggregate,
+    "nunique": NuniqueAggregate,
+    "std": StdAggregate,
+    "var": VarAggregate,
+    "first": FirstAggregate,
+    "last": LastAggregate,
+    "prod": ProdAggregate,
+    "sem": SemAggregate,
+    "size": SizeAggregate,
+    "quantile": QuantileAggregate,
+}
+
+
+class PartialGrouping:
+    """
+    Groups rows given by parts (e.g. the chunks of a source, or the rows
+    handled by different workers) and computes the aggregations of the groups.
+    Each part only leaves the partial states of its groups behind, which are
+    merged as they pile up, so the memory held is bounded by the number of
+    groups instead of the number of rows.
+
+    The result is the same as `group_aggregates` over all the rows, except for
+    median and quantile which are approximated once a group has more than
+    `max_sketch_points` values. Without group columns, all the rows are one
+    group, like in a SELECT of aggregations only.
+    """
+
+    def __init__(self, groupby_columns: list[str], aggregations: list[tuple[str, str]]):
+        self.groupby_columns = groupby_columns
+        self.aggregates: dict[str, PartialAggregate] = {}
+        for aggregate, column in aggregations:
+            name = aggregation_name(aggregate, column)
+            if name not in self.aggregates:
+                self.aggregates[name] = partial_aggregates[aggregate](column)
+        self.parts: list[pd.DataFrame] = []
+        self.rows = 0
+
+    def group(self, data: pd.DataFrame) -> DataFrameGroupBy:
+        if not self.groupby_columns:
+            return data.groupby(np.zeros(len(data), dtype=np.int8), sort=False)
+        return data.groupby(self.groupby_columns, sort=False, observed=True)
+
+    def update(self, data: pd.DataFrame) -> None:
+        """Adds the states of the groups of the given rows."""
+        grouped = self.group(data)
+        states = [
+            aggregate.update(grouped).add_prefix(f"{index}:")
+            for index, aggregate in enumerate(self.aggregates.values())
+        ]
+        self.parts.append(pd.concat(states, axis=1))
+        self.rows += len(data)
+        if len(self.parts) >= max_held_parts:
+            self.parts = [self.merged_states()]
+
+    def merge(self, other: "PartialGrouping") -> None:
+        """Adds the states of another grouping of the same aggregations."""
+        self.parts.extend(other.parts)
+        self.rows += other.rows
+        if len(self.parts) >= max_held_parts:
+            self.parts = [self.merged_states()]
+
+    def merged_states(self) -> pd.DataFrame:
+        states = pd.concat(self.parts)
+        if len(self.parts) == 1:
+            return states
+        levels = list(range(states.index.nlevels))
+        merged = []
+        for index, aggregate in enumerate(self.aggregates.values()):
+            prefix = f"{index}:"
+            columns = [prefix + state for state in aggregate.states]
+            part = states[columns].set_axis(list(aggregate.states), axis=1)
+            merged.append(aggregate.merge(part, levels).add_prefix(prefix))
+        return pd.concat(merged, axis=1)
+
+    def result(self) -> pd.DataFrame:
+        """
+        The aggregations of the groups, with the group columns followed by a
+        column per distinct aggregation named by `aggregation_name`.
+        """
+        if not self.parts:
+            return pd.DataFrame(columns=self.groupby_columns + list(self.aggregates))
+        states = self.merged_states()
+        result = pd.DataFrame(index=states.index)
+        for index, (name, aggregate) in enumerate(self.aggregates.items()):
+            prefix = f"{index}:"
+            columns = [prefix + state for state in aggregate.states]
+            result[name] = aggregate.finalize(
+                states[columns].set_axis(list(aggregate.states), axis=1)
+            )
+        if not self.groupby_columns:
+            return result.reset_index(drop=True)
+        return result.reset_index()
@@ -0,0 +1,65 @@
+import os
+from dataclasses import dataclass
+
+
+def environment_int(name: str, default: int) -> int:
+    value = os.environ.get(name)
+    return int(value) if value else default
+
+
+def environment_flag(name: str, default: bool) -> bool:
+    value = os.environ.get(name)
+    return value.lower() not in ("0", "false", "no", "off") if value else default
+
+
+@dataclass
+class ExecutionSettings:
+    """
+    Settings of the execution of the generated code, the defaults can be
+    changed with environment variables and the values at runtime through the
+    module's `settings` instance.
+    """
+
+    # the most data sources extracted at the same time, 1 extracts them one by one
+    max_extraction_workers: int = environment_int("QUERYFLOW_MAX_EXTRACTION_WORKERS", 4)
+    # the rows read at a time from the sources that are filtered while reading
+    # or streamed
+    extraction_chunk_rows: int = environment_int(
+        "QUERYFLOW_EXTRACTION_CHUNK_ROWS", 250_000
+    )
+    # the smallest file a query reads in chunks without being asked to (see
+    # `app.etl.streaming`), CSV and JSON lines sources can be read in chunks
+    streaming_threshold_bytes: int = environment_int(
+        "QUERYFLOW_STREAMING_THRESHOLD_BYTES", 1024 * 1024 * 1024
+    )
+    # the processes a streamed query splits its source between (see
+    # `app.etl.parallel`), 1 runs it in this process only
+    workers: int = environment_int("QUERYFLOW_WORKERS", os.cpu_count() or 1)
+    # where the indexes and caches of the data sources are kept
+    cache_directory: str = os.environ.get("QUERYFLOW_CACHE_DIR") or os.path.join(
+        os.path.expanduser("~"), ".cache", "queryflow"
+    )
+    # whether the types of the columns of the flat files are inferred once and
+    # kept in the cache directory (see `app.etl.data.local.schema_cache`)
+    schema_cache: bool = environment_flag("QUERYFLOW_SCHEMA_CACHE", True)
+    # whether the tables parsed from the slow formats (Excel, XML, HTML) are
+    # kept in the cache directory as Feather files, which needs pyarrow (see
+    # `app.etl.data.local.extract_cache`)
+    extract_cache: bool = environment_flag("QUERYFLOW_EXTRACT_CACHE", True)
+    # the most bytes the kept tables take, the least recently used go first
+    extract_cache_bytes: int = environment_int(
+        "QUERYFLOW_EXTRACT_CACHE_BYTES", 1024 * 1024 * 1024
+    )
+    # the files modified more recently than this aren't kept, they change too
+    # often for their tables to be read again
+    extract_cache_min_age_seconds: int = environment_int(
+        "QUERYFLOW_EXTRACT_CACHE_MIN_AGE_SECONDS", 60
+    )
+    # the smallest source of a join that is reduced to the join keys of a
+    # smaller source before it is read (see `app.etl.key_filter`)
+    min_key_filter_source_bytes: int = environment_int(
+        "QUERYFLOW_MIN_KEY_FILTER_SOURCE_BYTES", 16 * 1024 * 1024
+    )
+
+
+settings = ExecutionSettings()
@@ -0,0 +1,286 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Iterator
+
+import pandas as pd
+
+from app.etl.data.base_data_types import IExtractor
+from app.etl.execution_report import timed_source
+from app.etl.helpers import (
+    apply_alias,
+    apply_filtering,
+    apply_limit_or_tail,
+    aggregation_name,
+    apply_order_by_without_groupby,
+    generate_aggregation_row,
+)
+from app.etl.key_filter import source_bytes
+from app.etl.partial_aggregates import PartialGrouping
+from app.etl.settings import settings
+
+
+# whether the query running in the current context reads its source in chunks,
+# None to decide by the size of the source
+query_streaming: ContextVar[bool | None] = ContextVar("query_streaming", default=None)
+
+
+@contextmanager
+def streaming(enabled: bool | None) -> Iterator[None]:
+    """Turns the streaming of the queries run in the block on or off."""
+    token = query_streaming.set(enabled)
+    try:
+        yield
+    finally:
+        query_streaming.reset(token)
+
+
+def use_streaming(data_extractor: IExtractor, data_source_path: str) -> bool:
+    if not data_extractor.can_extract_chunks():
+        return False
+    enabled = query_streaming.get()
+    if enabled is not None:
+        return enabled
+    size = source_bytes(data_source_path)
+    return size is not None and size >= settings.streaming_threshold_bytes
+
+
+class ChunkedSource:
+    """
+    A data source that is read lazily, as consecutive DataFrames of
+    `settings.extraction_chunk_rows` rows, each time it is iterated. The rows
+    keep their position in the source as index, like in an extracted
+    DataFrame.
+    """
+
+    def __init__(
+        self,
+        data_extractor: IExtractor,
+        data_source_type: str,
+        data_source_path: str,
+        columns: list[str] | None = None,
+        alias: str | None = None,
+    ):
+        self.data_extractor = data_extractor
+        self.data_source_type = data_source_type
+        self.data_source_path = data_source_path
+        self.columns = columns
+        self.alias = alias
+
+    def __iter__(self) -> Iterator[pd.DataFrame]:
+        with timed_source(self.data_source_type, self.data_source_path) as measures:
+            rows = 0
+            chunks = self.data_extractor.extract_chunks(
+                self.columns, settings.extraction_chunk_rows
+            )
+            first = True
+            for chunk in chunks:
+                first = False
+                rows += len(chunk)
+                measures["rows"] = rows
+                yield apply_alias(chunk, self.alias) if self.alias else chunk
+            if first:
+                # an empty source still has its columns
+                chunk = self.data_extractor.extract(self.columns)
+                measures["rows"] = len(chunk)
+                yield apply_alias(chunk, self.alias) if self.alias else chunk
+
+    def empty(self) -> pd.DataFrame:
+        """The source without rows, for its columns."""
+        data = self.data_extractor.extract(self.columns, limit=0)
+        return apply_alias(data, self.alias) if self.alias else data
+
+    def read_rows(self, start: int, stop: int) -> pd.DataFrame:
+        """The rows from `start` to `stop`, see `IExtractor.extract_rows`."""
+        data = self.data_extractor.extract_rows(start, stop, self.columns)
+        return apply_alias(data, self.alias) if self.alias else data
+
+
+def is_aggregation_only(criteria: dict) -> bool:
+    return criteria["COLUMNS"] != "__all__" and all(
+        isinstance(item, tuple) and not (len(item) >= 1 and item[0] == "expr")
+        for item in criteria["COLUMNS"]
+    )
+
+
+def concat_chunks(chunks: list[pd.DataFrame]) -> pd.DataFrame:
+    non_empty = [chunk for chunk in chunks if len(chunk)] or chunks[:1]
+    return pd.concat(non_empty) if len(non_empty) > 1 else non_empty[0]
+
+
+def is_row_count(criteria: dict) -> bool:
+    # a select of SIZE only, without filter, is the number of rows of the source
+    return (
+        is_aggregation_only(criteria)
+        and not criteria["FILTER"]
+        and not criteria["GROUP"]
+        and all(item[0] == "size" for item in criteria["COLUMNS"])
+    )
+
+
+def is_plain_tail(criteria: dict) -> bool:
+    limit_or_tail = criteria["LIMIT_OR_TAIL"]
+    return bool(
+        limit_or_tail
+        and limit_or_tail[0] == "tail"
+        and not (
+            criteria["GROUP"]
+            or criteria["ORDER"]
+            or criteria["DISTINCT"]
+            or is_aggregation_only(criteria)
+        )
+    )
+
+
+def reads_row_numbers(source: ChunkedSource, criteria: dict) -> bool:
+    """
+    Whether the query only needs the number of rows of the source or its last
+    rows, which the sources that can be read by row numbers give directly.
+    """
+    return source.data_extractor.can_extract_rows() and (
+        is_row_count(criteria) or is_plain_tail(criteria)
+    )
+
+
+def transform_select_tail(
+    source: ChunkedSource,
+    criteria: dict,
+    transform_select: Callable[..., pd.DataFrame],
+) -> pd.DataFrame:
+    """
+    Runs a SELECT with a TAIL (and no ORDER BY, GROUP BY, DISTINCT or
+    aggregation) by reading the source backwards from its last rows, in
+    growing blocks, until the TAIL is filled. Without filter only the last
+    rows are read.
+    """
+    number = criteria["LIMIT_OR_TAIL"][1]
+    without_limit = dict(criteria, LIMIT_OR_TAIL=None)
+    kept: list[pd.DataFrame] = []
+    found = 0
+    with timed_source(source.data_source_type, source.data_source_path) as measures:
+        stop = total = source.data_extractor.row_count()
+        block = min(number, settings.extraction_chunk_rows)
+        while stop > 0 and found < number:
+            start = max(0, stop - block)
+            part = transform_select(source.read_rows(start, stop), without_limit)
+            kept.insert(0, part)
+            found += len(part)
+            stop = start
+            block = min(block * 2, settings.extraction_chunk_rows)
+        measures["rows"] = total - stop
+    if not kept:
+        return transform_select(source.empty(), criteria)
+    return apply_limit_or_tail(concat_chunks(kept), criteria["LIMIT_OR_TAIL"])
+
+
+def transform_select_chunks(
+    source: ChunkedSource,
+    criteria: dict,
+    transform_select: Callable[..., pd.DataFrame],
+) -> pd.DataFrame:
+    """
+    Runs a SELECT over a source read in chunks, with the same result as
+    `transform_select` over the whole source.
+
+    The filtering, the select columns and their expressions run on each chunk
+    as it is read and only the rows they keep are held, so a query that only
+    filters and projects holds a chunk and its result. A LIMIT stops the
+    reading as soon as it is reached, a TAIL keeps the last rows only. Sources
+    that can be read by row numbers (CSV files, through their index) read a
+    TAIL backwards from their end and count their rows for a SIZE without
+    reading them.
+
+    The steps that need all the rows break the pipeline: DISTINCT keeps the
+    distinct rows seen so far, ORDER BY with a LIMIT or TAIL keeps the top
+    rows seen so far and ORDER BY alone holds the filtered rows and runs once
+    all the chunks are read. GROUP BY and the aggregations only hold the
+    partial aggregates of the groups, merged chunk by chunk (see
+    `PartialGrouping`).
+    """
+    limit_or_tail = criteria["LIMIT_OR_TAIL"]
+    without_limit = dict(criteria, LIMIT_OR_TAIL=None)
+    if limit_or_tail and limit_or_tail[1] == 0:
+        return transform_select(next(iter(source)), criteria)
+
+    if reads_row_numbers(source, criteria):
+        if is_row_count(criteria):
+            with timed_source(
+                source.data_source_type, source.data_source_path
+            ) as measures:
+                measures["rows"] = rows = source.data_extractor.row_count()
+
+            def count_rows(
+                data: pd.DataFrame,
+                groupby_columns: list[str],
+                aggregations: list[tuple[str, str]],
+            ) -> pd.DataFrame:
+                return pd.DataFrame(
+                    {aggregation_name(*item): [rows] for item in aggregations}
+                )
+
+            return transform_select(source.empty(), criteria, count_rows)
+        return transform_select_tail(source, criteria, transform_select)
+
+    if criteria["GROUP"] or is_aggregation_only(criteria):
+        chunks = iter(source)
+
+        def filtered(chunk: pd.DataFrame) -> pd.DataFrame:
+            if criteria["FILTER"]:
+                return apply_filtering(chunk, criteria["FILTER"])
+            return chunk
+
+        def aggregate(
+            data: pd.DataFrame,
+            groupby_columns: list[str],
+            aggregations: list[tuple[str, str]],
+        ) -> pd.DataFrame:
+            # `data` is the first chunk, the others are read here
+            grouping = PartialGrouping(groupby_columns, aggregations)
+            grouping.update(data)
+            for chunk in chunks:
+                grouping.update(filtered(chunk))
+            if not groupby_columns and not grouping.rows:
+                # the aggregations of no rows (e.g. a count of 0)
+                return generate_aggregation_row(data, aggregations)
+            return grouping.result()
+
+        return transform_select(
+            filtered(next(chunks)), dict(criteria, FILTER=None), aggregate
+        )
+
+    if criteria["ORDER"] and (criteria["DISTINCT"] or not limit_or_tail):
+        filtered = [
+            apply_filtering(chunk, criteria["FILTER"]) if criteria["FILTER"] else chunk
+            for chunk in source
+        ]
+        return transform_select(concat_chunks(filtered), dict(criteria, FILTER=None))
+
+    if criteria["ORDER"]:
+        top: pd.DataFrame | None = None
+        for chunk in source:
+            if criteria["FILTER"]:
+                chunk = apply_filtering(chunk, criteria["FILTER"])
+            rows = chunk if top is None else concat_chunks([top, chunk])
+            # the rows are kept in the source's order, which breaks the ties
+            top = apply_order_by_without_groupby(
+                rows, criteria["ORDER"], limit_or_tail
+            ).sort_index(kind="stable")
+        return transform_select(top, dict(criteria, FILTER=None))
+
+    kept: list[pd.DataFrame] = []
+    for chunk in source:
+        part = transform_select(chunk, without_limit)
+        if criteria["DISTINCT"] and kept:
+            part = concat_chunks(kept + [part]).drop_duplicates()
+            kept = []
+        kept.append(part)
+        rows = sum(len(part) for part in kept)
+        if not limit_or_tail:
+            continue
+        operator, number = limit_or_tail
+        if operator == "limit" and rows >= number:
+            break
+        # the distinct rows before the tail are kept to drop their later duplicates
+        if operator == "tail" and rows > number and not criteria["DISTINCT"]:
+            kept = [concat_chunks(kept).tail(number)]
+    data = concat_chunks(kept)
+    return apply_limit_or_tail(data, limit_or_tail) if limit_or_tail else data
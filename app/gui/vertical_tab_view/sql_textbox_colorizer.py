@@ -59,6 +59,12 @@ class Colorizer:
         "GROUP",
         "AS",
         "INNER",
+        "LEFT",
+        "RIGHT",
+        "FULL",
+        "OUTER",
+        "SEMI",
+        "ANTI",
         "JOIN",
         "ON",
     ]
@@ -1,8 +1,21 @@
+import argparse
+
 from app import *
 from app.etl.controllers import *
+from app.etl.settings import settings
 from app.gui.ui_compiler import UICompiler
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="QueryFlow")
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="parse the data sources again, ignoring their cached tables and types",
+    )
+    arguments = parser.parse_args()
+    if arguments.no_cache:
+        settings.extract_cache = False
+        settings.schema_cache = False
     app = UICompiler()
     app.mainloop()
@@ -0,0 +1,43 @@
+import sqlite3
+
+import pytest
+
+from app.etl.controllers import QuerySession
+
+
+@pytest.fixture
+def sqlite_table(tmp_path):
+    path = tmp_path / "t.db"
+    connection = sqlite3.connect(path)
+    connection.execute("create table t (id integer, name text, loose)")
+    connection.executemany(
+        "insert into t values (?, ?, ?)",
+        [(5, "5", 5), (6, "a", "5"), (7, "A", None), (8, None, "x")],
+    )
+    connection.commit()
+    connection.close()
+    return f"{{sqlite:{path.as_posix()}|t}}"
+
+
+@pytest.mark.parametrize(
+    "condition, expected",
+    [
+        ('id == "5"', []),
+        ("id == 5", [5]),
+        ("name == 5", []),
+        ('name == "5"', [5]),
+        ("loose == 5", [5]),
+        ('loose == "5"', [6]),
+        ('id == "6" OR id > 7', [8]),
+    ],
+)
+def test_comparisons_match_pandas(sqlite_table, condition, expected):
+    query = f"SELECT id FROM {sqlite_table} WHERE {condition};"
+    result = QuerySession().run(query).unwrap()
+    assert result["id"].tolist() == expected
+
+
+def test_limit_applies_after_residual_conditions(sqlite_table):
+    query = f'SELECT name FROM {sqlite_table} WHERE id > 5 AND loose == "x" LIMIT 1;'
+    result = QuerySession().run(query).unwrap()
+    assert result["name"].tolist() == [None]
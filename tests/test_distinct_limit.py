@@ -0,0 +1,37 @@
+import pandas as pd
+import pytest
+
+from app.etl.controllers import QuerySession
+
+
+@pytest.fixture
+def groups_csv(tmp_path):
+    path = tmp_path / "groups.csv"
+    # the groups a and b share their max, c and d too
+    pd.DataFrame(
+        {
+            "g": ["a", "a", "b", "c", "c", "d", "e"],
+            "v": [5, 9, 9, 7, 1, 7, 3],
+        }
+    ).to_csv(path, index=False)
+    return path.as_posix()
+
+
+@pytest.mark.parametrize("streaming_enabled", [False, True])
+def test_distinct_aggregates_before_limit(groups_csv, streaming_enabled):
+    query = (
+        f"SELECT DISTINCT max(v) FROM {{csv:{groups_csv}}} "
+        "GROUP BY g ORDER BY max(v) DESC LIMIT 2;"
+    )
+    result = QuerySession().run(query, streaming_enabled).unwrap()
+    assert result.iloc[:, 0].tolist() == [9, 7]
+
+
+@pytest.mark.parametrize("streaming_enabled", [False, True])
+def test_distinct_aggregates_before_tail(groups_csv, streaming_enabled):
+    query = (
+        f"SELECT DISTINCT max(v) FROM {{csv:{groups_csv}}} "
+        "GROUP BY g ORDER BY max(v) DESC TAIL 2;"
+    )
+    result = QuerySession().run(query, streaming_enabled).unwrap()
+    assert result.iloc[:, 0].tolist() == [7, 3]
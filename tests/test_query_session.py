@@ -0,0 +1,66 @@
+from concurrent.futures import ThreadPoolExecutor
+import sys
+import threading
+
+import pandas as pd
+import pytest
+
+from app.etl.controllers import QuerySession
+
+threads = 16
+queries_per_thread = 12
+
+
+@pytest.fixture
+def numbers_csv(tmp_path):
+    path = tmp_path / "numbers.csv"
+    ids = range(threads * queries_per_thread)
+    pd.DataFrame({"id": ids, "square": [i * i for i in ids]}).to_csv(path, index=False)
+    return path.as_posix()
+
+
+@pytest.fixture
+def frequent_thread_switches():
+    # switch threads often, so they interleave inside the lexer and the parser
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    yield
+    sys.setswitchinterval(interval)
+
+
+@pytest.mark.usefixtures("frequent_thread_switches")
+def test_concurrent_sessions_keep_their_own_results(numbers_csv):
+    # the threads start together so their compilations and executions overlap
+    start = threading.Barrier(threads)
+    # long conditions keep the threads compiling for a while
+    padding = " AND id >= 0" * 50
+
+    def run_queries(thread: int) -> list[tuple[int, QuerySession, pd.DataFrame]]:
+        start.wait()
+        results = []
+        for position in range(queries_per_thread):
+            number = thread * queries_per_thread + position
+            session = QuerySession()
+            # distinct queries, so each one is compiled and not found in the cache
+            query = (
+                f"SELECT id, square FROM {{csv:{numbers_csv}}} "
+                f"WHERE id == {number}{padding};"
+                if position % 2
+                else f"SELECT square, id FROM {{csv:{numbers_csv}}} "
+                f"WHERE id >= {number} AND id < {number + 1}{padding};"
+            )
+            results.append((number, session, session.run(query, False).unwrap()))
+        return results
+
+    with ThreadPoolExecutor(threads) as executor:
+        results = [
+            result
+            for thread_results in executor.map(run_queries, range(threads))
+            for result in thread_results
+        ]
+
+    assert len(results) == threads * queries_per_thread
+    for number, session, result in results:
+        assert session.result is result
+        assert result["id"].tolist() == [number]
+        assert result["square"].tolist() == [number * number]
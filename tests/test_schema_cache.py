@@ -0,0 +1,57 @@
+import pandas as pd
+import pytest
+
+from app.etl.controllers import QuerySession
+from app.etl.data.local.schema_cache import cached_schema
+from app.etl.settings import settings
+
+
+@pytest.fixture
+def dates_csv(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "cache_directory", str(tmp_path / "cache"))
+    monkeypatch.setattr(settings, "schema_cache", True)
+    path = tmp_path / "dates.csv"
+    pd.DataFrame(
+        {
+            "id": range(6),
+            "ts": [f"2024-01-0{day}T1{day}:00:00" for day in range(1, 7)],
+            "team": ["a", "b", "a", None, "b", "a"],
+            "score": [1.5, 2.0, None, 4.25, 5.0, 6.0],
+            "ok": [True, False, True, True, False, True],
+        }
+    ).to_csv(path, index=False)
+    return path.as_posix()
+
+
+@pytest.mark.parametrize(
+    "query",
+    [
+        'SELECT id, ts FROM {{csv:{path}}} WHERE ts LIKE "%T1%";',
+        "SELECT * FROM {{csv:{path}}};",
+        'SELECT id, team FROM {{csv:{path}}} WHERE team != "a" ORDER BY team;',
+        "SELECT team, max(ts), count(score) FROM {{csv:{path}}} GROUP BY team;",
+        "SELECT id, score FROM {{csv:{path}}} WHERE score > 2 AND ok == 1;",
+    ],
+)
+@pytest.mark.parametrize("streaming_enabled", [False, True])
+def test_cached_schema_keeps_results(dates_csv, query, streaming_enabled):
+    query = query.format(path=dates_csv)
+    cold = QuerySession().run(query, streaming_enabled).unwrap()
+    assert cached_schema(dates_csv) is not None
+    warm = QuerySession().run(query, streaming_enabled).unwrap()
+    pd.testing.assert_frame_equal(cold, warm)
+
+
+def test_bool_column_with_null_chunk(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "cache_directory", str(tmp_path / "cache"))
+    monkeypatch.setattr(settings, "schema_cache", True)
+    monkeypatch.setattr(settings, "extraction_chunk_rows", 3)
+    path = tmp_path / "flags.csv"
+    # the first chunk has only nulls in the bool column
+    path.write_text("id,flag\n1,\n2,\n3,\n4,True\n5,False\n6,True\n")
+    query = f"SELECT id, flag FROM {{csv:{path.as_posix()}}};"
+    cold = QuerySession().run(query, True).unwrap()
+    assert cached_schema(path.as_posix())["flag"] == "object"
+    for streaming_enabled in (True, False):
+        warm = QuerySession().run(query, streaming_enabled).unwrap()
+        pd.testing.assert_frame_equal(cold, warm)